@@ -0,0 +1,80 @@
+"""Pedidos/s do pipeline de crédito: handle_request (determinístico) um a um vs. batch_runner em blocos.
+
+Uso: python benchmarks/bench_batch_runner.py [--clients 100000] [--workers 1] [--chunk-size 50000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.agents import batch_runner
+from src.agents.orchestrator import CreditSystemOrchestrator
+from src.tools import client_import, db_tools
+
+
+def _seed(n: int) -> None:
+    rng = random.Random(5)
+    rows = [
+        (
+            f"Cliente {i}",
+            f"{i // 10**8 % 1000:03d}.{i // 10**5 % 1000:03d}.{i // 100 % 1000:03d}-{i % 100:02d}",
+            float(rng.randint(1500, 15000)),
+            rng.randint(16, 70),
+            rng.randint(250, 850),
+            rng.choice(client_import.SEX_CHOICES),
+            rng.choice(client_import.JOB_CHOICES),
+            rng.choice(client_import.HOUSING_CHOICES),
+            rng.choice(client_import.SAVING_CHOICES),
+            rng.choice(client_import.CHECKING_CHOICES),
+        )
+        for i in range(10_000_000, 10_000_000 + n)
+    ]
+    db_tools.upsert_clients(rows)
+
+
+async def _per_request(cpfs: list[str]) -> float:
+    orchestrator = CreditSystemOrchestrator(mode="deterministic")
+    orchestrator.decision_cache.max_entries = 0
+    started = time.perf_counter()
+    for cpf in cpfs:
+        request = {**db_tools.get_client_data(cpf), "loan_amount": 10000.0, "duration": 24, "purpose": "car"}
+        await orchestrator.handle_request(request)
+    orchestrator.repository.shutdown()
+    return len(cpfs) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_tools.DB_PATH = os.path.join(tmp, "bench.db")
+        db_tools.setup_database()
+        _seed(args.clients)
+
+        sample = [c["cpf"] for c in db_tools.list_clients()[: max(1, args.clients // 100)]]
+        per_request = asyncio.run(_per_request(sample))
+
+        chunks = batch_runner.campaign_applications(
+            loan_amount=10000.0, duration=24, purpose="car", chunk_size=args.chunk_size
+        )
+        report = batch_runner.run_batch(chunks, workers=args.workers)
+        db_tools.close_connections()
+
+    print(f"pedidos={report['rows']} workers={report['workers']} (handle_request com {len(sample)})")
+    print(f"{'handle_request':>24}: {per_request:10.0f} pedidos/s")
+    print(f"{'batch_runner':>24}: {report['rows_per_s']:10.0f} pedidos/s")
+    print("etapas (ms): " + ", ".join(f"{k}={v:.0f}" for k, v in report["timings_ms"].items()))
+    print("status: " + ", ".join(f"{k}={v}" for k, v in sorted(report["statuses"].items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Vazão de cadastro de clientes: add_client linha a linha vs. importação em blocos (client_import).
+
+Uso: python benchmarks/bench_client_import.py [--rows 200000] [--chunk-size 50000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd
+
+from src.tools import client_import, db_tools
+
+
+def _portfolio(n: int, offset: int) -> pd.DataFrame:
+    rng = random.Random(3)
+    return pd.DataFrame(
+        {
+            "name": [f"Cliente {i}" for i in range(n)],
+            "cpf": [f"{offset + i:011d}" for i in range(n)],
+            "income": [rng.randint(1500, 15000) for _ in range(n)],
+            "age": [rng.randint(18, 70) for _ in range(n)],
+            "score": [rng.randint(300, 850) for _ in range(n)],
+            "sex": [rng.choice(client_import.SEX_CHOICES) for _ in range(n)],
+            "job": [rng.choice(client_import.JOB_CHOICES) for _ in range(n)],
+            "housing": [rng.choice(client_import.HOUSING_CHOICES) for _ in range(n)],
+            "saving_accounts": [rng.choice(client_import.SAVING_CHOICES) for _ in range(n)],
+            "checking_account": [rng.choice(client_import.CHECKING_CHOICES) for _ in range(n)],
+        }
+    )
+
+
+def _per_row(df: pd.DataFrame) -> float:
+    started = time.perf_counter()
+    for r in df.itertuples(index=False):
+        cpf = f"{r.cpf[:3]}.{r.cpf[3:6]}.{r.cpf[6:9]}-{r.cpf[9:]}"
+        db_tools.add_client(
+            r.name, cpf, r.income, r.age, r.score, r.sex, r.job, r.housing, r.saving_accounts, r.checking_account
+        )
+    return len(df) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    per_row_n = max(1, args.rows // 20)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_tools.DB_PATH = os.path.join(tmp, "bench.db")
+        db_tools.setup_database()
+
+        per_row = _per_row(_portfolio(per_row_n, 10_000_000_000))
+
+        csv_path = os.path.join(tmp, "carteira.csv")
+        _portfolio(args.rows, 20_000_000_000).to_csv(csv_path, index=False)
+        inserted = client_import.import_clients(csv_path, chunk_size=args.chunk_size)
+        # Segunda passada: todas as linhas caem no ON CONFLICT (atualização).
+        updated = client_import.import_clients(csv_path, chunk_size=args.chunk_size)
+        db_tools.close_connections()
+
+    print(f"linhas={args.rows} (add_client com {per_row_n})")
+    print(f"{'add_client por linha':>24}: {per_row:10.0f} linhas/s")
+    print(f"{'import (inserção)':>24}: {inserted['rows_per_s']:10.0f} linhas/s")
+    print(f"{'import (upsert)':>24}: {updated['rows_per_s']:10.0f} linhas/s")
+
+
+if __name__ == "__main__":
+    main()
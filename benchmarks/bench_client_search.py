@@ -0,0 +1,73 @@
+"""Latência das opções do dropdown de clientes: carregar todos (list_clients) vs. search_clients.
+
+Uso: python benchmarks/bench_client_search.py [--clients 200000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.tools import db_tools
+
+FIRST = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Heitor", "Iara", "João"]
+LAST = ["Silva", "Santos", "Souza", "Oliveira", "Pereira", "Lima", "Costa", "Ribeiro", "Almeida", "Gomes"]
+
+
+def _cpf(n: int) -> str:
+    digits = f"{n:011d}"
+    return f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+
+
+def _seed(n: int) -> None:
+    rng = random.Random(7)
+    conn = db_tools._get_connection()
+    with conn:
+        conn.executemany(
+            "INSERT INTO clients (name, cpf, income, age, credit_history_score) VALUES (?, ?, ?, ?, ?)",
+            (
+                (f"{rng.choice(FIRST)} {rng.choice(LAST)} {i}", _cpf(10_000_000 + i), 5000.0, 30, 700)
+                for i in range(n)
+            ),
+        )
+
+
+def _avg_ms(fn, queries: list[str]) -> float:
+    started = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - started) / len(queries) * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    queries = [rng.choice(["sou", "perei", "gabri", "lima 12", "0001234", "100.00"]) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_tools.DB_PATH = os.path.join(tmp, "bench.db")
+        db_tools.setup_database()
+        _seed(args.clients)
+
+        def load_all(q: str) -> list:
+            q = q.lower()
+            return [c for c in db_tools.list_clients() if q in c["name"].lower() or q in c["cpf"]][:50]
+
+        full_ms = _avg_ms(load_all, queries[: max(1, args.queries // 20)])
+        search_ms = _avg_ms(lambda q: db_tools.search_clients(q, limit=50), queries)
+        db_tools.close_connections()
+
+    print(f"clientes={args.clients}")
+    print(f"{'list_clients + filtro':>24}: {full_ms:10.2f} ms/consulta")
+    print(f"{'search_clients (FTS5)':>24}: {search_ms:10.2f} ms/consulta")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Leituras/escritas por segundo no SQLite: conexão por chamada vs. pool persistente (WAL).
+
+Uso: python benchmarks/bench_db_pool.py [--workers 16] [--seconds 3]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.tools import db_tools
+
+CPFS = ["111.222.333-44", "555.666.777-88", "999.888.777-66"]
+
+
+def _legacy_read(path: str, cpf: str) -> None:
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("SELECT * FROM clients WHERE cpf = ?", (cpf,)).fetchone()
+    conn.close()
+
+
+def _legacy_write(path: str, cpf: str) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO applications (cpf, client_id, amount, duration, status, reason, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (cpf, 1, 1000.0, 12, "BENCH", None, datetime.now(timezone.utc).isoformat(timespec="seconds")),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _pooled_read(_path: str, cpf: str) -> None:
+    db_tools.get_client_data(cpf)
+
+
+def _pooled_write(_path: str, cpf: str) -> None:
+    db_tools.log_application_attempt(cpf=cpf, client_id=1, amount=1000.0, duration=12, status="BENCH")
+
+
+def _run(read_fn, write_fn, path: str, workers: int, seconds: float, write_ratio: int) -> tuple[float, float]:
+    reads = [0] * workers
+    writes = [0] * workers
+    deadline = time.perf_counter() + seconds
+    start = threading.Barrier(workers)
+
+    def worker(idx: int) -> None:
+        start.wait()
+        n = 0
+        while time.perf_counter() < deadline:
+            cpf = CPFS[n % len(CPFS)]
+            if n % write_ratio == 0:
+                write_fn(path, cpf)
+                writes[idx] += 1
+            else:
+                read_fn(path, cpf)
+                reads[idx] += 1
+            n += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(reads) / seconds, sum(writes) / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--write-ratio", type=int, default=10, help="1 escrita a cada N operações")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.db")
+        pooled_path = os.path.join(tmp, "pooled.db")
+
+        for path in (legacy_path, pooled_path):
+            db_tools.DB_PATH = path
+            db_tools.setup_database()
+        db_tools.close_connections()
+
+        conn = sqlite3.connect(legacy_path)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+
+        db_tools.DB_PATH = pooled_path
+        results = {
+            "conexão por chamada": _run(_legacy_read, _legacy_write, legacy_path, args.workers, args.seconds, args.write_ratio),
+            "pool persistente (WAL)": _run(_pooled_read, _pooled_write, pooled_path, args.workers, args.seconds, args.write_ratio),
+        }
+        db_tools.close_connections()
+
+    print(f"workers={args.workers} duração={args.seconds:.1f}s escrita=1/{args.write_ratio}")
+    for label, (reads_s, writes_s) in results.items():
+        print(f"{label:>24}: {reads_s:10.0f} leituras/s {writes_s:10.0f} escritas/s")
+
+
+if __name__ == "__main__":
+    main()
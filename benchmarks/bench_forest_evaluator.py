@@ -0,0 +1,79 @@
+"""Latência do scoring: predict_proba do sklearn vs. floresta compilada em NumPy (forest_evaluator).
+
+Mede predict_credit_risk por linha (µs) com cada avaliador e o predict_proba puro em vários tamanhos de lote,
+que mostram o ponto de corte usado em ML_FOREST_MAX_BATCH_ROWS.
+
+Uso: python benchmarks/bench_forest_evaluator.py [--calls 2000] [--sizes 1,10,100,1000,10000]
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from src.tools import ml_tools
+
+warnings.filterwarnings("ignore")
+
+
+def _use(evaluator: str):
+    os.environ["ML_FOREST_EVALUATOR"] = evaluator
+    ml_tools._state = None
+    return ml_tools._get_predictor()
+
+
+def _single_us(calls: int) -> float:
+    ml_tools.predict_credit_risk(30, 5000.0, 10000.0, 24, 750)
+    started = time.perf_counter()
+    for i in range(calls):
+        ml_tools.predict_credit_risk(20 + i % 50, 5000.0, 10000.0 + i, 24, 300 + i % 500)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def _best_ms(fn, X, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(X)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--sizes", default="1,10,100,1000,10000")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    rng = np.random.default_rng(1)
+    n = max(sizes)
+    X = np.column_stack(
+        [
+            rng.integers(18, 75, n),
+            rng.uniform(1500, 15000, n),
+            rng.uniform(1000, 50000, n),
+            rng.integers(6, 60, n),
+            rng.integers(300, 850, n),
+        ]
+    ).astype(np.float32)
+
+    sklearn_model = _use(ml_tools.EVALUATOR_SKLEARN)
+    sklearn_us = _single_us(max(1, args.calls // 10))
+    forest = _use(ml_tools.EVALUATOR_NUMPY)
+    numpy_us = _single_us(args.calls)
+
+    diff = np.abs(sklearn_model.predict_proba(X) - forest.predict_proba(X)).max()
+    print(f"árvores={forest.n_trees} nós={len(forest.feature)} max|Δp|={diff:.2e}")
+    print(f"predict_credit_risk: sklearn {sklearn_us:10.1f} µs/linha | numpy {numpy_us:8.1f} µs/linha")
+    print(f"{'linhas':>8} {'sklearn ms':>12} {'numpy ms':>10}")
+    for size in sizes:
+        print(f"{size:>8} {_best_ms(sklearn_model.predict_proba, X[:size]):12.2f} {_best_ms(forest.predict_proba, X[:size]):10.2f}")
+
+
+if __name__ == "__main__":
+    main()
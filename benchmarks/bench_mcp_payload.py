@@ -0,0 +1,110 @@
+"""Custo de serialização por chamada MCP: payload em texto (JSON / str(dict)) vs. saída estruturada.
+
+Mede só o caminho de codificação/decodificação de um CallToolResult, sem transporte nem inferência:
+servidor converte o retorno da tool -> JSON-RPC -> cliente extrai o dict.
+
+Uso: python benchmarks/bench_mcp_payload.py [--calls 20000]
+"""
+import argparse
+import builtins
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from mcp.server.fastmcp.utilities.func_metadata import func_metadata
+from mcp.types import CallToolResult
+
+from src.agents.risk_analyst import _parse_mcp_payload
+
+# O servidor redireciona print para stderr ao ser importado.
+_print = builtins.print
+from src.infrastructure import mcp_server  # noqa: E402
+
+builtins.print = _print
+
+RISK = {"status": "LOW_RISK", "risk_probability": 0.1234, "risk_prediction": 0}
+CLIENT = {
+    "id": 1,
+    "name": "Alice Silva",
+    "cpf": "111.222.333-44",
+    "income": 5000.0,
+    "age": 30,
+    "score": 750,
+    "sex": "female",
+    "job": 1,
+    "housing": "own",
+    "saving_accounts": "moderate",
+    "checking_account": "little",
+}
+
+
+def _legacy_analyze_risk() -> str:
+    return json.dumps(RISK, ensure_ascii=False)
+
+
+def _legacy_get_client_cpf() -> str:
+    return str(CLIENT)
+
+
+def _to_call_result(converted) -> CallToolResult:
+    if isinstance(converted, tuple):
+        content, structured = converted
+        return CallToolResult(content=list(content), structuredContent=structured)
+    return CallToolResult(content=list(converted))
+
+
+def _decode_text(result: CallToolResult) -> dict:
+    return _parse_mcp_payload(result.content[0].text)
+
+
+def _decode_structured(result: CallToolResult) -> dict:
+    return _parse_mcp_payload(result.structuredContent)
+
+
+def _per_call_us(produce, metadata, decode, calls: int) -> tuple[float, int]:
+    size = 0
+    started = time.perf_counter()
+    for _ in range(calls):
+        wire = _to_call_result(metadata.convert_result(produce())).model_dump_json(by_alias=True, exclude_none=True)
+        decode(CallToolResult.model_validate_json(wire))
+        size = len(wire)
+    return (time.perf_counter() - started) / calls * 1e6, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    tools = mcp_server.mcp._tool_manager
+    cases = {
+        "analyze_risk texto (json.loads)": (_legacy_analyze_risk, func_metadata(_legacy_analyze_risk), _decode_text),
+        "analyze_risk estruturado": (
+            lambda: dict(RISK),
+            tools.get_tool("analyze_risk").fn_metadata,
+            _decode_structured,
+        ),
+        "get_client_cpf texto (literal_eval)": (
+            _legacy_get_client_cpf,
+            func_metadata(_legacy_get_client_cpf),
+            _decode_text,
+        ),
+        "get_client_cpf estruturado": (
+            lambda: {"found": True, "client": dict(CLIENT)},
+            tools.get_tool("get_client_cpf").fn_metadata,
+            _decode_structured,
+        ),
+    }
+
+    print(f"chamadas={args.calls}")
+    for label, (produce, metadata, decode) in cases.items():
+        assert decode(_to_call_result(metadata.convert_result(produce())))
+        per_call_us, size = _per_call_us(produce, metadata, decode, args.calls)
+        print(f"{label:>36}: {per_call_us:8.1f} µs/chamada {size:6d} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Engines do modelo de risco lado a lado: AUC, latência por linha, vazão em lote e tamanho do artefato.
+
+Treina cada engine (model_engines) com train_model no mesmo split, publica num registry temporário e
+mede pelo caminho de serving (ml_tools): predict_credit_risk linha a linha (p50/p99) e
+score_credit_risk_batch em lote. O random_forest é medido com a floresta compilada (forest_evaluator) e
+com o predict_proba do sklearn; o hist_gradient_boosting é servido pelo próprio estimador.
+Sem --search, treina um candidato só (baseline_grid).
+
+Uso: python benchmarks/bench_model_engines.py [--data data/credit_data.csv] [--calls 2000] [--batch 10000] [--search]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# A troca de versão é feita aqui, não pela thread que acompanha o registry padrão.
+os.environ["ML_MODEL_RELOAD_INTERVAL_S"] = "0"
+
+import numpy as np
+
+from src.tools import ml_tools, model_registry, train_model
+from src.tools.forest_evaluator import is_compilable
+from src.tools.model_engines import ENGINES
+
+warnings.filterwarnings("ignore")
+
+
+def _serving_records(raw) -> list[dict]:
+    if train_model.dataset_layout(raw) == ml_tools.LAYOUT_SIMPLE:
+        return [
+            {
+                "age": int(r.age),
+                "income": float(r.income),
+                "loan_amount": float(r.loan_amount),
+                "duration": int(r.duration),
+                "history_score": int(r.credit_history_score),
+            }
+            for r in raw.itertuples(index=False)
+        ]
+    return [
+        {
+            "age": int(r["Age"]),
+            "income": 5000.0,
+            "loan_amount": float(r["Credit amount"]),
+            "duration": int(r["Duration"]),
+            "history_score": 700,
+            "purpose": r["Purpose"],
+            "sex": r["Sex"],
+            "housing": r["Housing"],
+            "saving_accounts": r["Saving accounts"] if isinstance(r["Saving accounts"], str) else "no_inf",
+            "checking_account": r["Checking account"] if isinstance(r["Checking account"], str) else "no_inf",
+            "job": int(r["Job"]),
+        }
+        for _, r in raw.iterrows()
+    ]
+
+
+def _single_latency_us(records: list[dict], calls: int) -> np.ndarray:
+    for record in records[:50]:
+        ml_tools.predict_credit_risk(**record)
+    timings = np.empty(calls)
+    for i in range(calls):
+        record = records[i % len(records)]
+        started = time.perf_counter_ns()
+        ml_tools.predict_credit_risk(**record)
+        timings[i] = (time.perf_counter_ns() - started) / 1e3
+    return timings
+
+
+def _batch_rows_per_s(records: list[dict], rows: int, repeat: int = 3) -> float:
+    batch = (records * (rows // len(records) + 1))[:rows]
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        ml_tools.score_credit_risk_batch(batch)
+        best = min(best, time.perf_counter() - started)
+    return rows / best
+
+
+def _artifact_kb(version_dir: str) -> tuple[float, float]:
+    sizes = {name: os.path.getsize(os.path.join(version_dir, name)) for name in os.listdir(version_dir)}
+    return sizes[model_registry.MODEL_FILENAME] / 1024, sum(sizes.values()) / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=ml_tools.DATA_PATH)
+    parser.add_argument("--engines", default=",".join(ENGINES))
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--search", action="store_true", help="busca na grade completa de cada engine")
+    args = parser.parse_args()
+
+    records = _serving_records(train_model.read_dataset(args.data))
+    print(f"dataset: {os.path.normpath(args.data)} ({len(records)} linhas)")
+    print(
+        f"{'engine':>24} {'avaliador':>10} {'layout':>12} {'AUC teste':>10} {'p50 (µs)':>10} {'p99 (µs)':>10} "
+        f"{'lote (linhas/s)':>16} {'.pkl':>10} {'artefato':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "registry")
+        for name in args.engines.split(","):
+            engine = ENGINES[name.strip()]
+            output = os.path.join(tmp, engine.name, "credit_risk_model.pkl")
+            metrics = train_model.train(
+                args.data,
+                output,
+                engine=engine.name,
+                param_grid=None if args.search else engine.baseline_grid,
+                cache_dir=None,
+            )
+            model_registry.publish(output, version=engine.name, root=root)
+            pkl_kb, total_kb = _artifact_kb(os.path.join(root, engine.name))
+            auc = metrics["test"]["roc_auc"]
+
+            evaluators = [ml_tools.EVALUATOR_SKLEARN]
+            if is_compilable(ml_tools._read_model(output)):
+                evaluators.insert(0, ml_tools.EVALUATOR_NUMPY)
+            for evaluator in evaluators:
+                os.environ["ML_FOREST_EVALUATOR"] = evaluator
+                ml_tools.reload_model(force=True, root=root)
+                latency = _single_latency_us(records, args.calls)
+                rows_per_s = _batch_rows_per_s(records, args.batch)
+                print(
+                    f"{engine.name:>24} {evaluator:>10} {metrics['layout']:>12} {auc if auc is None else round(auc, 4):>10} "
+                    f"{np.percentile(latency, 50):>10.1f} {np.percentile(latency, 99):>10.1f} {rows_per_s:>16,.0f} "
+                    f"{pkl_kb:>7.0f} KB {total_kb:>7.0f} KB"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Memória dos workers de inferência: modelo carregado no heap de cada processo vs. floresta mapeada (mmap).
+
+Sobe N processos (spawn, como o pool de inferência), aquece cada um com predict_credit_risk e lê
+/proc/<pid>/smaps_rollup. RSS conta páginas compartilhadas em todos os processos; PSS as divide entre
+eles (a soma é a memória física real) e USS é só a parte privada. Somente Linux.
+
+Uso: python benchmarks/bench_model_memory.py [--workers 1,4,16]
+"""
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.infrastructure.inference_pool import warm_worker
+
+MODES = {
+    "sklearn (joblib.load)": {"ML_FOREST_EVALUATOR": "sklearn", "ML_MODEL_MMAP": "0"},
+    "floresta no heap": {"ML_FOREST_EVALUATOR": "numpy", "ML_MODEL_MMAP": "0"},
+    "floresta mmap": {"ML_FOREST_EVALUATOR": "numpy", "ML_MODEL_MMAP": "1"},
+}
+
+
+def _memory_kb() -> dict:
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "uss": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def _report(barrier) -> dict:
+    # A barreira garante uma tarefa por worker, já aquecido pelo initializer.
+    barrier.wait()
+    return _memory_kb()
+
+
+def _measure(workers: int, env: dict) -> dict:
+    os.environ.update(env)
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        barrier = manager.Barrier(workers)
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=warm_worker
+        ) as executor:
+            reports = list(executor.map(_report, [barrier] * workers))
+    return {key: sum(r[key] for r in reports) / 1024 for key in ("rss", "pss", "uss")}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,4,16")
+    args = parser.parse_args()
+    counts = [int(n) for n in args.workers.split(",")]
+    # Os workers herdam o ambiente: silencia o aviso de versão do sklearn ao despicklar o modelo.
+    os.environ["PYTHONWARNINGS"] = "ignore"
+
+    print(f"{'modo':>22} {'workers':>8} {'RSS total':>11} {'PSS total':>11} {'USS total':>11} {'PSS/worker':>11}")
+    for name, env in MODES.items():
+        for workers in counts:
+            mem = _measure(workers, env)
+            print(
+                f"{name:>22} {workers:>8} {mem['rss']:>8.1f} MB {mem['pss']:>8.1f} MB {mem['uss']:>8.1f} MB "
+                f"{mem['pss'] / workers:>8.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Vazão do CreditSystemOrchestrator sem rede: backend de LLM local (scripted) vs. pipeline determinístico.
+
+Separa o overhead da orquestração (tools, banco, ML) da latência simulada do modelo.
+
+Uso: python benchmarks/bench_orchestrator.py [--requests 200] [--concurrency 16] [--latency-ms 0 150]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.agents.llm_backends import ScriptedBackend
+from src.agents.orchestrator import MODE_DETERMINISTIC, MODE_LLM, CreditSystemOrchestrator
+from src.services.decision_cache import DecisionCache
+from src.tools import db_tools
+
+CASES = [
+    ("111.222.333-44", 10000.0),
+    ("999.888.777-66", 10000.0),
+    ("111.222.333-44", 500000.0),
+    ("555.666.777-88", 3000.0),
+]
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def _run(orchestrator: CreditSystemOrchestrator, mode: str, n_requests: int, concurrency: int) -> dict:
+    requests = []
+    for i in range(n_requests):
+        cpf, amount = CASES[i % len(CASES)]
+        requests.append(
+            {**db_tools.get_client_data(cpf), "cpf": cpf, "loan_amount": amount, "duration": 24, "purpose": "radio/TV"}
+        )
+
+    semaphore = asyncio.Semaphore(concurrency)
+    totals, llm, overhead = [], [], []
+
+    async def one(request: dict) -> None:
+        async with semaphore:
+            result = await orchestrator.handle_request(request, mode=mode)
+        timings = result["orchestration"]["timings_ms"]
+        totals.append(timings["total"])
+        llm.append(timings.get("llm", 0.0))
+        overhead.append(timings["total"] - timings.get("llm", 0.0))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(r) for r in requests))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": n_requests / elapsed,
+        "p50": _percentile(totals, 0.50),
+        "p95": _percentile(totals, 0.95),
+        "llm_avg": sum(llm) / len(llm),
+        "overhead_avg": sum(overhead) / len(overhead),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[0.0, 150.0], help="latência simulada por turno do LLM")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_tools.DB_PATH = os.path.join(tmp, "bench.db")
+        db_tools.setup_database()
+        # Aquece modelo e conexões fora da medição.
+        # Cache de decisões desligado: as negativas de CASES se repetem e mediriam só o cache.
+        no_cache = DecisionCache(max_entries=0)
+        asyncio.run(_run(CreditSystemOrchestrator(mode=MODE_DETERMINISTIC, decision_cache=no_cache), MODE_DETERMINISTIC, 4, 1))
+
+        runs = [("determinístico", MODE_DETERMINISTIC, ScriptedBackend(latency_ms=0))]
+        runs += [(f"llm scripted {lat:.0f}ms/turno", MODE_LLM, ScriptedBackend(latency_ms=lat)) for lat in args.latency_ms]
+
+        print(f"pedidos={args.requests} concorrência={args.concurrency}")
+        for label, mode, backend in runs:
+            orchestrator = CreditSystemOrchestrator(mode=mode, llm_backend=backend, decision_cache=no_cache)
+            stats = asyncio.run(_run(orchestrator, mode, args.requests, args.concurrency))
+            print(
+                f"{label:>26}: {stats['rps']:8.1f} req/s  p50={stats['p50']:8.2f}ms  p95={stats['p95']:8.2f}ms  "
+                f"llm={stats['llm_avg']:8.2f}ms  overhead={stats['overhead_avg']:6.2f}ms"
+            )
+        db_tools.close_connections()
+
+
+if __name__ == "__main__":
+    main()
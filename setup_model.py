@@ -1,11 +1,10 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
-import joblib
 import os
 
+from src.tools import model_registry
+from src.tools.train_model import train
+
 # 1. Garantir que as pastas existem
 os.makedirs('data', exist_ok=True)
 os.makedirs('models', exist_ok=True)
@@ -33,20 +32,16 @@ df['risk'] = np.where(
 # Salvar CSV para referência
 df.to_csv('data/credit_data.csv', index=False)
 
-# 2. Treinamento
-X = df.drop('risk', axis=1)
-y = df['risk']
-
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-print("🧠 Treinando Random Forest...")
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
-
-accuracy = model.score(X_test, y_test)
-print(f"✅ Modelo treinado com Acurácia: {accuracy:.2f}")
-
-# 3. Salvar o modelo (Serialização)
+# 2. Treinamento: busca de hiperparâmetros em paralelo + modelo, schema, floresta e métricas
+print("🧠 Treinando Random Forest (busca de hiperparâmetros com validação cruzada)...")
 model_path = 'models/credit_risk_model.pkl'
-joblib.dump(model, model_path)
-print(f"💾 Modelo salvo em: {model_path}")
\ No newline at end of file
+metrics = train('data/credit_data.csv', model_path)
+print(
+    f"✅ Modelo treinado: {metrics['cv']['scoring']} (CV) = {metrics['cv']['best_score']:.2f}, "
+    f"acurácia no teste = {metrics['test']['accuracy']:.2f} ({metrics['timings_s']['search']:.1f}s, {metrics['n_jobs']} processos)"
+)
+print(f"💾 Modelo, schema, floresta compilada e métricas salvos em: {os.path.dirname(model_path)}/")
+
+# 3. Publicar no registry (os processos em execução recarregam a versão ativa)
+version = model_registry.publish(model_path)
+print(f"📦 Versão {version} publicada e ativada no registry: {os.path.normpath(model_registry.REGISTRY_DIR)}")
@@ -1,3 +1,4 @@
+from src.tools.async_db import get_async_repository
 from src.tools.db_tools import get_client_data
 from src.tools.utils import validate_cpf_format
 
@@ -5,9 +6,8 @@ class AuditorAgent:
     def __init__(self):
         self.name = "Auditor de Dados"
 
-    def process(self, request_context):
-        cpf = request_context.get("cpf")
-
+    @staticmethod
+    def _check_cpf(cpf):
         if not cpf or not validate_cpf_format(str(cpf)):
             return {
                 "success": False,
@@ -17,16 +17,18 @@ class AuditorAgent:
                     "cpf": cpf,
                 },
             }
-        
-        try:
-            client_data = get_client_data(str(cpf))
-        except Exception as e:
-            return {
-                "success": False,
-                "message": "Falha ao consultar cadastro no banco de dados.",
-                "details": {"audit_rule": "DB_LOOKUP_ERROR", "error": str(e)},
-            }
-        
+        return None
+
+    @staticmethod
+    def _lookup_error(e):
+        return {
+            "success": False,
+            "message": "Falha ao consultar cadastro no banco de dados.",
+            "details": {"audit_rule": "DB_LOOKUP_ERROR", "error": str(e)},
+        }
+
+    @staticmethod
+    def _finish(request_context, cpf, client_data):
         if not client_data:
             return {
                 "success": False, 
@@ -34,4 +36,29 @@ class AuditorAgent:
             }
         
         request_context.update(client_data)
-        return {"success": True, "data": request_context}
\ No newline at end of file
+        return {"success": True, "data": request_context}
+
+    def process(self, request_context):
+        cpf = request_context.get("cpf")
+        error = self._check_cpf(cpf)
+        if error:
+            return error
+        
+        try:
+            client_data = get_client_data(str(cpf))
+        except Exception as e:
+            return self._lookup_error(e)
+        return self._finish(request_context, cpf, client_data)
+
+    async def aprocess(self, request_context):
+        """Mesmo fluxo de `process`, com a consulta ao banco fora do event loop."""
+        cpf = request_context.get("cpf")
+        error = self._check_cpf(cpf)
+        if error:
+            return error
+
+        try:
+            client_data = await get_async_repository().get_client_data(str(cpf))
+        except Exception as e:
+            return self._lookup_error(e)
+        return self._finish(request_context, cpf, client_data)
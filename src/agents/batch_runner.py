@@ -0,0 +1,354 @@
+"""Decisões de crédito em lote: audit -> compliance -> risk -> issue/deny sobre blocos de pedidos.
+
+Uso: python -m src.agents.batch_runner --input pedidos.csv [--workers 4] [--dry-run] [--output decisoes.csv]
+     python -m src.agents.batch_runner --all-clients --loan-amount 10000 --duration 24 --purpose radio/TV
+"""
+from __future__ import annotations
+
+import argparse
+import collections
+import concurrent.futures
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from src.agents.orchestrator import HIGH_DTI_THRESHOLD, REQUIRED_REQUEST_FIELDS
+from src.infrastructure.inference_pool import warm_worker
+from src.tools import db_tools
+from src.tools.client_import import iter_chunks
+from src.tools.ml_tools import model_version, score_credit_risk_batch
+from src.tools.utils import check_blacklist_score, check_legal_age
+
+CHUNK_SIZE = int(os.environ.get("BATCH_CHUNK_SIZE", "50000"))
+
+STATUS_INVALID = "INVALID"
+# Status gravados em `applications`; pedidos INVALID (dados incompletos) não são registrados, como no orquestrador.
+LOGGED_STATUSES = ("APPROVED", "DENIED", "ERROR")
+STAGES = ("audit", "compliance", "risk", "issue")
+
+# Mesmo padrão de validate_cpf_format (re.match: ancorado só no início).
+_CPF_PATTERN = r"\d{3}\.\d{3}\.\d{3}-\d{2}"
+_PROFILE_FIELDS = ("age", "score", "income", "sex", "job", "housing", "saving_accounts", "checking_account")
+_NUMERIC_FIELDS = ("age", "score", "income", "loan_amount", "duration", "job")
+_SCORING_FIELDS = (
+    "age",
+    "income",
+    "loan_amount",
+    "duration",
+    "score",
+    "purpose",
+    "sex",
+    "housing",
+    "saving_accounts",
+    "checking_account",
+    "job",
+)
+
+DECISION_COLUMNS = (
+    "cpf",
+    "client_id",
+    "amount",
+    "duration",
+    "purpose",
+    "sex",
+    "job",
+    "housing",
+    "saving_accounts",
+    "checking_account",
+    "status",
+    "reason",
+    "risk_probability",
+    "dti_ratio",
+    "model_version",
+)
+
+
+def read_applications(path: str, chunk_size: int | None = None) -> Iterator[pd.DataFrame]:
+    """Pedidos de um CSV/Parquet: `cpf`, `loan_amount`, `duration`, `purpose` e, opcionalmente, o perfil."""
+    return iter_chunks(path, chunk_size or CHUNK_SIZE)
+
+
+def campaign_applications(
+    *,
+    loan_amount: float,
+    duration: int,
+    purpose: str,
+    chunk_size: int | None = None,
+    path: str | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Um pedido com as mesmas condições para cada cliente cadastrado; o perfil vem do cadastro na auditoria."""
+    for page in db_tools.iter_clients(chunk_size or CHUNK_SIZE, path=path):
+        yield pd.DataFrame(
+            {"cpf": [c["cpf"] for c in page], "loan_amount": loan_amount, "duration": duration, "purpose": purpose}
+        )
+
+
+def _text(values: pd.Series) -> pd.Series:
+    stripped = values.astype("string").str.strip()
+    return stripped.mask(stripped == "")
+
+
+def decide_chunk(frame: pd.DataFrame, db_path: str | None = None) -> tuple[pd.DataFrame, dict]:
+    """Aplica as regras do orquestrador determinístico a um bloco inteiro de pedidos.
+
+    Devolve as decisões (colunas de DECISION_COLUMNS, na ordem do bloco) e o tempo de cada etapa em ms.
+    Função de módulo e sem estado para poder rodar em um processo worker.
+    """
+    timings = dict.fromkeys(STAGES, 0.0)
+    df = frame.reset_index(drop=True)
+    n = len(df)
+    status = np.full(n, None, dtype=object)
+    reason = np.full(n, None, dtype=object)
+    risk_probability = np.full(n, np.nan)
+    dti = np.full(n, np.nan)
+
+    # Auditoria: formato do CPF + cadastro; o cadastro completa os campos de perfil ausentes no pedido.
+    started = time.perf_counter()
+    cpf = _text(df["cpf"]) if "cpf" in df.columns else pd.Series(pd.NA, index=df.index, dtype="string")
+    valid_cpf = cpf.str.match(_CPF_PATTERN).fillna(False).to_numpy(dtype=bool)
+    status[~valid_cpf] = "DENIED"
+    reason[~valid_cpf] = "CPF ausente ou com formato inválido."
+
+    found = pd.DataFrame(
+        db_tools.get_clients_by_cpf(cpf[valid_cpf].tolist(), path=db_path),
+        columns=["id", "cpf", *_PROFILE_FIELDS],
+    )
+    found = found.drop_duplicates("cpf").set_index("cpf").reindex(cpf.fillna("").to_numpy())
+    missing_client = valid_cpf & found["id"].isna().to_numpy()
+    status[missing_client] = "DENIED"
+    reason[missing_client] = [f"Cliente com CPF {c} não encontrado." for c in cpf[missing_client]]
+
+    request = pd.DataFrame({"cpf": cpf, "client_id": found["id"].to_numpy()})
+    for field in (*_PROFILE_FIELDS, "loan_amount", "duration", "purpose"):
+        given = _text(df[field]) if field in df.columns else pd.Series(pd.NA, index=df.index, dtype="string")
+        if field in _PROFILE_FIELDS:
+            given = given.astype(object).where(given.notna(), found[field].to_numpy())
+        if field in _NUMERIC_FIELDS:
+            given = pd.to_numeric(given, errors="coerce")
+        request[field] = given.to_numpy()
+
+    # Campos ausentes ou não numéricos: o orquestrador responde ERRO sem registrar a tentativa.
+    pending = pd.isna(status)
+    incomplete = request[list(REQUIRED_REQUEST_FIELDS)].isna().to_numpy()
+    invalid = pending & incomplete.any(axis=1)
+    status[invalid] = STATUS_INVALID
+    reason[invalid] = [
+        "Dados incompletos para análise: " + ", ".join(np.asarray(REQUIRED_REQUEST_FIELDS)[row])
+        for row in incomplete[invalid]
+    ]
+    timings["audit"] = (time.perf_counter() - started) * 1000.0
+
+    # Compliance: mesmas regras (idade legal, score mínimo), avaliadas sobre arrays.
+    started = time.perf_counter()
+    pending = pd.isna(status)
+    age = np.trunc(request["age"].fillna(0).to_numpy(dtype=float)).astype(np.int64)
+    score = np.trunc(request["score"].fillna(0).to_numpy(dtype=float)).astype(np.int64)
+    minor = pending & ~check_legal_age(age)
+    status[minor] = "DENIED"
+    reason[minor] = [f"Cliente menor de idade ({a} anos)." for a in age[minor]]
+    low_score = pending & ~minor & ~check_blacklist_score(score)
+    status[low_score] = "DENIED"
+    reason[low_score] = [f"Score abaixo do mínimo permitido ({s})." for s in score[low_score]]
+    timings["compliance"] = (time.perf_counter() - started) * 1000.0
+
+    # Risco: um predict_proba para todo o bloco + DTI vetorizado.
+    started = time.perf_counter()
+    pending = pd.isna(status)
+    version = model_version()
+    predictions = np.zeros(n, dtype=np.int64)
+    if pending.any():
+        scored = request.loc[pending, list(_SCORING_FIELDS)]
+        scored = scored.astype({"age": np.int64, "duration": np.int64, "score": np.int64, "job": np.int64})
+        preds, probs = score_credit_risk_batch(scored)
+        predictions[pending] = preds
+        risk_probability[pending] = probs
+
+        income = request["income"].to_numpy(dtype=float)
+        loan_amount = request["loan_amount"].to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dti = np.where(income == 0, 999.9, np.round(loan_amount / income, 2))
+        dti[~pending] = np.nan
+
+        high_ml = pending & (predictions == 1)
+        high_dti = pending & (dti > HIGH_DTI_THRESHOLD)
+        risky = high_ml | high_dti
+        status[risky] = "DENIED"
+        reason[risky] = [
+            "Risco ({})".format("; ".join((["ML=HIGH_RISK"] if ml else []) + ([f"DTI={d:.2f}"] if hd else [])))
+            for ml, hd, d in zip(high_ml[risky], high_dti[risky], dti[risky])
+        ]
+    timings["risk"] = (time.perf_counter() - started) * 1000.0
+
+    # Emissão: valor inválido vira ERROR; o restante é aprovado com o resultado do modelo no motivo.
+    started = time.perf_counter()
+    pending = pd.isna(status)
+    bad_amount = pending & (request["loan_amount"].to_numpy(dtype=float) <= 0)
+    status[bad_amount] = "ERROR"
+    reason[bad_amount] = "Issuer: loan_amount <= 0"
+    approved = pending & ~bad_amount
+    status[approved] = "APPROVED"
+    reason[approved] = [
+        json.dumps(
+            {"risk_prediction": int(p), "risk_probability": float(prob), "status": "HIGH_RISK" if p == 1 else "LOW_RISK"},
+            ensure_ascii=False,
+        )
+        for p, prob in zip(predictions[approved], risk_probability[approved])
+    ]
+    timings["issue"] = (time.perf_counter() - started) * 1000.0
+
+    decisions = pd.DataFrame(
+        {
+            "cpf": request["cpf"].astype(object).where(request["cpf"].notna(), None).to_numpy(),
+            "client_id": request["client_id"].astype("Int64"),
+            "amount": request["loan_amount"],
+            "duration": request["duration"].astype("Int64"),
+            "purpose": request["purpose"],
+            "sex": request["sex"],
+            "job": request["job"].astype("Int64"),
+            "housing": request["housing"],
+            "saving_accounts": request["saving_accounts"],
+            "checking_account": request["checking_account"],
+            "status": status,
+            "reason": reason,
+            "risk_probability": risk_probability,
+            "dti_ratio": dti,
+            "model_version": version,
+        },
+        columns=list(DECISION_COLUMNS),
+    )
+    return decisions, timings
+
+
+def application_rows(decisions: pd.DataFrame, created_at: str | None = None) -> list[tuple]:
+    """Tuplas do INSERT em applications (mesma ordem de db_tools.application_row) para as decisões registráveis."""
+    logged = decisions[decisions["status"].isin(LOGGED_STATUSES)]
+    created_at = created_at or datetime.now(timezone.utc).isoformat(timespec="seconds")
+    frame = logged[list(DECISION_COLUMNS[:12])].astype(object)
+    frame = frame.where(logged[list(DECISION_COLUMNS[:12])].notna(), None)
+    frame["created_at"] = created_at
+    frame["cached"] = 0
+    frame["model_version"] = logged["model_version"].to_numpy()
+    return list(frame.itertuples(index=False, name=None))
+
+
+def _decide_in_order(chunks: Iterable[pd.DataFrame], workers: int, db_path: str | None) -> Iterator[tuple]:
+    if workers <= 1:
+        for chunk in chunks:
+            yield (*decide_chunk(chunk, db_path), len(chunk))
+        return
+
+    # Até 2 blocos por worker em voo: o arquivo continua sendo lido em streaming.
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=warm_worker) as executor:
+        in_flight: collections.deque = collections.deque()
+        for chunk in chunks:
+            in_flight.append((executor.submit(decide_chunk, chunk, db_path), len(chunk)))
+            if len(in_flight) >= workers * 2:
+                future, size = in_flight.popleft()
+                yield (*future.result(), size)
+        while in_flight:
+            future, size = in_flight.popleft()
+            yield (*future.result(), size)
+
+
+def run_batch(
+    chunks: Iterable[pd.DataFrame],
+    *,
+    dry_run: bool = False,
+    workers: int | None = None,
+    output: str | None = None,
+) -> dict:
+    """Decide todos os blocos e grava as tentativas em lote (um commit por bloco).
+
+    `workers > 1` distribui os blocos entre processos (BATCH_WORKERS); as escritas ficam no processo
+    principal, já que o SQLite tem um único escritor. `timings_ms` soma o tempo de cada etapa.
+    """
+    if workers is None:
+        workers = int(os.environ.get("BATCH_WORKERS", "0")) or (os.cpu_count() or 1)
+    workers = max(1, int(workers))
+    db_tools.setup_database()
+    # Caminho explícito: workers em processos novos não herdam um DB_PATH alterado em tempo de execução.
+    db_path = os.path.abspath(db_tools.DB_PATH)
+
+    timings = dict.fromkeys(("read", *STAGES, "write"), 0.0)
+    statuses: collections.Counter = collections.Counter()
+    total = written = 0
+    started = time.perf_counter()
+
+    source = iter(chunks)
+
+    def timed_source():
+        while True:
+            read_started = time.perf_counter()
+            chunk = next(source, None)
+            timings["read"] += (time.perf_counter() - read_started) * 1000.0
+            if chunk is None:
+                return
+            yield chunk
+
+    first_output = True
+    for decisions, stage_timings, size in _decide_in_order(timed_source(), workers, db_path):
+        total += size
+        statuses.update(decisions["status"].tolist())
+        for stage, ms in stage_timings.items():
+            timings[stage] += ms
+
+        write_started = time.perf_counter()
+        if not dry_run:
+            written += db_tools.log_application_attempts(application_rows(decisions), path=db_path)
+        if output:
+            decisions.to_csv(output, mode="w" if first_output else "a", header=first_output, index=False)
+            first_output = False
+        timings["write"] += (time.perf_counter() - write_started) * 1000.0
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": total,
+        "statuses": dict(statuses),
+        "written": written,
+        "dry_run": dry_run,
+        "workers": workers,
+        "timings_ms": {k: round(v, 3) for k, v in timings.items()},
+        "elapsed_s": elapsed,
+        "rows_per_s": total / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Executa o pipeline de crédito sobre um lote de pedidos.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="CSV/Parquet com os pedidos")
+    source.add_argument("--all-clients", action="store_true", help="um pedido por cliente cadastrado")
+    parser.add_argument("--loan-amount", type=float, default=10000.0)
+    parser.add_argument("--duration", type=int, default=24)
+    parser.add_argument("--purpose", default="radio/TV")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="decide sem gravar em applications")
+    parser.add_argument("--output", default=None, help="CSV de saída com todas as decisões")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        chunks = read_applications(args.input, args.chunk_size)
+    else:
+        chunks = campaign_applications(
+            loan_amount=args.loan_amount, duration=args.duration, purpose=args.purpose, chunk_size=args.chunk_size
+        )
+
+    report = run_batch(chunks, dry_run=args.dry_run, workers=args.workers, output=args.output)
+    print(
+        f"pedidos={report['rows']} gravados={report['written']} workers={report['workers']} "
+        f"tempo={report['elapsed_s']:.2f}s ({report['rows_per_s']:.0f} pedidos/s)"
+        + (" [dry-run]" if report["dry_run"] else "")
+    )
+    print("status: " + ", ".join(f"{k}={v}" for k, v in sorted(report["statuses"].items())))
+    print("etapas (ms): " + ", ".join(f"{k}={v:.0f}" for k, v in report["timings_ms"].items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,4 +1,5 @@
 from src.tools.utils import format_currency, generate_protocol_id
+from src.tools.async_db import get_async_repository
 from src.tools.db_tools import log_application_attempt
 import json
 
@@ -7,6 +8,30 @@ class IssuerAgent:
         self.name = "Emissor de Contratos"
 
     def process(self, request_context):
+        record, response = self._evaluate(request_context)
+        try:
+            log_application_attempt(**record)
+        except Exception:
+            # Só a aprovação exige o registro; falhas de emissão são registradas em best-effort.
+            if response["success"]:
+                raise
+        return response
+
+    async def aprocess(self, request_context):
+        """Mesmo fluxo de `process`, com o registro no histórico fora do event loop."""
+        record, response = self._evaluate(request_context)
+        try:
+            # A aprovação só é respondida depois do commit; os demais registros seguem o write-behind.
+            await get_async_repository().log_application_attempt(
+                sync=True if response["success"] else None, **record
+            )
+        except Exception:
+            if response["success"]:
+                raise
+        return response
+
+    def _evaluate(self, request_context):
+        """Decide a emissão; devolve (registro do histórico, resposta)."""
         loan_amount = request_context.get("loan_amount")
         duration = request_context.get("duration")
         cpf = request_context.get("cpf")
@@ -16,24 +41,21 @@ class IssuerAgent:
             loan_amount_f = float(loan_amount)
             duration_i = int(duration) if duration is not None else None
         except Exception as e:
-            try:
-                log_application_attempt(
-                    cpf=cpf,
-                    client_id=client_id,
-                    amount=loan_amount,
-                    duration=duration,
-                    purpose=request_context.get("purpose"),
-                    sex=request_context.get("sex"),
-                    job=request_context.get("job"),
-                    housing=request_context.get("housing"),
-                    saving_accounts=request_context.get("saving_accounts"),
-                    checking_account=request_context.get("checking_account"),
-                    status="ERROR",
-                    reason=f"Issuer: dados inválidos ({str(e)})",
-                )
-            except Exception:
-                pass
-            return {
+            record = dict(
+                cpf=cpf,
+                client_id=client_id,
+                amount=loan_amount,
+                duration=duration,
+                purpose=request_context.get("purpose"),
+                sex=request_context.get("sex"),
+                job=request_context.get("job"),
+                housing=request_context.get("housing"),
+                saving_accounts=request_context.get("saving_accounts"),
+                checking_account=request_context.get("checking_account"),
+                status="ERROR",
+                reason=f"Issuer: dados inválidos ({str(e)})",
+            )
+            return record, {
                 "success": False,
                 "final_response": {
                     "status": "ERRO",
@@ -43,24 +65,21 @@ class IssuerAgent:
             }
 
         if loan_amount_f <= 0:
-            try:
-                log_application_attempt(
-                    cpf=cpf,
-                    client_id=client_id,
-                    amount=loan_amount_f,
-                    duration=duration_i,
-                    purpose=request_context.get("purpose"),
-                    sex=request_context.get("sex"),
-                    job=request_context.get("job"),
-                    housing=request_context.get("housing"),
-                    saving_accounts=request_context.get("saving_accounts"),
-                    checking_account=request_context.get("checking_account"),
-                    status="ERROR",
-                    reason="Issuer: loan_amount <= 0",
-                )
-            except Exception:
-                pass
-            return {
+            record = dict(
+                cpf=cpf,
+                client_id=client_id,
+                amount=loan_amount_f,
+                duration=duration_i,
+                purpose=request_context.get("purpose"),
+                sex=request_context.get("sex"),
+                job=request_context.get("job"),
+                housing=request_context.get("housing"),
+                saving_accounts=request_context.get("saving_accounts"),
+                checking_account=request_context.get("checking_account"),
+                status="ERROR",
+                reason="Issuer: loan_amount <= 0",
+            )
+            return record, {
                 "success": False,
                 "final_response": {
                     "status": "ERRO",
@@ -78,7 +97,7 @@ class IssuerAgent:
             "risk_probability": ml_risk.get("risk_probability"),
             "status": ml_risk.get("status"),
         }
-        log_application_attempt(
+        record = dict(
             cpf=cpf,
             client_id=client_id,
             amount=loan_amount_f,
@@ -93,7 +112,7 @@ class IssuerAgent:
             reason=json.dumps(ml_risk_log, ensure_ascii=False),
         )
         
-        return {
+        return record, {
             "success": True,
             "final_response": {
                 "status": "APROVADO",
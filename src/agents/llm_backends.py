@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Protocol
+
+BACKEND_GEMINI = "gemini"
+BACKEND_SCRIPTED = "scripted"
+BACKEND_NONE = "none"
+LLM_BACKENDS = (BACKEND_GEMINI, BACKEND_SCRIPTED, BACKEND_NONE)
+
+DEFAULT_GEMINI_MODEL = "models/gemini-2.5-flash-lite"
+
+
+@dataclass(frozen=True)
+class FunctionCall:
+    name: str
+    args: dict = field(default_factory=dict)
+
+
+class LLMChat(Protocol):
+    async def start(self, prompt_parts: list[str], tools: list) -> FunctionCall | None:
+        """Envia o prompt inicial; devolve a próxima tool pedida pelo modelo (ou None)."""
+
+    async def send_function_response(self, name: str, result: Any) -> FunctionCall | None:
+        """Devolve o resultado de uma tool ao modelo; devolve a próxima tool pedida (ou None)."""
+
+
+class LLMBackend(Protocol):
+    name: str
+
+    def start_chat(self, user_request: dict) -> LLMChat:
+        ...
+
+
+class _GeminiChat:
+    def __init__(self, chat):
+        self._chat = chat
+
+    @staticmethod
+    def _function_call(response) -> FunctionCall | None:
+        if not response.parts:
+            return None
+        fc = response.parts[0].function_call
+        if not fc:
+            return None
+        return FunctionCall(fc.name, {k: v for k, v in fc.args.items()})
+
+    async def start(self, prompt_parts, tools):
+        return self._function_call(await self._chat.send_message_async(prompt_parts, tools=tools))
+
+    async def send_function_response(self, name, result):
+        import google.generativeai as genai
+
+        response = await self._chat.send_message_async(
+            genai.protos.Content(
+                parts=[
+                    genai.protos.Part(
+                        function_response=genai.protos.FunctionResponse(
+                            name=name,
+                            response={"result": result},
+                        )
+                    )
+                ]
+            )
+        )
+        return self._function_call(response)
+
+
+class GeminiBackend:
+    name = BACKEND_GEMINI
+
+    def __init__(self, api_key: str, model_name: str = DEFAULT_GEMINI_MODEL):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+
+    def start_chat(self, user_request):
+        return _GeminiChat(self.model.start_chat(history=[]))
+
+
+def _next_scripted_call(request: dict, last_tool: str | None, result: Any) -> FunctionCall | None:
+    """Mesma sequência que o system prompt impõe ao modelo: audit -> compliance -> risk -> issue/deny."""
+    if last_tool is None:
+        return FunctionCall("check_audit", {"cpf": request["cpf"]})
+    if last_tool in ("issue_contract", "deny_request"):
+        return None
+
+    result = result if isinstance(result, dict) else {}
+    if result.get("status") != "OK":
+        reason = result.get("reason") or result.get("message") or "Falha na análise"
+        return FunctionCall("deny_request", {"reason": reason, "details": result.get("details")})
+
+    if last_tool == "check_audit":
+        return FunctionCall(
+            "check_compliance", {"cpf": request["cpf"], "age": int(request["age"]), "score": int(request["score"])}
+        )
+    if last_tool == "check_compliance":
+        return FunctionCall(
+            "analyze_risk",
+            {
+                "age": int(request["age"]),
+                "income": float(request["income"]),
+                "loan_amount": float(request["loan_amount"]),
+                "duration": int(request["duration"]),
+                "score": int(request["score"]),
+                "purpose": request["purpose"],
+                "sex": request["sex"],
+                "housing": request["housing"],
+                "saving_accounts": request["saving_accounts"],
+                "checking_account": request["checking_account"],
+                "job": int(request["job"]),
+            },
+        )
+    if last_tool == "analyze_risk":
+        return FunctionCall(
+            "issue_contract", {"loan_amount": float(request["loan_amount"]), "duration": int(request["duration"])}
+        )
+    return None
+
+
+class _ScriptedChat:
+    def __init__(self, backend: "ScriptedBackend", user_request: dict):
+        self._backend = backend
+        self._request = dict(user_request)
+        self._replay = list(backend.script) if backend.script is not None else None
+
+    async def _turn(self, last_tool: str | None, result: Any) -> FunctionCall | None:
+        if self._backend.latency_ms > 0:
+            await asyncio.sleep(self._backend.latency_ms / 1000.0)
+        self._backend.turns += 1
+
+        if self._replay is not None:
+            return self._replay.pop(0) if self._replay else None
+        # Garante que o resultado é serializável como seria para o modelo real.
+        json.dumps(result, default=str)
+        return _next_scripted_call(self._request, last_tool, result)
+
+    async def start(self, prompt_parts, tools):
+        return await self._turn(None, None)
+
+    async def send_function_response(self, name, result):
+        return await self._turn(name, result)
+
+
+class ScriptedBackend:
+    """Backend local que emite as mesmas sequências de function_call, com latência configurável.
+
+    Sem `script`, segue a política do system prompt a partir do pedido e dos resultados das tools;
+    com `script`, repete as chamadas informadas na ordem (replay).
+    """
+
+    name = BACKEND_SCRIPTED
+
+    def __init__(self, latency_ms: float | None = None, script: Iterable[FunctionCall] | None = None):
+        if latency_ms is None:
+            latency_ms = float(os.environ.get("LLM_SCRIPTED_LATENCY_MS", "0"))
+        self.latency_ms = max(0.0, float(latency_ms))
+        self.script = list(script) if script is not None else None
+        self.turns = 0
+
+    def start_chat(self, user_request):
+        return _ScriptedChat(self, user_request)
+
+
+def create_llm_backend(name: str | None = None) -> LLMBackend | None:
+    """Backend configurado em `LLM_BACKEND`; Gemini sem GOOGLE_API_KEY equivale a nenhum backend."""
+    name = (name or os.environ.get("LLM_BACKEND", BACKEND_GEMINI)).strip().lower()
+    if name not in LLM_BACKENDS:
+        raise ValueError(f"Backend de LLM desconhecido: {name} (use um de {', '.join(LLM_BACKENDS)})")
+    if name == BACKEND_SCRIPTED:
+        return ScriptedBackend()
+    if name == BACKEND_GEMINI:
+        api_key = os.environ.get("GOOGLE_API_KEY")
+        if api_key:
+            return GeminiBackend(api_key)
+    return None
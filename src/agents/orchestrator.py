@@ -2,45 +2,149 @@ import asyncio
 import json
 import logging
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
-import google.generativeai as genai
-
 from src.agents.auditor import AuditorAgent
 from src.agents.compliance import ComplianceAgent
 from src.agents.issuer import IssuerAgent
+from src.agents.llm_backends import LLMBackend, create_llm_backend
 
-from src.tools.ml_tools import predict_credit_risk
+from src.services.decision_cache import CACHEABLE_STATUSES, DecisionCache, decision_key, get_decision_cache
+from src.tools.ml_tools import model_version, predict_credit_risk
 from src.tools.utils import calculate_dti
-from src.tools.db_tools import setup_database, log_application_attempt
+from src.tools.async_db import get_async_repository
+from src.tools.db_tools import setup_database
 
 load_dotenv()
 
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
+MODE_DETERMINISTIC = "deterministic"
+MODE_LLM = "llm"
+MODE_LLM_ON_EXCEPTION = "llm-on-exception-only"
+ORCHESTRATION_MODES = (MODE_DETERMINISTIC, MODE_LLM, MODE_LLM_ON_EXCEPTION)
+
+ENGINE_DETERMINISTIC = "deterministic"
+ENGINE_LLM = "llm"
+ENGINE_CACHE = "cache"
+
+REQUIRED_REQUEST_FIELDS = (
+    "cpf",
+    "age",
+    "score",
+    "income",
+    "loan_amount",
+    "duration",
+    "purpose",
+    "sex",
+    "housing",
+    "saving_accounts",
+    "checking_account",
+    "job",
+)
+
+# Comprometimento de renda (valor / renda) acima do qual o pedido é negado.
+HIGH_DTI_THRESHOLD = 20.0
+
+
+def resolve_orchestration_mode(mode: str | None = None) -> str:
+    mode = (mode or os.environ.get("ORCHESTRATION_MODE", MODE_LLM)).strip().lower()
+    if mode not in ORCHESTRATION_MODES:
+        raise ValueError(f"Modo de orquestração desconhecido: {mode} (use um de {', '.join(ORCHESTRATION_MODES)})")
+    return mode
+
+
+def _timed_tool(name, func, timings: dict):
+    """Envolve uma tool acumulando o tempo gasto em `timings[name]` (ms)."""
+    if asyncio.iscoroutinefunction(func):
+        async def timed_async(**kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(**kwargs)
+            finally:
+                timings[name] = timings.get(name, 0.0) + (time.perf_counter() - started) * 1000.0
+        return timed_async
+
+    def timed(**kwargs):
+        started = time.perf_counter()
+        try:
+            return func(**kwargs)
+        finally:
+            timings[name] = timings.get(name, 0.0) + (time.perf_counter() - started) * 1000.0
+    return timed
+
+
+def _step_once(name, func, steps: dict):
+    """Executa a tool uma vez por pedido: o resultado (ou a falha) fica em `steps[name]` e é repetido nas chamadas seguintes."""
+    def replay():
+        outcome = steps[name]
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    if asyncio.iscoroutinefunction(func):
+        async def once_async(**kwargs):
+            if name in steps:
+                return replay()
+            try:
+                steps[name] = await func(**kwargs)
+            except Exception as e:
+                steps[name] = e
+                raise
+            return steps[name]
+        return once_async
+
+    def once(**kwargs):
+        if name in steps:
+            return replay()
+        try:
+            steps[name] = func(**kwargs)
+        except Exception as e:
+            steps[name] = e
+            raise
+        return steps[name]
+    return once
+
+
 class CreditSystemOrchestrator:
-    def __init__(self):
+    def __init__(
+        self,
+        mode: str | None = None,
+        llm_backend: LLMBackend | None = None,
+        decision_cache: DecisionCache | None = None,
+    ):
         self.auditor = AuditorAgent()
         self.compliance = ComplianceAgent()
         self.issuer = IssuerAgent()
+        self.mode = resolve_orchestration_mode(mode)
         
         setup_database()
         
-        api_key = os.environ.get("GOOGLE_API_KEY")
-        self.genai_enabled = bool(api_key)
-        if self.genai_enabled:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel("models/gemini-2.5-flash-lite")
-        else:
-            self.model = None
-
-    async def _run_genai_orchestration(self, user_request, tools_list, tools_map, system_instruction):
-        if not self.model:
+        self.llm_backend = llm_backend if llm_backend is not None else create_llm_backend()
+        self.genai_enabled = self.llm_backend is not None
+        self.decision_cache = decision_cache if decision_cache is not None else get_decision_cache()
+        self.repository = get_async_repository()
+
+    @staticmethod
+    async def _llm_turn(send, timings: dict, *args):
+        started = time.perf_counter()
+        try:
+            return await send(*args)
+        finally:
+            timings["llm"] = timings.get("llm", 0.0) + (time.perf_counter() - started) * 1000.0
+            timings["llm_round_trips"] = timings.get("llm_round_trips", 0) + 1
+
+    async def _run_genai_orchestration(self, user_request, tools_list, tools_map, system_instruction, timings=None):
+        if self.llm_backend is None:
             return None
+        if timings is None:
+            timings = {}
 
         try:
-            chat = self.model.start_chat(history=[])
+            chat = self.llm_backend.start_chat(user_request)
 
             prompt_parts = [
                 system_instruction,
@@ -48,22 +152,17 @@ class CreditSystemOrchestrator:
             ]
 
             try:
-                response = await chat.send_message_async(prompt_parts, tools=tools_list)
+                call = await self._llm_turn(chat.start, timings, prompt_parts, tools_list)
             except Exception as e:
                 logger.warning(f"Initial GenAI call failed: {e}")
                 return None
 
             for _ in range(12):
-                if not response.parts:
+                if call is None:
                     break
 
-                part = response.parts[0]
-                if not part.function_call:
-                    break
-
-                fc = part.function_call
-                name = fc.name
-                args = {k: v for k, v in fc.args.items()}
+                name = call.name
+                args = dict(call.args)
 
                 func = tools_map.get(name)
                 if not func:
@@ -86,18 +185,7 @@ class CreditSystemOrchestrator:
                     return result
 
                 try:
-                    response = await chat.send_message_async(
-                        genai.protos.Content(
-                            parts=[
-                                genai.protos.Part(
-                                    function_response=genai.protos.FunctionResponse(
-                                        name=name,
-                                        response={"result": result},
-                                    )
-                                )
-                            ]
-                        )
-                    )
+                    call = await self._llm_turn(chat.send_function_response, timings, name, result)
                 except Exception as e:
                     logger.warning(f"GenAI function response failed: {e}")
                     return None
@@ -107,12 +195,14 @@ class CreditSystemOrchestrator:
 
         return None
         
-    async def handle_request(self, user_request):
+    async def handle_request(self, user_request, mode: str | None = None):
+        """Processa um pedido; `mode` sobrepõe o modo de orquestração da instância."""
+        mode = resolve_orchestration_mode(mode) if mode else self.mode
         current_context = user_request.copy()
         
-        def check_audit(cpf: str):
+        async def check_audit(cpf: str):
             current_context['cpf'] = cpf
-            res = self.auditor.process(current_context)
+            res = await self.auditor.aprocess(current_context)
             if res['success']:
                 current_context.update(res['data'])
                 return {"status": "OK", "data": res['data']}
@@ -149,7 +239,7 @@ class CreditSystemOrchestrator:
                 risk_probability = ml_res.get("risk_probability")
                 
                 is_high_risk = ml_status == "HIGH_RISK"
-                is_high_dti = dti > 20.0 
+                is_high_dti = dti > HIGH_DTI_THRESHOLD
                 
                 current_context["ml_risk"] = {
                     "risk_prediction": risk_prediction,
@@ -178,15 +268,15 @@ class CreditSystemOrchestrator:
             except Exception as e:
                 return {"status": "ERROR", "message": str(e)}
 
-        def issue_contract(loan_amount: float, duration: int):
+        async def issue_contract(loan_amount: float, duration: int):
             current_context.update({"loan_amount": loan_amount, "duration": duration})
-            res = self.issuer.process(current_context)
+            res = await self.issuer.aprocess(current_context)
             return res 
             
-        def deny_request(reason: str, details: dict = None):
+        async def deny_request(reason: str, details: dict = None):
             ml_risk = current_context.get("ml_risk")
             
-            log_application_attempt(
+            await self.repository.log_application_attempt(
                  cpf=current_context.get("cpf"),
                  client_id=current_context.get("id"),
                  amount=current_context.get("loan_amount"),
@@ -210,21 +300,7 @@ class CreditSystemOrchestrator:
             return payload
 
         def validate_required_fields(data: dict):
-            required = [
-                "cpf",
-                "age",
-                "score",
-                "income",
-                "loan_amount",
-                "duration",
-                "purpose",
-                "sex",
-                "housing",
-                "saving_accounts",
-                "checking_account",
-                "job",
-            ]
-            missing = [field for field in required if field not in data]
+            missing = [field for field in REQUIRED_REQUEST_FIELDS if field not in data]
             if missing:
                 return {
                     "status": "ERRO",
@@ -259,62 +335,158 @@ class CreditSystemOrchestrator:
         if validation_error:
             return validation_error
 
-        genai_result = await self._run_genai_orchestration(
-            user_request=user_request,
-            tools_list=tools_list,
-            tools_map=tools_map,
-            system_instruction=system_instruction,
-        )
-        if genai_result is not None:
-            return genai_result
-
+        timings: dict = {}
+        timed_tools = {name: _timed_tool(name, func, timings) for name, func in tools_map.items()}
+        started = time.perf_counter()
+        engine = ENGINE_DETERMINISTIC
+        result = None
+
+        cache_key = await self._decision_cache_key(user_request) if self.decision_cache.enabled else None
+        if cache_key is not None:
+            result = self.decision_cache.get(cache_key)
+            if result is not None:
+                engine = ENGINE_CACHE
+                await self._log_cached_decision(user_request, result)
+
+        if result is None and mode == MODE_LLM:
+            result = await self._run_genai_orchestration(
+                user_request=user_request,
+                tools_list=tools_list,
+                tools_map=timed_tools,
+                system_instruction=system_instruction,
+                timings=timings,
+            )
+            if result is not None:
+                engine = ENGINE_LLM
+
+        if result is None:
+            # Passos já executados não se repetem no fallback: o LLM recebe os mesmos resultados
+            # e issue/deny não registram a tentativa de novo no histórico.
+            steps: dict = {}
+            step_tools = {name: _step_once(name, func, steps) for name, func in timed_tools.items()}
+            try:
+                result = await self._run_deterministic(user_request, step_tools)
+            except Exception as e:
+                logger.exception("Deterministic orchestration failed")
+                if mode == MODE_LLM_ON_EXCEPTION:
+                    result = await self._run_genai_orchestration(
+                        user_request=user_request,
+                        tools_list=tools_list,
+                        tools_map=step_tools,
+                        system_instruction=system_instruction,
+                        timings=timings,
+                    )
+                    if result is not None:
+                        engine = ENGINE_LLM
+                if result is None:
+                    result = {"status": "ERRO", "mensagem": "Error", "detalhes": str(e)}
+
+        if (
+            cache_key is not None
+            and engine != ENGINE_CACHE
+            and isinstance(result, dict)
+            and result.get("status") in CACHEABLE_STATUSES
+        ):
+            self.decision_cache.put(cache_key, user_request["cpf"], result)
+
+        timings["total"] = (time.perf_counter() - started) * 1000.0
+        if isinstance(result, dict):
+            result = {
+                **result,
+                "orchestration": {
+                    "mode": mode,
+                    "engine": engine,
+                    "timings_ms": {k: (round(v, 3) if isinstance(v, float) else v) for k, v in timings.items()},
+                },
+            }
+        return result
+
+    async def _decision_cache_key(self, user_request) -> str | None:
         try:
-            audit_result = check_audit(user_request["cpf"])
-            if audit_result["status"] != "OK":
-                return deny_request(
-                    reason=audit_result.get("message", "Falha na auditoria"),
-                    details=audit_result.get("details"),
-                )
+            row_version = await self.repository.get_client_row_version(user_request["cpf"])
+            if row_version is None:
+                return None
+            return decision_key(user_request, model_version=model_version(), row_version=row_version)
+        except Exception:
+            logger.warning("Decision cache key unavailable", exc_info=True)
+            return None
 
-            compliance_result = check_compliance(
-                cpf=user_request["cpf"],
-                age=int(user_request["age"]),
-                score=int(user_request["score"]),
+    async def _log_cached_decision(self, user_request, result) -> None:
+        """Registra o reenvio no histórico como negação servida do cache (só negações são cacheadas)."""
+        await self.repository.log_application_attempt(
+            cpf=user_request.get("cpf"),
+            client_id=user_request.get("id"),
+            amount=user_request.get("loan_amount"),
+            duration=user_request.get("duration"),
+            purpose=user_request.get("purpose"),
+            sex=user_request.get("sex"),
+            job=user_request.get("job"),
+            housing=user_request.get("housing"),
+            saving_accounts=user_request.get("saving_accounts"),
+            checking_account=user_request.get("checking_account"),
+            status="DENIED",
+            reason=result.get("motivo"),
+            cached=True,
+        )
+
+    @staticmethod
+    async def _run_deterministic(user_request, tools):
+        """Pipeline fixo audit -> compliance -> risk -> issue/deny, sem round trips ao LLM."""
+        audit_result = await tools["check_audit"](cpf=user_request["cpf"])
+        if audit_result["status"] != "OK":
+            return await tools["deny_request"](
+                reason=audit_result.get("message", "Falha na auditoria"),
+                details=audit_result.get("details"),
             )
-            if compliance_result["status"] != "OK":
-                return deny_request(
-                    reason=compliance_result.get("message", "Falha de compliance"),
-                    details=compliance_result.get("details"),
-                )
 
-            risk_result = analyze_risk(
-                age=int(user_request["age"]),
-                income=float(user_request["income"]),
-                loan_amount=float(user_request["loan_amount"]),
-                duration=int(user_request["duration"]),
-                score=int(user_request["score"]),
-                purpose=user_request["purpose"],
-                sex=user_request["sex"],
-                housing=user_request["housing"],
-                saving_accounts=user_request["saving_accounts"],
-                checking_account=user_request["checking_account"],
-                job=int(user_request["job"]),
+        compliance_result = tools["check_compliance"](
+            cpf=user_request["cpf"],
+            age=int(user_request["age"]),
+            score=int(user_request["score"]),
+        )
+        if compliance_result["status"] != "OK":
+            return await tools["deny_request"](
+                reason=compliance_result.get("message", "Falha de compliance"),
+                details=compliance_result.get("details"),
             )
-            if risk_result["status"] != "OK":
-                return deny_request(
-                    reason=risk_result.get("reason", risk_result.get("message", "Falha na análise de risco")),
-                    details=risk_result.get("details"),
-                )
 
-            contract_result = issue_contract(
-                loan_amount=float(user_request["loan_amount"]),
-                duration=int(user_request["duration"]),
+        risk_result = tools["analyze_risk"](
+            age=int(user_request["age"]),
+            income=float(user_request["income"]),
+            loan_amount=float(user_request["loan_amount"]),
+            duration=int(user_request["duration"]),
+            score=int(user_request["score"]),
+            purpose=user_request["purpose"],
+            sex=user_request["sex"],
+            housing=user_request["housing"],
+            saving_accounts=user_request["saving_accounts"],
+            checking_account=user_request["checking_account"],
+            job=int(user_request["job"]),
+        )
+        if risk_result["status"] != "OK":
+            return await tools["deny_request"](
+                reason=risk_result.get("reason", risk_result.get("message", "Falha na análise de risco")),
+                details=risk_result.get("details"),
             )
-            if "final_response" in contract_result:
-                return contract_result["final_response"]
-            return contract_result
 
-        except Exception as e:
-            return {"status": "ERRO", "mensagem": "Error", "detalhes": str(e)}
+        contract_result = await tools["issue_contract"](
+            loan_amount=float(user_request["loan_amount"]),
+            duration=int(user_request["duration"]),
+        )
+        if "final_response" in contract_result:
+            return contract_result["final_response"]
+        return contract_result
 
-        
+
+_shared_orchestrator: CreditSystemOrchestrator | None = None
+_shared_lock = threading.Lock()
+
+
+def get_orchestrator() -> CreditSystemOrchestrator:
+    """Orquestrador único da aplicação; o estado de cada pedido vive no contexto de handle_request."""
+    global _shared_orchestrator
+    if _shared_orchestrator is None:
+        with _shared_lock:
+            if _shared_orchestrator is None:
+                _shared_orchestrator = CreditSystemOrchestrator()
+    return _shared_orchestrator
@@ -1,11 +1,15 @@
+import asyncio
 import json
 import ast
 
+from src.infrastructure.mcp_client import get_shared_mcp_client
 from src.tools.ml_tools import predict_credit_risk
 from src.tools.utils import calculate_dti
 
 
-def _parse_mcp_payload(payload: str) -> dict:
+def _parse_mcp_payload(payload) -> dict:
+    if isinstance(payload, dict):
+        return dict(payload)
     if payload is None:
         return {"status": "ERROR", "risk_probability": 0.0}
     payload = str(payload).strip()
@@ -28,10 +32,16 @@ def _parse_mcp_payload(payload: str) -> dict:
 
     return {"status": "ERROR", "risk_probability": 0.0, "raw": payload}
 
+def _parse_dti_payload(payload) -> float:
+    if isinstance(payload, dict):
+        return float(payload["dti_ratio"])
+    return float(payload)
+
+
 class RiskAnalystAgent:
-    def __init__(self, mcp_client):
+    def __init__(self, mcp_client=None):
         self.name = "Analista de Risco (IA)"
-        self.mcp = mcp_client 
+        self.mcp = mcp_client if mcp_client is not None else get_shared_mcp_client()
 
     async def process(self, request_context):
         age = request_context.get("age")
@@ -67,28 +77,44 @@ class RiskAnalystAgent:
                 },
             }
 
+        risk_arguments = {
+            "age": age_i,
+            "income": income_f,
+            "loan_amount": loan_amount_f,
+            "duration": duration_i,
+            "score": score_i,
+            "purpose": purpose,
+            "sex": sex,
+            "housing": housing,
+            "saving_accounts": saving_accounts,
+            "checking_account": checking_account,
+            "job": job,
+        }
+
         ml_result = None
-        mcp_error = None
+        dti = None
         try:
-            ml_result_str = await self.mcp.call_tool(
-                "analyze_risk",
-                arguments={
-                    "age": age_i,
-                    "income": income_f,
-                    "loan_amount": loan_amount_f,
-                    "duration": duration_i,
-                    "score": score_i,
-                    "purpose": purpose,
-                    "sex": sex,
-                    "housing": housing,
-                    "saving_accounts": saving_accounts,
-                    "checking_account": checking_account,
-                    "job": job,
-                },
+            fused = _parse_mcp_payload(await self.mcp.call_tool("analyze_risk_with_dti", arguments=risk_arguments))
+            if "dti_ratio" in fused:
+                dti = fused.pop("dti_ratio")
+                ml_result = fused
+        except Exception:
+            pass
+
+        if ml_result is None:
+            # Servidor sem a tool combinada: as duas chamadas são independentes e seguem em paralelo.
+            ml_payload, dti_payload = await asyncio.gather(
+                self.mcp.call_tool("analyze_risk", arguments=risk_arguments),
+                self.mcp.call_tool(
+                    "calculate_debt_ratio",
+                    arguments={"income": income_f, "loan_amount": loan_amount_f},
+                ),
+                return_exceptions=True,
             )
-            ml_result = _parse_mcp_payload(ml_result_str)
-        except Exception as e:
-            mcp_error = e
+            if not isinstance(ml_payload, BaseException):
+                ml_result = _parse_mcp_payload(ml_payload)
+            if not isinstance(dti_payload, BaseException):
+                dti = dti_payload
 
         needs_local_fallback = (
             ml_result is None
@@ -125,11 +151,9 @@ class RiskAnalystAgent:
                 }
 
         try:
-            dti_str = await self.mcp.call_tool(
-                "calculate_debt_ratio",
-                arguments={"income": income_f, "loan_amount": loan_amount_f},
-            )
-            dti = float(dti_str)
+            dti = _parse_dti_payload(dti)
+            if dti < 0:
+                raise ValueError("DTI inválido retornado pelo MCP")
         except Exception:
             try:
                 dti = float(calculate_dti(income_f, loan_amount_f))
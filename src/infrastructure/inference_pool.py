@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import concurrent.futures
+import os
+import threading
+import time
+
+BACKEND_THREAD = "thread"
+BACKEND_PROCESS = "process"
+
+
+def warm_worker() -> None:
+    """Initializer de processos de inferência: carrega o modelo antes do primeiro pedido."""
+    from src.tools.ml_tools import predict_credit_risk
+
+    try:
+        predict_credit_risk(30, 5000.0, 10000.0, 24, 750)
+    except Exception:
+        pass
+
+
+def _timed_call(fn, args, kwargs):
+    started_at = time.time()
+    return started_at, fn(*args, **kwargs)
+
+
+class InferencePool:
+    """Executor de inferência configurável (threads ou processos) com métricas de fila."""
+
+    def __init__(self, backend: str | None = None, workers: int | None = None, *, window: int = 1024):
+        backend = (backend or os.environ.get("MCP_INFERENCE_BACKEND", BACKEND_THREAD)).strip().lower()
+        if backend not in (BACKEND_THREAD, BACKEND_PROCESS):
+            raise ValueError(f"Backend de inferência desconhecido: {backend} (use '{BACKEND_THREAD}' ou '{BACKEND_PROCESS}')")
+        if workers is None:
+            workers = int(os.environ.get("MCP_INFERENCE_WORKERS", "0")) or (os.cpu_count() or 1)
+
+        self.backend = backend
+        self.workers = max(1, int(workers))
+        if backend == BACKEND_PROCESS:
+            # Cada worker carrega o modelo uma vez no initializer.
+            self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker)
+        else:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="inference"
+            )
+
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._outstanding: set[concurrent.futures.Future] = set()
+        self._wait_ms: collections.deque[float] = collections.deque(maxlen=window)
+        self._run_ms: collections.deque[float] = collections.deque(maxlen=window)
+
+    async def run(self, fn, *args, **kwargs):
+        submitted_at = time.time()
+        future = self._executor.submit(_timed_call, fn, args, kwargs)
+        with self._lock:
+            self._submitted += 1
+            self._outstanding.add(future)
+        try:
+            started_at, result = await asyncio.wrap_future(future)
+        except BaseException:
+            with self._lock:
+                self._outstanding.discard(future)
+                self._completed += 1
+                self._failed += 1
+            raise
+
+        finished_at = time.time()
+        with self._lock:
+            self._outstanding.discard(future)
+            self._completed += 1
+            self._wait_ms.append(max(0.0, started_at - submitted_at) * 1000.0)
+            self._run_ms.append(max(0.0, finished_at - started_at) * 1000.0)
+        return result
+
+    @staticmethod
+    def _percentile(values: list[float], q: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        idx = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            in_flight = self._submitted - self._completed
+            # Futures ainda não iniciados esperam na fila do executor (no backend de processos,
+            # os já enviados ao call queue contam como em execução).
+            queue_depth = sum(1 for future in self._outstanding if not future.running() and not future.done())
+            wait_ms = list(self._wait_ms)
+            run_ms = list(self._run_ms)
+            submitted, completed, failed = self._submitted, self._completed, self._failed
+
+        return {
+            "backend": self.backend,
+            "workers": self.workers,
+            "in_flight": in_flight,
+            "queue_depth": queue_depth,
+            "submitted": submitted,
+            "completed": completed,
+            "failed": failed,
+            "wait_ms_avg": (sum(wait_ms) / len(wait_ms)) if wait_ms else 0.0,
+            "wait_ms_p95": self._percentile(wait_ms, 0.95),
+            "wait_ms_max": max(wait_ms) if wait_ms else 0.0,
+            "run_ms_avg": (sum(run_ms) / len(run_ms)) if run_ms else 0.0,
+            "run_ms_p95": self._percentile(run_ms, 0.95),
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
@@ -3,9 +3,15 @@ import os
 import contextlib
 import asyncio
 import datetime
+import logging
+import threading
+
+import anyio
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+logger = logging.getLogger(__name__)
+
 
 class MCPToolTimeoutError(TimeoutError):
     pass
@@ -64,7 +70,156 @@ class RealMCPClient:
                 f"Timeout chamando tool '{tool_name}' após {self.tool_timeout_s:.1f}s"
             ) from e
         
+        # Tools com schema de saída entregam o payload já tipado; só servidores antigos caem no texto.
+        if result.structuredContent is not None and not result.isError:
+            return result.structuredContent
+
         if not result.content:
             return "Erro: Retorno vazio da ferramenta."
             
-        return result.content[0].text
\ No newline at end of file
+        return result.content[0].text
+
+
+class ManagedMCPClient:
+    """Sessão MCP de longa duração: sobe uma vez, faz health-check e reinicia se o servidor cair.
+
+    Um único task supervisor é dono do subprocesso (o contexto do stdio_client precisa ser
+    aberto e fechado pelo mesmo task); chamadas concorrentes de call_tool são multiplexadas
+    na mesma ClientSession.
+    """
+
+    # Só falhas de transporte reiniciam a sessão; erros da tool (McpError etc.) sobem para quem chamou.
+    _CONNECTION_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream)
+    # Tools só de leitura podem ser repetidas após a reconexão; uma escrita (ex.: log_application_attempt)
+    # pode já ter sido aplicada pelo servidor e não é reenviada.
+    _RETRYABLE_TOOLS = frozenset(
+        {"get_client_cpf", "calculate_debt_ratio", "analyze_risk", "analyze_risk_with_dti", "inference_metrics"}
+    )
+
+    def __init__(
+        self,
+        *,
+        init_timeout_s: float = 10.0,
+        tool_timeout_s: float = 10.0,
+        health_interval_s: float = 30.0,
+        restart_backoff_s: float = 1.0,
+    ):
+        self._client = RealMCPClient(init_timeout_s=init_timeout_s, tool_timeout_s=tool_timeout_s)
+        self.health_interval_s = float(os.environ.get("MCP_HEALTH_INTERVAL_S", health_interval_s))
+        self.restart_backoff_s = float(restart_backoff_s)
+        self.restarts = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._supervisor: asyncio.Task | None = None
+        self._ready: asyncio.Event | None = None
+        self._restart_requested: asyncio.Event | None = None
+        self._stopping = False
+
+    @property
+    def session(self):
+        return self._client.session
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._supervisor is not None and self._loop is loop and not self._supervisor.done():
+            return
+        self._loop = loop
+        self._stopping = False
+        self._ready = asyncio.Event()
+        self._restart_requested = asyncio.Event()
+        self._supervisor = loop.create_task(self._supervise(), name="mcp-session-supervisor")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._restart_requested is not None:
+            self._restart_requested.set()
+        if self._supervisor is not None:
+            with contextlib.suppress(Exception):
+                await self._supervisor
+        self._supervisor = None
+
+    def request_restart(self) -> None:
+        if self._ready is not None:
+            self._ready.clear()
+        if self._restart_requested is not None:
+            self._restart_requested.set()
+
+    async def _supervise(self) -> None:
+        started_once = False
+        while not self._stopping:
+            try:
+                async with self._client.run_session():
+                    if started_once:
+                        self.restarts += 1
+                    started_once = True
+                    self._restart_requested.clear()
+                    self._ready.set()
+                    await self._monitor()
+            except Exception as e:
+                logger.warning(f"Sessão MCP encerrada com erro: {e}")
+            finally:
+                self._ready.clear()
+            if not self._stopping:
+                await asyncio.sleep(self.restart_backoff_s)
+
+    async def _monitor(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._restart_requested.wait(), timeout=self.health_interval_s)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await asyncio.wait_for(self._client.session.send_ping(), timeout=self._client.tool_timeout_s)
+            except Exception as e:
+                logger.warning(f"Health-check MCP falhou, reiniciando sessão: {e}")
+                return
+
+    async def _wait_ready(self) -> None:
+        await self.start()
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=self._client.init_timeout_s)
+        except asyncio.TimeoutError as e:
+            raise TimeoutError(
+                f"Sessão MCP compartilhada não ficou pronta em {self._client.init_timeout_s:.1f}s"
+            ) from e
+
+    async def call_tool(self, tool_name, arguments):
+        await self._wait_ready()
+        try:
+            return await self._client.call_tool(tool_name, arguments)
+        except self._CONNECTION_ERRORS as e:
+            logger.warning(f"Conexão MCP perdida em '{tool_name}', reiniciando sessão: {e}")
+            self.request_restart()
+            if tool_name not in self._RETRYABLE_TOOLS:
+                raise
+
+        await self._wait_ready()
+        return await self._client.call_tool(tool_name, arguments)
+
+
+_shared_client: ManagedMCPClient | None = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_mcp_client() -> ManagedMCPClient:
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = ManagedMCPClient()
+    return _shared_client
+
+
+@contextlib.asynccontextmanager
+async def shared_mcp_session(app=None):
+    """Sobe a sessão compartilhada e encerra o subprocesso na saída.
+
+    Para quem usa o RiskAnalystAgent: serve de lifespan de um servidor web (recebe o app) e de
+    `async with` em scripts. O orquestrador pontua localmente e não abre a sessão.
+    """
+    client = get_shared_mcp_client()
+    await client.start()
+    try:
+        yield
+    finally:
+        await client.stop()
@@ -20,9 +20,12 @@ def print(*args, **kwargs):
 builtins.print = print
 
 
-import json
-import concurrent.futures
+import asyncio
 import traceback
+from typing import Any, Optional
+
+# pydantic exige o TypedDict do typing_extensions em Python < 3.12.
+from typing_extensions import NotRequired, TypedDict
 
 _PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 if _PROJECT_ROOT not in sys.path:
@@ -43,13 +46,65 @@ except Exception:
 
 
 from mcp.server.fastmcp import FastMCP
-from src.tools.db_tools import get_client_data, log_application_attempt
-from src.tools.ml_tools import predict_credit_risk
+from src.infrastructure.inference_pool import InferencePool
+from src.infrastructure.prediction_batcher import PredictionBatcher
+from src.tools.db_tools import get_client_data, log_application_attempt, setup_database
+from src.tools.ml_tools import predict_credit_risk, predict_credit_risk_batch
 from src.tools.utils import calculate_dti
 
 mcp = FastMCP("CreditRiskTools")
 
-_PREDICT_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+class ClientRecord(TypedDict):
+    id: int
+    name: Optional[str]
+    cpf: Optional[str]
+    income: Optional[float]
+    age: Optional[int]
+    score: Optional[int]
+    sex: Optional[str]
+    job: Optional[int]
+    housing: Optional[str]
+    saving_accounts: Optional[str]
+    checking_account: Optional[str]
+    row_version: Optional[int]
+
+
+# Campos NotRequired viram default None no schema gerado; por isso também são Optional.
+class ClientLookupResult(TypedDict):
+    found: bool
+    client: Optional[ClientRecord]
+    error: NotRequired[Optional[str]]
+
+
+class DebtRatioResult(TypedDict):
+    dti_ratio: float
+
+
+class RiskResult(TypedDict):
+    status: str
+    risk_probability: float
+    risk_prediction: NotRequired[Optional[int]]
+    error_msg: NotRequired[Optional[str]]
+
+
+class RiskWithDtiResult(RiskResult):
+    dti_ratio: float
+
+
+_PREDICT_TIMEOUT_S = float(os.environ.get("MCP_PREDICT_TIMEOUT_S", "20"))
+_INFERENCE_POOL = InferencePool()
+_BATCHER = PredictionBatcher(
+    predict_credit_risk_batch,
+    runner=_INFERENCE_POOL.run,
+    max_concurrent_batches=_INFERENCE_POOL.workers,
+)
+
+# Bancos criados antes das migrações (ex.: database/bank_system.db versionado) precisam das colunas novas.
+try:
+    setup_database()
+except Exception:
+    traceback.print_exc()
 
 try:
     predict_credit_risk(30, 5000.0, 10000.0, 24, 750)
@@ -57,22 +112,96 @@ except Exception:
     pass
 
 @mcp.tool()
-def get_client_cpf(cpf: str) -> str:
+def get_client_cpf(cpf: str) -> ClientLookupResult:
     try:
         result = get_client_data(cpf)
-        return str(result) if result else "Not Found"
+        return {"found": result is not None, "client": result}
     except Exception as e:
-        return f"ERROR in get_client_cpf: {str(e)}"
+        return {"found": False, "client": None, "error": f"ERROR in get_client_cpf: {str(e)}"}
 
 @mcp.tool()
-def calculate_debt_ratio(income: float, loan_amount: float) -> float:
+def calculate_debt_ratio(income: float, loan_amount: float) -> DebtRatioResult:
+    try:
+        return {"dti_ratio": calculate_dti(income, loan_amount)}
+    except Exception as e:
+        return {"dti_ratio": -1.0}
+
+async def _score_risk(
+    *,
+    age: int,
+    income: float,
+    loan_amount: float,
+    duration: int,
+    score: int,
+    purpose: str,
+    sex: str,
+    housing: str,
+    saving_accounts: str,
+    checking_account: str,
+    job: int,
+) -> RiskResult:
     try:
-        return calculate_dti(income, loan_amount)
+        return await asyncio.wait_for(
+            _BATCHER.submit(
+                {
+                    "age": int(age),
+                    "income": float(income),
+                    "loan_amount": float(loan_amount),
+                    "duration": int(duration),
+                    "history_score": int(score),
+                    "purpose": purpose,
+                    "sex": sex,
+                    "housing": housing,
+                    "saving_accounts": saving_accounts,
+                    "checking_account": checking_account,
+                    "job": job,
+                }
+            ),
+            timeout=_PREDICT_TIMEOUT_S,
+        )
+    except asyncio.TimeoutError:
+        return {
+            "status": "ERROR",
+            "risk_probability": 0.0,
+            "error_msg": f"Timeout interno na inferência do modelo ({_PREDICT_TIMEOUT_S:.0f}s)",
+        }
     except Exception as e:
-        return -1.0
+        return {
+            "status": "ERROR", 
+            "risk_probability": 0.0, 
+            "error_msg": str(e)
+        }
+
+@mcp.tool()
+async def analyze_risk(
+    age: int,
+    income: float,
+    loan_amount: float,
+    duration: int,
+    score: int,
+    purpose: str = "radio/TV",
+    sex: str = "male",
+    housing: str = "own",
+    saving_accounts: str = "no_inf",
+    checking_account: str = "no_inf",
+    job: int = 1,
+) -> RiskResult:
+    return await _score_risk(
+        age=age,
+        income=income,
+        loan_amount=loan_amount,
+        duration=duration,
+        score=score,
+        purpose=purpose,
+        sex=sex,
+        housing=housing,
+        saving_accounts=saving_accounts,
+        checking_account=checking_account,
+        job=job,
+    )
 
 @mcp.tool()
-def analyze_risk(
+async def analyze_risk_with_dti(
     age: int,
     income: float,
     loan_amount: float,
@@ -84,40 +213,32 @@ def analyze_risk(
     saving_accounts: str = "no_inf",
     checking_account: str = "no_inf",
     job: int = 1,
-) -> str:
+) -> RiskWithDtiResult:
+    """Resultado do modelo e DTI em uma única chamada."""
+    result = await _score_risk(
+        age=age,
+        income=income,
+        loan_amount=loan_amount,
+        duration=duration,
+        score=score,
+        purpose=purpose,
+        sex=sex,
+        housing=housing,
+        saving_accounts=saving_accounts,
+        checking_account=checking_account,
+        job=job,
+    )
     try:
-        future = _PREDICT_EXECUTOR.submit(
-            predict_credit_risk,
-            int(age),
-            float(income),
-            float(loan_amount),
-            int(duration),
-            int(score),
-            purpose=purpose,
-            sex=sex,
-            housing=housing,
-            saving_accounts=saving_accounts,
-            checking_account=checking_account,
-            job=job,
-        )
+        dti = calculate_dti(float(income), float(loan_amount))
+    except Exception:
+        dti = -1.0
+    return {**result, "dti_ratio": dti}
 
-        result = future.result(timeout=20.0)
-        return json.dumps(result, ensure_ascii=False)
-    except concurrent.futures.TimeoutError:
-        return json.dumps(
-            {
-                "status": "ERROR",
-                "risk_probability": 0.0,
-                "error_msg": "Timeout interno na inferência do modelo (20s)",
-            },
-            ensure_ascii=False,
-        )
-    except Exception as e:
-        return json.dumps({
-            "status": "ERROR", 
-            "risk_probability": 0.0, 
-            "error_msg": str(e)
-        }, ensure_ascii=False)
+@mcp.tool()
+def inference_metrics() -> dict[str, Any]:
+    pool, batching = _INFERENCE_POOL.metrics(), _BATCHER.metrics()
+    # O batcher limita os lotes em execução; quem espera está no pending dele, não no executor.
+    return {**pool, "queue_depth": pool["queue_depth"] + batching["pending"], "batching": batching}
 
 if __name__ == "__main__":
     mcp.run()
\ No newline at end of file
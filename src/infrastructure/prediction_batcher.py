@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable
+
+
+async def _run_inline(fn, *args, **kwargs):
+    return fn(*args, **kwargs)
+
+
+class PredictionBatcher:
+    """Agrupa chamadas concorrentes de scoring em um único predict em lote.
+
+    Um lote é disparado quando atinge `max_batch_size` itens ou quando o primeiro item
+    espera `max_wait_ms`; cada chamador recebe o resultado da sua linha. Enquanto
+    `max_concurrent_batches` lotes estão em execução, novos pedidos (mesmo lotes cheios)
+    continuam acumulando e saem nos lotes seguintes, em vez de enfileirar atrás dos workers ocupados.
+    Pedidos cujo chamador desistiu (timeout/cancelamento) são descartados antes do envio.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[list[dict]], list[dict]],
+        *,
+        runner: Callable[..., Awaitable[Any]] | None = None,
+        max_batch_size: int | None = None,
+        max_wait_ms: float | None = None,
+        max_concurrent_batches: int = 1,
+    ):
+        self.score_batch = score_batch
+        self.runner = runner or _run_inline
+        self.max_batch_size = max(1, int(max_batch_size or os.environ.get("MCP_BATCH_MAX_SIZE", "64")))
+        self.max_wait_s = float(max_wait_ms if max_wait_ms is not None else os.environ.get("MCP_BATCH_MAX_WAIT_MS", "2")) / 1000.0
+        self.max_concurrent_batches = max(1, int(max_concurrent_batches))
+
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._in_flight = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.max_seen_batch = 0
+
+    async def submit(self, record: dict) -> dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((record, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_s, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pending = [item for item in self._pending if not item[1].done()]
+        # Workers ocupados: o restante parte assim que um deles liberar (ver _run_batch).
+        while self._pending and self._in_flight < self.max_concurrent_batches:
+            batch = self._pending[: self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size :]
+            self.batches += 1
+            self.items += len(batch)
+            self.max_seen_batch = max(self.max_seen_batch, len(batch))
+
+            self._in_flight += 1
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        try:
+            await self._score(batch)
+        finally:
+            self._in_flight -= 1
+            if self._pending:
+                self._flush()
+
+    async def _score(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        records = [record for record, _ in batch]
+        try:
+            results = await self.runner(self.score_batch, records)
+        except Exception as batch_error:
+            if len(batch) == 1:
+                self._settle(batch[0][1], error=batch_error)
+                return
+            # Um registro inválido não deve derrubar o lote inteiro: reavalia um a um.
+            for record, future in batch:
+                try:
+                    result = (await self.runner(self.score_batch, [record]))[0]
+                except Exception as e:
+                    self._settle(future, error=e)
+                else:
+                    self._settle(future, result=result)
+            return
+
+        for (_, future), result in zip(batch, results):
+            self._settle(future, result=result)
+
+    @staticmethod
+    def _settle(future: asyncio.Future, *, result: Any = None, error: BaseException | None = None) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def metrics(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_s * 1000.0,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": (self.items / self.batches) if self.batches else 0.0,
+            "max_seen_batch": self.max_seen_batch,
+            "pending": len(self._pending),
+            "in_flight_batches": self._in_flight,
+        }
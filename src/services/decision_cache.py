@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import collections
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Campos do pedido que determinam a decisão; o resto (nome, id...) não entra na chave.
+KEY_FIELDS = (
+    "cpf",
+    "loan_amount",
+    "duration",
+    "purpose",
+    "age",
+    "score",
+    "income",
+    "sex",
+    "job",
+    "housing",
+    "saving_accounts",
+    "checking_account",
+)
+
+# Só negações: uma aprovação emite contrato (protocolo novo e registro APPROVED), então o reenvio
+# de um pedido aprovado passa de novo pelo emissor.
+CACHEABLE_STATUSES = ("NEGADO",)
+
+
+def _normalize(field: str, value):
+    if value is None:
+        return None
+    if field in ("loan_amount", "income"):
+        return round(float(value), 2)
+    if field in ("duration", "age", "score", "job"):
+        return int(value)
+    return str(value).strip()
+
+
+def decision_key(request: dict, *, model_version: str, row_version: int) -> str:
+    """Chave por conteúdo: pedido normalizado + versão do modelo + versão da linha do cliente."""
+    payload = {field: _normalize(field, request.get(field)) for field in KEY_FIELDS}
+    payload["model_version"] = model_version
+    payload["row_version"] = int(row_version)
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class DecisionCache:
+    """Cache de decisões com TTL + LRU; `ttl_s <= 0` ou `max_entries <= 0` desativa."""
+
+    def __init__(self, max_entries: int | None = None, ttl_s: float | None = None, *, clock=time.monotonic):
+        if max_entries is None:
+            max_entries = int(os.environ.get("DECISION_CACHE_MAX_ENTRIES", "1024"))
+        if ttl_s is None:
+            ttl_s = float(os.environ.get("DECISION_CACHE_TTL_S", "300"))
+        self.max_entries = int(max_entries)
+        self.ttl_s = float(ttl_s)
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._entries: collections.OrderedDict[str, tuple[float, str, dict]] = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_s > 0
+
+    def get(self, key: str) -> dict | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, _, result = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(result)
+
+    def put(self, key: str, cpf: str, result: dict) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_s, str(cpf), copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_client(self, cpf: str) -> int:
+        with self._lock:
+            stale = [key for key, (_, entry_cpf, _) in self._entries.items() if entry_cpf == str(cpf)]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_shared_cache: DecisionCache | None = None
+_shared_lock = threading.Lock()
+
+
+def get_decision_cache() -> DecisionCache:
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = DecisionCache()
+    return _shared_cache
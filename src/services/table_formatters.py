@@ -31,6 +31,13 @@ def applications_to_table(apps: list[dict]) -> list[list]:
             a.get("status"),
             a.get("reason"),
             a.get("created_at"),
+            a.get("cached"),
+            a.get("model_version"),
         ]
         for a in apps
     ]
+
+
+def page_label(page_cursors: list, next_cursor) -> str:
+    more = "" if next_cursor else " (última)"
+    return f"Página {len(page_cursors)}{more}"
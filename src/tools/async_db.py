@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import functools
+import os
+import queue
+import threading
+
+from src.tools import db_tools
+from src.tools.audit_writer import get_audit_writer
+
+
+class AsyncRepository:
+    """API assíncrona sobre db_tools: o I/O do SQLite roda fora do event loop.
+
+    Tentativas de crédito vão para o AuditWriter (write-behind em lotes); demais escritas passam
+    por uma thread dedicada. Leituras usam um pequeno pool, já que o WAL permite leitores concorrentes.
+    Cada thread usa a própria conexão persistente do pool de db_tools.
+    """
+
+    def __init__(self, read_workers: int | None = None):
+        if read_workers is None:
+            read_workers = int(os.environ.get("DB_ASYNC_READ_WORKERS", "4"))
+        self.read_workers = max(1, int(read_workers))
+        self._reader = concurrent.futures.ThreadPoolExecutor(max_workers=self.read_workers, thread_name_prefix="db-read")
+        self._writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write")
+
+    async def _run(self, executor, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+    async def read(self, fn, *args, **kwargs):
+        return await self._run(self._reader, fn, *args, **kwargs)
+
+    async def write(self, fn, *args, **kwargs):
+        return await self._run(self._writer, fn, *args, **kwargs)
+
+    async def get_client_data(self, cpf):
+        return await self.read(db_tools.get_client_data, cpf)
+
+    async def get_client_row_version(self, cpf) -> int | None:
+        return await self.read(db_tools.get_client_row_version, cpf)
+
+    async def list_clients(self) -> list[dict]:
+        return await self.read(db_tools.list_clients)
+
+    async def list_applications(self, **filters) -> list[dict]:
+        return await self.read(db_tools.list_applications, **filters)
+
+    async def log_application_attempt(self, *, sync: bool | None = None, **kwargs):
+        """Registra via write-behind; com `sync` (ou AUDIT_SYNC) só retorna após o commit."""
+        writer = get_audit_writer()
+        if not (writer.sync if sync is None else sync):
+            try:
+                writer.submit(kwargs, sync=False, block=False)
+                return True
+            except queue.Full:
+                pass
+        # Fila cheia ou escrita síncrona: a espera acontece na thread de escrita, não no loop.
+        await self.write(writer.submit, kwargs, sync=sync)
+        return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._writer.shutdown(wait=wait)
+        self._reader.shutdown(wait=wait)
+
+
+_shared_repository: AsyncRepository | None = None
+_shared_lock = threading.Lock()
+
+
+def get_async_repository() -> AsyncRepository:
+    global _shared_repository
+    if _shared_repository is None:
+        with _shared_lock:
+            if _shared_repository is None:
+                _shared_repository = AsyncRepository()
+    return _shared_repository
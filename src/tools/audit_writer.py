@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from src.tools import db_tools
+
+logger = logging.getLogger(__name__)
+
+
+class _Pending:
+    __slots__ = ("path", "row", "done", "error")
+
+    def __init__(self, path: str, row: tuple, done: threading.Event | None):
+        self.path = path
+        self.row = row
+        self.done = done
+        self.error: BaseException | None = None
+
+
+class _Barrier:
+    __slots__ = ("done", "stop")
+
+    def __init__(self, stop: bool = False):
+        self.done = threading.Event()
+        self.stop = stop
+
+
+def _env_flag(name: str, default: str = "0") -> bool:
+    return os.environ.get(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+class AuditWriter:
+    """Gravação write-behind das tentativas em `applications`.
+
+    Os registros entram em uma fila limitada (cheia = o chamador espera) e uma thread os grava
+    em lotes com `executemany`, um commit por lote, ao atingir `batch_size` ou `flush_interval_ms`.
+    Com `sync=True` (por chamada ou via AUDIT_SYNC), `submit` só retorna depois do commit
+    (ou levanta TimeoutError após `sync_timeout_s`).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_queue: int | None = None,
+        batch_size: int | None = None,
+        flush_interval_ms: float | None = None,
+        sync: bool | None = None,
+        sync_timeout_s: float | None = None,
+    ):
+        self.max_queue = int(max_queue or os.environ.get("AUDIT_QUEUE_MAX", "10000"))
+        self.batch_size = max(1, int(batch_size or os.environ.get("AUDIT_BATCH_SIZE", "256")))
+        if flush_interval_ms is None:
+            flush_interval_ms = float(os.environ.get("AUDIT_FLUSH_INTERVAL_MS", "50"))
+        self.flush_interval_s = max(0.0, float(flush_interval_ms)) / 1000.0
+        self.sync = _env_flag("AUDIT_SYNC") if sync is None else bool(sync)
+        if sync_timeout_s is None:
+            sync_timeout_s = float(os.environ.get("AUDIT_SYNC_TIMEOUT_S", "30"))
+        self.sync_timeout_s = float(sync_timeout_s)
+
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_queue)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: dict, *, sync: bool | None = None, block: bool = True) -> None:
+        """Enfileira um registro; `block=False` levanta queue.Full em vez de esperar espaço."""
+        row = db_tools.application_row(**record)
+        sync = self.sync if sync is None else sync
+        item = _Pending(os.path.abspath(db_tools.DB_PATH), row, threading.Event() if sync else None)
+        # Mesmo lock de close(): um registro ou entra na fila antes da barreira de parada, ou vê a fila fechada.
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._queue.put(item, block=block)
+        if closed:
+            db_tools.log_application_attempts([row])
+            return
+        if item.done is not None:
+            if not item.done.wait(self.sync_timeout_s):
+                raise TimeoutError(
+                    f"Gravação da tentativa não confirmada em {self.sync_timeout_s:.1f}s; o registro segue na fila."
+                )
+            if item.error is not None:
+                raise item.error
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Espera a gravação de tudo que foi enfileirado antes desta chamada."""
+        barrier = _Barrier()
+        with self._lock:
+            if self._closed or not self._thread.is_alive():
+                return True
+            self._queue.put(barrier)
+        return barrier.done.wait(timeout)
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """Descarrega a fila e encerra a thread; submits posteriores gravam direto."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._thread.is_alive():
+            barrier = _Barrier(stop=True)
+            self._queue.put(barrier)
+            barrier.done.wait(timeout)
+
+        # Registros enfileirados durante o fechamento.
+        leftovers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _Pending):
+                leftovers.append(item)
+            elif item.done is not None:
+                item.done.set()
+        if leftovers:
+            self._write(leftovers)
+            for item in leftovers:
+                if item.done is not None:
+                    item.done.set()
+
+    def _collect(self, first) -> list:
+        batch = [first]
+        if first.done is not None:
+            return batch
+        deadline = time.monotonic() + self.flush_interval_s
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            # Barreiras e escritas síncronas não esperam a janela de tempo.
+            if item.done is not None:
+                break
+        return batch
+
+    def _write(self, records: list[_Pending]) -> None:
+        by_path: dict[str, list[_Pending]] = {}
+        for record in records:
+            by_path.setdefault(record.path, []).append(record)
+
+        for path, group in by_path.items():
+            try:
+                db_tools.log_application_attempts([r.row for r in group], path=path)
+            except Exception as e:
+                logger.exception("Audit writer failed to persist %d application attempts", len(group))
+                self.failed += len(group)
+                for record in group:
+                    record.error = e
+            else:
+                self.written += len(group)
+            self.batches += 1
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect(self._queue.get())
+            records = [item for item in batch if isinstance(item, _Pending)]
+            if records:
+                self._write(records)
+
+            stop = False
+            for item in batch:
+                if item.done is not None:
+                    item.done.set()
+                if isinstance(item, _Barrier) and item.stop:
+                    stop = True
+            if stop:
+                return
+
+    def metrics(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": self.flush_interval_s * 1000.0,
+            "sync": self.sync,
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+        }
+
+
+_shared_writer: AuditWriter | None = None
+_shared_lock = threading.Lock()
+
+
+def _flush_shared_writer() -> None:
+    if _shared_writer is not None:
+        _shared_writer.flush()
+
+
+def _close_shared_writer() -> None:
+    if _shared_writer is not None:
+        _shared_writer.close()
+
+
+def get_audit_writer() -> AuditWriter:
+    global _shared_writer
+    if _shared_writer is None:
+        with _shared_lock:
+            if _shared_writer is None:
+                _shared_writer = AuditWriter()
+                db_tools.set_pending_writes_hook(_flush_shared_writer)
+                atexit.register(_close_shared_writer)
+    return _shared_writer
@@ -0,0 +1,211 @@
+"""Importação em massa de clientes a partir de CSV ou Parquet.
+
+Uso: python -m src.tools.client_import carteira.csv [--chunk-size 50000] [--errors erros.csv] [--dry-run]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from src.tools import db_tools
+
+CHUNK_SIZE = int(os.environ.get("CLIENT_IMPORT_CHUNK_SIZE", "50000"))
+
+MIN_AGE = 18
+MAX_AGE = 120
+MIN_SCORE = 0
+MAX_SCORE = 1000
+
+SEX_CHOICES = ("male", "female")
+JOB_CHOICES = (0, 1, 2, 3)
+HOUSING_CHOICES = ("own", "free", "rent")
+SAVING_CHOICES = ("no_inf", "little", "moderate", "quite rich", "rich")
+CHECKING_CHOICES = ("no_inf", "little", "moderate", "rich")
+
+REQUIRED_COLUMNS = ("name", "cpf", "income", "age", "score")
+CATEGORY_COLUMNS = {
+    "sex": SEX_CHOICES,
+    "housing": HOUSING_CHOICES,
+    "saving_accounts": SAVING_CHOICES,
+    "checking_account": CHECKING_CHOICES,
+}
+# Perfil ausente ou vazio recebe os valores do backfill da migração 4: sem eles o cliente
+# importado nunca passaria pela análise (UI e batch_runner exigem o perfil completo).
+PROFILE_DEFAULTS = {"sex": "male", "job": 1, "housing": "own", "saving_accounts": "no_inf", "checking_account": "no_inf"}
+OPTIONAL_COLUMNS = tuple(PROFILE_DEFAULTS)
+# Aceita o nome da coluna do banco como sinônimo.
+COLUMN_ALIASES = {"credit_history_score": "score"}
+
+
+def iter_chunks(path: str, chunk_size: int | None = None) -> Iterator[pd.DataFrame]:
+    """Lê o arquivo em blocos de `chunk_size` linhas, sem carregá-lo inteiro na memória."""
+    chunk_size = max(1, int(chunk_size or CHUNK_SIZE))
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".parquet", ".pq"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Importar Parquet requer o pacote 'pyarrow'.") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+
+    # Tudo como texto: valores inválidos viram erro de linha, não falha de parsing do bloco.
+    yield from pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False, na_values=[""])
+
+
+def _normalize_cpf(values: pd.Series) -> pd.Series:
+    digits = values.astype("string").str.replace(r"\D", "", regex=True)
+    formatted = digits.str[:3] + "." + digits.str[3:6] + "." + digits.str[6:9] + "-" + digits.str[9:11]
+    return formatted.where(digits.str.len() == 11)
+
+
+def _text(values: pd.Series) -> pd.Series:
+    """Texto sem espaços nas bordas; vazio vira NA."""
+    stripped = values.astype("string").str.strip()
+    return stripped.mask(stripped == "")
+
+
+def validate_chunk(df: pd.DataFrame, first_row: int = 1) -> tuple[pd.DataFrame, list[dict]]:
+    """Valida um bloco com operações vetorizadas.
+
+    Retorna as linhas válidas já normalizadas (colunas na ordem do INSERT) e uma lista
+    `{"row", "cpf", "errors"}` para as rejeitadas; `row` é a posição no arquivo (1 = primeira linha de dados).
+    """
+    df = df.rename(columns={k: v for k, v in COLUMN_ALIASES.items() if k in df.columns and v not in df.columns})
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+
+    n = len(df)
+    rows = np.arange(first_row, first_row + n)
+    problems: list[tuple[np.ndarray, str]] = []
+
+    name = _text(df["name"])
+    problems.append((name.isna().to_numpy(), "nome vazio"))
+
+    cpf = _normalize_cpf(df["cpf"])
+    problems.append((cpf.isna().to_numpy(), "CPF inválido (esperado 11 dígitos)"))
+
+    income = pd.to_numeric(df["income"], errors="coerce")
+    problems.append(((income.isna() | (income < 0)).to_numpy(), "renda inválida"))
+
+    age = pd.to_numeric(df["age"], errors="coerce")
+    bad_age = age.isna() | (age % 1 != 0) | (age < MIN_AGE) | (age > MAX_AGE)
+    problems.append((bad_age.to_numpy(), f"idade fora de {MIN_AGE}-{MAX_AGE}"))
+
+    score = pd.to_numeric(df["score"], errors="coerce")
+    bad_score = score.isna() | (score % 1 != 0) | (score < MIN_SCORE) | (score > MAX_SCORE)
+    problems.append((bad_score.to_numpy(), f"score fora de {MIN_SCORE}-{MAX_SCORE}"))
+
+    columns = {}
+    for column in OPTIONAL_COLUMNS:
+        default = PROFILE_DEFAULTS[column]
+        if column not in df.columns:
+            columns[column] = pd.Series([default] * n, index=df.index, dtype="Int64" if column == "job" else "string")
+            continue
+        value = _text(df[column])
+        blank = value.isna()
+        if column == "job":
+            job = pd.to_numeric(value, errors="coerce")
+            bad = ~blank & ~job.isin(JOB_CHOICES)
+            problems.append((bad.to_numpy(), f"job fora de {list(JOB_CHOICES)}"))
+            columns[column] = job.astype("Int64").fillna(default)
+        else:
+            bad = ~blank & ~value.isin(CATEGORY_COLUMNS[column])
+            problems.append((bad.to_numpy(), f"{column} fora de {list(CATEGORY_COLUMNS[column])}"))
+            columns[column] = value.fillna(default)
+
+    invalid = np.zeros(n, dtype=bool)
+    for mask, _ in problems:
+        invalid |= mask
+
+    errors = []
+    if invalid.any():
+        raw_cpf = df["cpf"].astype("string").to_numpy()
+        for pos in np.flatnonzero(invalid):
+            errors.append(
+                {
+                    "row": int(rows[pos]),
+                    "cpf": None if pd.isna(raw_cpf[pos]) else str(raw_cpf[pos]),
+                    "errors": "; ".join(message for mask, message in problems if mask[pos]),
+                }
+            )
+
+    valid = pd.DataFrame(
+        {
+            "name": name,
+            "cpf": cpf,
+            "income": income.astype(float),
+            "age": age,
+            "score": score,
+            **columns,
+        }
+    )[~invalid]
+    valid = valid.astype({"age": "int64", "score": "int64"})
+    return valid, errors
+
+
+def _to_params(valid: pd.DataFrame) -> list[tuple]:
+    # object + None: o sqlite3 não aceita pd.NA nem tipos numpy.
+    frame = valid.astype(object).where(valid.notna(), None)
+    return list(frame.itertuples(index=False, name=None))
+
+
+def import_clients(path: str, *, chunk_size: int | None = None, dry_run: bool = False) -> dict:
+    """Importa clientes em blocos: validação vetorizada + upsert com um commit por bloco."""
+    db_tools.setup_database()
+    started = time.perf_counter()
+    total = imported = 0
+    errors: list[dict] = []
+
+    for chunk in iter_chunks(path, chunk_size):
+        valid, chunk_errors = validate_chunk(chunk, first_row=total + 1)
+        total += len(chunk)
+        errors.extend(chunk_errors)
+        if not dry_run:
+            imported += db_tools.upsert_clients(_to_params(valid))
+        else:
+            imported += len(valid)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": total,
+        "imported": imported,
+        "rejected": len(errors),
+        "errors": errors,
+        "dry_run": dry_run,
+        "elapsed_s": elapsed,
+        "rows_per_s": total / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Importa clientes em massa (CSV ou Parquet).")
+    parser.add_argument("path")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--errors", default=None, help="CSV de saída com as linhas rejeitadas")
+    parser.add_argument("--dry-run", action="store_true", help="só valida, sem gravar")
+    args = parser.parse_args(argv)
+
+    report = import_clients(args.path, chunk_size=args.chunk_size, dry_run=args.dry_run)
+    if args.errors:
+        pd.DataFrame(report["errors"], columns=["row", "cpf", "errors"]).to_csv(args.errors, index=False)
+
+    print(
+        f"linhas={report['rows']} importadas={report['imported']} rejeitadas={report['rejected']} "
+        f"tempo={report['elapsed_s']:.2f}s ({report['rows_per_s']:.0f} linhas/s)"
+        + (" [dry-run]" if report["dry_run"] else "")
+    )
+    for error in report["errors"][:10]:
+        print(f"  linha {error['row']}: {error['errors']}")
+    return 0 if report["rejected"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
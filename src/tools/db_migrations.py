@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+from typing import Callable
+
+
+def _ensure_columns(conn: sqlite3.Connection, table: str, columns: dict[str, str]) -> None:
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+    for col_name, col_type in columns.items():
+        if col_name in existing:
+            continue
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {col_name} {col_type}")
+
+
+def _create_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS clients (
+            id INTEGER PRIMARY KEY,
+            name TEXT,
+            cpf TEXT UNIQUE,
+            income REAL,
+            age INTEGER,
+            credit_history_score INTEGER,
+            sex TEXT,
+            job INTEGER,
+            housing TEXT,
+            saving_accounts TEXT,
+            checking_account TEXT
+        )
+    '''
+    )
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cpf TEXT,
+            client_id INTEGER,
+            amount REAL,
+            duration INTEGER,
+            purpose TEXT,
+            sex TEXT,
+            job INTEGER,
+            housing TEXT,
+            saving_accounts TEXT,
+            checking_account TEXT,
+            status TEXT,
+            reason TEXT,
+            created_at TEXT
+        )
+    '''
+    )
+
+
+def _add_profile_columns(conn: sqlite3.Connection) -> None:
+    _ensure_columns(
+        conn,
+        "clients",
+        {
+            "sex": "TEXT",
+            "job": "INTEGER",
+            "housing": "TEXT",
+            "saving_accounts": "TEXT",
+            "checking_account": "TEXT",
+        },
+    )
+    _ensure_columns(
+        conn,
+        "applications",
+        {
+            "purpose": "TEXT",
+            "sex": "TEXT",
+            "job": "INTEGER",
+            "housing": "TEXT",
+            "saving_accounts": "TEXT",
+            "checking_account": "TEXT",
+        },
+    )
+
+
+def _seed_demo_clients(conn: sqlite3.Connection) -> None:
+    if conn.execute('SELECT count(*) FROM clients').fetchone()[0] > 0:
+        return
+    data = [
+        (1, 'Alice Silva', '111.222.333-44', 5000.0, 30, 750, 'female', 1, 'own', 'moderate', 'little'),
+        (2, 'Bob Santos', '555.666.777-88', 2000.0, 20, 400, 'male', 0, 'rent', 'little', 'no_inf'),
+        (3, 'Charlie Souza', '999.888.777-66', 12000.0, 45, 800, 'male', 2, 'own', 'rich', 'moderate'),
+    ]
+    conn.executemany(
+        'INSERT INTO clients (id, name, cpf, income, age, credit_history_score, sex, job, housing, saving_accounts, checking_account) '
+        'VALUES (?,?,?,?,?,?,?,?,?,?,?)',
+        data,
+    )
+
+
+def _backfill_client_defaults(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        UPDATE clients
+        SET
+            sex = COALESCE(sex, 'male'),
+            job = COALESCE(job, 1),
+            housing = COALESCE(housing, 'own'),
+            saving_accounts = COALESCE(saving_accounts, 'no_inf'),
+            checking_account = COALESCE(checking_account, 'no_inf')
+        WHERE sex IS NULL OR job IS NULL OR housing IS NULL OR saving_accounts IS NULL OR checking_account IS NULL
+        """
+    )
+    conn.execute(
+        """
+        UPDATE clients
+        SET age = 30
+        WHERE (age IS NULL OR age < 0 OR age > 120)
+        """
+    )
+    conn.execute(
+        """
+        UPDATE clients
+        SET
+            age = 30,
+            sex = COALESCE(sex, 'male'),
+            job = 3,
+            housing = 'free',
+            saving_accounts = 'little',
+            checking_account = 'little'
+                WHERE cpf = '555.666.777-88'
+                    AND (
+                        age IS NULL OR age < 18 OR age > 120
+                        OR job IS NULL OR job != 3
+                        OR housing IS NULL OR housing != 'free'
+                        OR saving_accounts IS NULL OR saving_accounts != 'little'
+                        OR checking_account IS NULL OR checking_account != 'little'
+                    )
+        """
+    )
+
+
+def _add_row_version_and_cached_flag(conn: sqlite3.Connection) -> None:
+    _ensure_columns(conn, "clients", {"row_version": "INTEGER NOT NULL DEFAULT 1"})
+    _ensure_columns(conn, "applications", {"cached": "INTEGER NOT NULL DEFAULT 0"})
+
+
+def _add_application_indexes(conn: sqlite3.Connection) -> None:
+    # O rowid implícito no fim de cada índice permite paginar por (created_at, id) sem ordenar.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_applications_cpf_created ON applications (cpf, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_applications_status_created ON applications (status, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_applications_client_id ON applications (client_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_applications_created ON applications (created_at)")
+
+
+_CPF_DIGITS_SQL = "replace(replace({cpf}, '.', ''), '-', '')"
+
+
+def _add_client_search_index(conn: sqlite3.Connection) -> None:
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS clients_fts USING fts5(name, cpf, cpf_digits, tokenize='trigram')"
+        )
+    except sqlite3.OperationalError:
+        # SQLite sem FTS5/trigram (< 3.34): search_clients cai no LIKE.
+        return
+
+    new_digits = _CPF_DIGITS_SQL.format(cpf="new.cpf")
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS clients_fts_insert AFTER INSERT ON clients BEGIN
+            INSERT INTO clients_fts (rowid, name, cpf, cpf_digits) VALUES (new.id, new.name, new.cpf, {new_digits});
+        END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS clients_fts_update AFTER UPDATE OF name, cpf ON clients BEGIN
+            UPDATE clients_fts SET name = new.name, cpf = new.cpf, cpf_digits = {new_digits} WHERE rowid = old.id;
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS clients_fts_delete AFTER DELETE ON clients BEGIN
+            DELETE FROM clients_fts WHERE rowid = old.id;
+        END
+        """
+    )
+    conn.execute("DELETE FROM clients_fts")
+    conn.execute(
+        f"INSERT INTO clients_fts (rowid, name, cpf, cpf_digits) SELECT id, name, cpf, {_CPF_DIGITS_SQL.format(cpf='cpf')} FROM clients"
+    )
+
+
+def _add_application_model_version(conn: sqlite3.Connection) -> None:
+    _ensure_columns(conn, "applications", {"model_version": "TEXT"})
+
+
+# Migrações ordenadas e idempotentes: bancos antigos (sem schema_version) passam por todas com segurança.
+MIGRATIONS: list[tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "create_tables", _create_tables),
+    (2, "add_profile_columns", _add_profile_columns),
+    (3, "seed_demo_clients", _seed_demo_clients),
+    (4, "backfill_client_defaults", _backfill_client_defaults),
+    (5, "add_row_version_and_cached_flag", _add_row_version_and_cached_flag),
+    (6, "add_application_indexes", _add_application_indexes),
+    (7, "add_client_search_index", _add_client_search_index),
+    (8, "add_application_model_version", _add_application_model_version),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _ensure_version_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+        """
+    )
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if row is None:
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection) -> list[int]:
+    """Aplica as migrações pendentes; cada uma roda em sua própria transação."""
+    if current_version(conn) >= LATEST_VERSION:
+        return []
+
+    applied = []
+    for version, name, migrate in MIGRATIONS:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _ensure_version_table(conn)
+            # Relido sob o lock de escrita: outro processo pode ter migrado antes.
+            if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                conn.rollback()
+                continue
+            migrate(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                (version, name, datetime.now(timezone.utc).isoformat(timespec="seconds")),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
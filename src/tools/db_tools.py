@@ -1,148 +1,149 @@
 import sqlite3
 import os
-from datetime import datetime
+import re
+import threading
+import weakref
+from datetime import datetime, timezone
 
-DB_PATH = os.path.join(os.path.dirname(__file__), '../../database/bank_system.db')
+from src.tools.db_migrations import apply_migrations
 
+DB_PATH = os.environ.get("DB_PATH") or os.path.join(os.path.dirname(__file__), '../../database/bank_system.db')
 
-def _ensure_columns(conn: sqlite3.Connection, table: str, columns: dict[str, str]) -> None:
-    cursor = conn.cursor()
-    cursor.execute(f"PRAGMA table_info({table})")
-    existing = {row[1] for row in cursor.fetchall()}
-    for col_name, col_type in columns.items():
-        if col_name in existing:
-            continue
-        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {col_name} {col_type}")
-    conn.commit()
+STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", "256"))
+BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", "5000"))
 
-def _get_connection():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    f"PRAGMA synchronous={os.environ.get('DB_SYNCHRONOUS', 'NORMAL')}",
+    f"PRAGMA cache_size={int(os.environ.get('DB_CACHE_SIZE_KIB', '16384')) * -1}",
+    f"PRAGMA mmap_size={int(os.environ.get('DB_MMAP_SIZE', str(256 * 1024 * 1024)))}",
+    "PRAGMA temp_store=MEMORY",
+)
 
-def setup_database():
-    conn = _get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        '''
-        CREATE TABLE IF NOT EXISTS clients (
-            id INTEGER PRIMARY KEY,
-            name TEXT,
-            cpf TEXT UNIQUE,
-            income REAL,
-            age INTEGER,
-            credit_history_score INTEGER,
-            sex TEXT,
-            job INTEGER,
-            housing TEXT,
-            saving_accounts TEXT,
-            checking_account TEXT
-        )
-    '''
-    )
 
-    cursor.execute(
-        '''
-        CREATE TABLE IF NOT EXISTS applications (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            cpf TEXT,
-            client_id INTEGER,
-            amount REAL,
-            duration INTEGER,
-            purpose TEXT,
-            sex TEXT,
-            job INTEGER,
-            housing TEXT,
-            saving_accounts TEXT,
-            checking_account TEXT,
-            status TEXT,
-            reason TEXT,
-            created_at TEXT
+class _ThreadConnections:
+    """Conexões de uma thread; guardado no threading.local para ser coletado quando a thread termina."""
+
+    __slots__ = ("conns", "__weakref__")
+
+    def __init__(self):
+        self.conns: dict[str, sqlite3.Connection] = {}
+
+
+class _ConnectionPool:
+    """Uma conexão SQLite persistente por (thread, arquivo), com WAL e cache de statements.
+
+    As conexões de uma thread são fechadas quando ela termina, para que pools de threads
+    efêmeras (executors, servidores web) não acumulem descritores abertos.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(
+            path,
+            timeout=BUSY_TIMEOUT_MS / 1000.0,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
         )
-    '''
-    )
+        conn.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        with self._lock:
+            self._connections.append(conn)
+        return conn
 
-    _ensure_columns(
-        conn,
-        "clients",
-        {
-            "sex": "TEXT",
-            "job": "INTEGER",
-            "housing": "TEXT",
-            "saving_accounts": "TEXT",
-            "checking_account": "TEXT",
-        },
-    )
-    _ensure_columns(
-        conn,
-        "applications",
-        {
-            "purpose": "TEXT",
-            "sex": "TEXT",
-            "job": "INTEGER",
-            "housing": "TEXT",
-            "saving_accounts": "TEXT",
-            "checking_account": "TEXT",
-        },
-    )
+    def acquire(self, path: str) -> sqlite3.Connection:
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = _ThreadConnections()
+            weakref.finalize(holder, self._close_thread_connections, holder.conns)
+            self._local.holder = holder
+        conns = holder.conns
+        key = os.path.abspath(path)
+        conn = conns.get(key)
+        if conn is None:
+            conn = self._open(key)
+            # Processos que nunca chamam setup_database (ex.: servidor MCP) também recebem o schema atual.
+            try:
+                _ensure_migrated(conn, key)
+            except Exception:
+                self._discard(conn)
+                raise
+            conns[key] = conn
+        return conn
 
-    cursor.execute(
-        """
-        UPDATE clients
-        SET
-            sex = COALESCE(sex, 'male'),
-            job = COALESCE(job, 1),
-            housing = COALESCE(housing, 'own'),
-            saving_accounts = COALESCE(saving_accounts, 'no_inf'),
-            checking_account = COALESCE(checking_account, 'no_inf')
-        WHERE sex IS NULL OR job IS NULL OR housing IS NULL OR saving_accounts IS NULL OR checking_account IS NULL
-        """
-    )
-    conn.commit()
-
-    cursor.execute(
-        """
-        UPDATE clients
-        SET age = 30
-        WHERE (age IS NULL OR age < 0 OR age > 120)
-        """
-    )
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
 
-    cursor.execute(
-        """
-        UPDATE clients
-        SET
-            age = 30,
-            sex = COALESCE(sex, 'male'),
-            job = 3,
-            housing = 'free',
-            saving_accounts = 'little',
-            checking_account = 'little'
-                WHERE cpf = '555.666.777-88'
-                    AND (
-                        age IS NULL OR age < 18 OR age > 120
-                        OR job IS NULL OR job != 3
-                        OR housing IS NULL OR housing != 'free'
-                        OR saving_accounts IS NULL OR saving_accounts != 'little'
-                        OR checking_account IS NULL OR checking_account != 'little'
-                    )
-        """
-    )
-    conn.commit()
-    
-    cursor.execute('SELECT count(*) FROM clients')
-    if cursor.fetchone()[0] == 0:
-        data = [
-            (1, 'Alice Silva', '111.222.333-44', 5000.0, 30, 750, 'female', 1, 'own', 'moderate', 'little'),
-            (2, 'Bob Santos', '555.666.777-88', 2000.0, 20, 400, 'male', 0, 'rent', 'little', 'no_inf'),
-            (3, 'Charlie Souza', '999.888.777-66', 12000.0, 45, 800, 'male', 2, 'own', 'rich', 'moderate'),
-        ]
-        cursor.executemany('INSERT INTO clients VALUES (?,?,?,?,?,?,?,?,?,?,?)', data)
-        conn.commit()
-    
-    conn.close()
+    def _close_thread_connections(self, conns: dict[str, sqlite3.Connection]) -> None:
+        for conn in list(conns.values()):
+            try:
+                self._discard(conn)
+            except Exception:
+                pass
+        conns.clear()
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+
+    def close_all(self) -> None:
+        with self._lock:
+            conns, self._connections = self._connections, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+
+_pool = _ConnectionPool()
+_migrated_paths: set[str] = set()
+_migration_lock = threading.Lock()
+
+
+def _get_connection():
+    return _pool.acquire(DB_PATH)
+
+
+def _release_connection(conn: sqlite3.Connection) -> None:
+    _pool.release(conn)
+
+
+def close_connections() -> None:
+    _pool.close_all()
+    # O arquivo pode ser trocado depois de fechado: a próxima conexão confere as migrações de novo.
+    with _migration_lock:
+        _migrated_paths.clear()
+
+
+def _ensure_migrated(conn: sqlite3.Connection, key: str) -> None:
+    """Aplica as migrações pendentes uma única vez por processo e por arquivo de banco."""
+    if key in _migrated_paths:
+        return
+    with _migration_lock:
+        if key not in _migrated_paths:
+            try:
+                apply_migrations(conn)
+            finally:
+                _release_connection(conn)
+            _migrated_paths.add(key)
+
+
+def setup_database():
+    """Garante o schema atual em DB_PATH (as conexões do pool já migram na primeira abertura)."""
+    conn = _get_connection()
+    _ensure_migrated(conn, os.path.abspath(DB_PATH))
+    _release_connection(conn)
     return "Database setup complete."
 
 
@@ -186,33 +187,178 @@ def add_client(
     except Exception as e:
         return {"success": False, "message": f"Erro ao cadastrar cliente: {str(e)}"}
     finally:
-        conn.close()
+        _release_connection(conn)
+
 
+_IMPORT_COLUMNS = "name, cpf, income, age, credit_history_score, sex, job, housing, saving_accounts, checking_account"
 
-def list_clients() -> list[dict]:
+_UPSERT_CLIENTS_FROM_STAGING_SQL = f"""
+    INSERT INTO clients ({_IMPORT_COLUMNS})
+    SELECT {_IMPORT_COLUMNS} FROM temp.client_import_staging WHERE true
+    ON CONFLICT(cpf) DO UPDATE SET
+        name = excluded.name,
+        income = excluded.income,
+        age = excluded.age,
+        credit_history_score = excluded.credit_history_score,
+        sex = excluded.sex,
+        job = excluded.job,
+        housing = excluded.housing,
+        saving_accounts = excluded.saving_accounts,
+        checking_account = excluded.checking_account,
+        row_version = row_version + 1
+"""
+
+
+def upsert_clients(rows: list[tuple], path: str | None = None) -> int:
+    """Insere ou atualiza (por CPF) várias linhas na ordem de `_IMPORT_COLUMNS` em uma única transação.
+
+    As linhas passam por uma tabela temporária e entram com um único INSERT ... SELECT: o FTS5 descarrega
+    seu buffer a cada statement, então um upsert por linha reescreveria o índice de busca a cada cliente.
+    Atualizações incrementam `row_version`, invalidando decisões em cache do cliente.
+    """
+    if not rows:
+        return 0
+    conn = _pool.acquire(path or DB_PATH)
+    try:
+        with conn:
+            conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS client_import_staging ({_IMPORT_COLUMNS})")
+            conn.execute("DELETE FROM temp.client_import_staging")
+            conn.executemany("INSERT INTO temp.client_import_staging VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute(_UPSERT_CLIENTS_FROM_STAGING_SQL)
+            conn.execute("DELETE FROM temp.client_import_staging")
+    finally:
+        _release_connection(conn)
+    return len(rows)
+
+_CLIENT_COLUMNS = "id, name, cpf, income, age, credit_history_score, sex, job, housing, saving_accounts, checking_account"
+
+
+def _client_from_row(r) -> dict:
+    return {
+        "id": r["id"],
+        "name": r["name"],
+        "cpf": r["cpf"],
+        "income": r["income"],
+        "age": r["age"],
+        "score": r["credit_history_score"],
+        "sex": r["sex"],
+        "job": r["job"],
+        "housing": r["housing"],
+        "saving_accounts": r["saving_accounts"],
+        "checking_account": r["checking_account"],
+    }
+
+
+def list_clients(after_id: int | None = None, limit: int | None = None) -> list[dict]:
+    """Clientes por id crescente; `after_id` (último id da página anterior) pagina por keyset, `limit=None` traz tudo."""
+    sql = f"SELECT {_CLIENT_COLUMNS} FROM clients"
+    params: list = []
+    if after_id is not None:
+        sql += " WHERE id > ?"
+        params.append(int(after_id))
+    sql += " ORDER BY id ASC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(max(0, int(limit)))
     conn = _get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT id, name, cpf, income, age, credit_history_score, sex, job, housing, saving_accounts, checking_account FROM clients ORDER BY id ASC"
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        _release_connection(conn)
+    return [_client_from_row(r) for r in rows]
+
+
+# Abaixo do limite de variáveis por statement de qualquer versão do SQLite (999).
+_IN_BATCH_SIZE = 500
+
+
+def get_clients_by_cpf(cpfs, path: str | None = None) -> list[dict]:
+    """Busca vários clientes por CPF com consultas `IN` em blocos; CPFs inexistentes são ignorados."""
+    cpfs = list(dict.fromkeys(str(c) for c in cpfs))
+    conn = _pool.acquire(path or DB_PATH)
+    rows = []
+    try:
+        for start in range(0, len(cpfs), _IN_BATCH_SIZE):
+            batch = cpfs[start : start + _IN_BATCH_SIZE]
+            placeholders = ", ".join("?" * len(batch))
+            rows.extend(conn.execute(f"SELECT {_CLIENT_COLUMNS} FROM clients WHERE cpf IN ({placeholders})", batch))
+    finally:
+        _release_connection(conn)
+    return [_client_from_row(r) for r in rows]
+
+
+def iter_clients(batch_size: int = 10000, path: str | None = None):
+    """Percorre a tabela de clientes em páginas por id (keyset), sem carregá-la inteira."""
+    last_id = 0
+    while True:
+        conn = _pool.acquire(path or DB_PATH)
+        try:
+            rows = conn.execute(
+                f"SELECT {_CLIENT_COLUMNS} FROM clients WHERE id > ? ORDER BY id ASC LIMIT ?", (last_id, batch_size)
+            ).fetchall()
+        finally:
+            _release_connection(conn)
+        if not rows:
+            return
+        last_id = rows[-1]["id"]
+        yield [_client_from_row(r) for r in rows]
+
+
+_TRIGRAM_MIN_CHARS = 3
+_CPF_FRAGMENT = re.compile(r"[\d.\-\s]+")
+
+
+def _has_client_search_index(conn: sqlite3.Connection) -> bool:
+    return (
+        conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clients_fts'").fetchone()
+        is not None
     )
-    rows = cursor.fetchall()
-    conn.close()
-    return [
-        {
-            "id": r["id"],
-            "name": r["name"],
-            "cpf": r["cpf"],
-            "income": r["income"],
-            "age": r["age"],
-            "score": r["credit_history_score"],
-            "sex": r["sex"],
-            "job": r["job"],
-            "housing": r["housing"],
-            "saving_accounts": r["saving_accounts"],
-            "checking_account": r["checking_account"],
-        }
-        for r in rows
-    ]
+
+
+def search_clients(query: str = "", limit: int = 20) -> list[dict]:
+    """Busca por substring em nome ou CPF (com ou sem pontuação).
+
+    Usa o índice FTS5 trigram quando disponível; termos com menos de 3 caracteres
+    (ou SQLite sem FTS5) usam LIKE. Sem `query`, devolve os primeiros `limit` clientes.
+    """
+    term = str(query or "").strip()
+    limit = max(0, int(limit))
+    is_cpf = bool(term) and _CPF_FRAGMENT.fullmatch(term) is not None
+    if is_cpf:
+        term = re.sub(r"\D", "", term)
+
+    conn = _get_connection()
+    try:
+        if not term:
+            rows = conn.execute(f"SELECT {_CLIENT_COLUMNS} FROM clients ORDER BY id ASC LIMIT ?", (limit,)).fetchall()
+        elif len(term) >= _TRIGRAM_MIN_CHARS and _has_client_search_index(conn):
+            columns = "cpf_digits" if is_cpf else "{name cpf}"
+            match = f'{columns} : "{term.replace(chr(34), chr(34) * 2)}"'
+            rows = conn.execute(
+                """
+                SELECT c.*
+                FROM clients_fts
+                JOIN clients c ON c.id = clients_fts.rowid
+                WHERE clients_fts MATCH ?
+                LIMIT ?
+                """,
+                (match, limit),
+            ).fetchall()
+        else:
+            like = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            if is_cpf:
+                where = "replace(replace(cpf, '.', ''), '-', '') LIKE ? ESCAPE '\\'"
+                params = (f"%{like}%",)
+            else:
+                where = "name LIKE ? ESCAPE '\\' OR cpf LIKE ? ESCAPE '\\'"
+                params = (f"%{like}%", f"%{like}%")
+            rows = conn.execute(
+                f"SELECT {_CLIENT_COLUMNS} FROM clients WHERE {where} ORDER BY id ASC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+    finally:
+        _release_connection(conn)
+    return [_client_from_row(r) for r in rows]
 
 
 def get_client_data(cpf):
@@ -220,7 +366,7 @@ def get_client_data(cpf):
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM clients WHERE cpf = ?', (cpf,))
     row = cursor.fetchone()
-    conn.close()
+    _release_connection(conn)
     
     if row:
         return {
@@ -235,88 +381,166 @@ def get_client_data(cpf):
             "housing": row[8] if len(row) > 8 else None,
             "saving_accounts": row[9] if len(row) > 9 else None,
             "checking_account": row[10] if len(row) > 10 else None,
+            "row_version": row["row_version"],
         }
     return None
 
 
-def log_application_attempt(*args, **kwargs):
-    if args and len(args) == 3 and not kwargs:
-        client_id, amount, status = args
-        cpf = None
-        duration = None
-        reason = None
-    else:
-        cpf = kwargs.get("cpf")
-        client_id = kwargs.get("client_id")
-        amount = kwargs.get("amount")
-        duration = kwargs.get("duration")
-        purpose = kwargs.get("purpose")
-        sex = kwargs.get("sex")
-        job = kwargs.get("job")
-        housing = kwargs.get("housing")
-        saving_accounts = kwargs.get("saving_accounts")
-        checking_account = kwargs.get("checking_account")
-        status = kwargs.get("status")
-        reason = kwargs.get("reason")
-
+def get_client_row_version(cpf) -> int | None:
     conn = _get_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute(
-            '''
-            INSERT INTO applications (
-                cpf,
-                client_id,
-                amount,
-                duration,
-                purpose,
-                sex,
-                job,
-                housing,
-                saving_accounts,
-                checking_account,
-                status,
-                reason,
-                created_at
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''',
-            (
-                cpf,
-                client_id,
-                float(amount) if amount is not None else None,
-                int(duration) if duration is not None else None,
-                str(purpose) if purpose is not None else None,
-                str(sex) if sex is not None else None,
-                int(job) if job is not None else None,
-                str(housing) if housing is not None else None,
-                str(saving_accounts) if saving_accounts is not None else None,
-                str(checking_account) if checking_account is not None else None,
-                str(status) if status is not None else None,
-                reason,
-                datetime.utcnow().isoformat(timespec="seconds"),
-            ),
-        )
-        conn.commit()
+        row = conn.execute("SELECT row_version FROM clients WHERE cpf = ?", (cpf,)).fetchone()
     finally:
-        conn.close()
+        _release_connection(conn)
+    return row[0] if row else None
+
 
-    extra = f" | reason={reason}" if reason else ""
+_INSERT_APPLICATION_SQL = '''
+    INSERT INTO applications (
+        cpf,
+        client_id,
+        amount,
+        duration,
+        purpose,
+        sex,
+        job,
+        housing,
+        saving_accounts,
+        checking_account,
+        status,
+        reason,
+        created_at,
+        cached,
+        model_version
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Chamado antes de ler o histórico para descarregar escritas pendentes (ver audit_writer).
+_pending_writes_hook = None
+
+
+def set_pending_writes_hook(hook) -> None:
+    global _pending_writes_hook
+    _pending_writes_hook = hook
+
+
+# Versão do modelo ativo, gravada nas tentativas que não informam `model_version` (registrado por ml_tools).
+_model_version_hook = None
+
+
+def set_model_version_hook(hook) -> None:
+    global _model_version_hook
+    _model_version_hook = hook
+
+
+def application_row(**kwargs) -> tuple:
+    """Converte um registro de tentativa na tupla de parâmetros do INSERT em applications."""
+    amount = kwargs.get("amount")
+    duration = kwargs.get("duration")
+    purpose = kwargs.get("purpose")
+    sex = kwargs.get("sex")
+    job = kwargs.get("job")
+    housing = kwargs.get("housing")
+    saving_accounts = kwargs.get("saving_accounts")
+    checking_account = kwargs.get("checking_account")
+    status = kwargs.get("status")
+    model_version = kwargs.get("model_version")
+    if model_version is None and _model_version_hook is not None:
+        model_version = _model_version_hook()
+    return (
+        kwargs.get("cpf"),
+        kwargs.get("client_id"),
+        float(amount) if amount is not None else None,
+        int(duration) if duration is not None else None,
+        str(purpose) if purpose is not None else None,
+        str(sex) if sex is not None else None,
+        int(job) if job is not None else None,
+        str(housing) if housing is not None else None,
+        str(saving_accounts) if saving_accounts is not None else None,
+        str(checking_account) if checking_account is not None else None,
+        str(status) if status is not None else None,
+        kwargs.get("reason"),
+        kwargs.get("created_at") or datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        int(bool(kwargs.get("cached", False))),
+        str(model_version) if model_version is not None else None,
+    )
+
+
+def log_application_attempts(rows: list[tuple], path: str | None = None) -> int:
+    """Insere várias linhas de `application_row` em uma única transação."""
+    conn = _pool.acquire(path or DB_PATH)
+    try:
+        with conn:
+            conn.executemany(_INSERT_APPLICATION_SQL, rows)
+    finally:
+        _release_connection(conn)
+    return len(rows)
+
+
+def log_application_attempt(*args, **kwargs):
+    if args and len(args) == 3 and not kwargs:
+        client_id, amount, status = args
+        kwargs = {"client_id": client_id, "amount": amount, "status": status}
+
+    log_application_attempts([application_row(**kwargs)])
     return True
 
 
-def list_applications() -> list[dict]:
+def application_cursor(app: dict) -> str:
+    """Cursor opaco para buscar a página seguinte a `app` em list_applications."""
+    return f"{app['created_at']}|{app['id']}"
+
+
+def _parse_application_cursor(cursor: str) -> tuple[str, int]:
+    created_at, _, app_id = str(cursor).rpartition("|")
+    if not created_at or not app_id.isdigit():
+        raise ValueError(f"Cursor de histórico inválido: {cursor!r}")
+    return created_at, int(app_id)
+
+
+def list_applications(
+    cursor: str | None = None,
+    limit: int | None = None,
+    status: str | None = None,
+    cpf: str | None = None,
+    since: str | datetime | None = None,
+) -> list[dict]:
+    """Histórico do mais recente para o mais antigo, com paginação por keyset.
+
+    `cursor` vem de `application_cursor(ultimo_item)` da página anterior; `limit=None` traz tudo.
+    """
+    if _pending_writes_hook is not None:
+        _pending_writes_hook()
+
+    where = []
+    params: list = []
+    if status:
+        where.append("status = ?")
+        params.append(str(status))
+    if cpf:
+        where.append("cpf = ?")
+        params.append(str(cpf))
+    if since:
+        where.append("created_at >= ?")
+        params.append(since.isoformat(timespec="seconds") if isinstance(since, datetime) else str(since))
+    if cursor:
+        where.append("(created_at, id) < (?, ?)")
+        params.extend(_parse_application_cursor(cursor))
+
+    sql = "SELECT id, cpf, client_id, amount, duration, status, reason, created_at, cached, model_version FROM applications"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created_at DESC, id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(max(0, int(limit)))
+
     conn = _get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT id, cpf, client_id, amount, duration, status, reason, created_at
-        FROM applications
-        ORDER BY id DESC
-        """
-    )
-    rows = cursor.fetchall()
-    conn.close()
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        _release_connection(conn)
     return [
         {
             "id": r["id"],
@@ -327,6 +551,8 @@ def list_applications() -> list[dict]:
             "status": r["status"],
             "reason": r["reason"],
             "created_at": r["created_at"],
+            "cached": bool(r["cached"]),
+            "model_version": r["model_version"],
         }
         for r in rows
     ]
@@ -361,7 +587,8 @@ def update_client(
                 job = ?,
                 housing = ?,
                 saving_accounts = ?,
-                checking_account = ?
+                checking_account = ?,
+                row_version = row_version + 1
             WHERE cpf = ?
             """,
             (
@@ -387,4 +614,4 @@ def update_client(
     except Exception as e:
         return {"success": False, "message": f"Erro ao atualizar cliente: {str(e)}"}
     finally:
-        conn.close()
\ No newline at end of file
+        _release_connection(conn)
\ No newline at end of file
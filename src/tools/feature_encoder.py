@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import math
+import threading
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+AGE_BINS = (18, 25, 35, 60, 120)
+AGE_LABELS = ("Student", "Young", "Adult", "Senior")
+AGE_FALLBACK_LABEL = "Student"
+
+NUMERIC_COLUMNS = {
+    "Age": "age",
+    "Job": "job",
+    "Credit amount": "credit_amount_log",
+    "Duration": "duration",
+}
+
+# A ordem importa: "Age_cat_" precisa ser testado antes de prefixos mais curtos.
+DUMMY_PREFIXES = (
+    ("Age_cat_", "age_cat"),
+    ("Purpose_", "purpose"),
+    ("Sex_", "sex"),
+    ("Housing_", "housing"),
+    ("Savings_", "saving_accounts"),
+    ("Check_", "checking_account"),
+)
+
+CATEGORICAL_FIELDS = tuple(field for _, field in DUMMY_PREFIXES)
+
+
+def age_category(age: int, bins: Iterable[int] = AGE_BINS, labels: Iterable[str] = AGE_LABELS) -> str:
+    """Equivalente escalar de pd.cut(..., bins, labels) + fillna("Student")."""
+    bins = tuple(bins)
+    labels = tuple(labels)
+    for idx in range(1, len(bins)):
+        if bins[idx - 1] < age <= bins[idx]:
+            return labels[idx - 1]
+    return AGE_FALLBACK_LABEL
+
+
+def age_categories(age: np.ndarray, bins: Iterable[int] = AGE_BINS, labels: Iterable[str] = AGE_LABELS) -> np.ndarray:
+    bins_arr = np.asarray(tuple(bins))
+    labels_arr = np.asarray((AGE_FALLBACK_LABEL, *tuple(labels), AGE_FALLBACK_LABEL), dtype=object)
+    idx = np.searchsorted(bins_arr, age, side="left")
+    idx = np.where((age > bins_arr[0]) & (age <= bins_arr[-1]), idx, 0)
+    return labels_arr[idx]
+
+
+def credit_amount_log(loan_amount: float) -> float:
+    loan_amount = float(loan_amount)
+    return math.log(loan_amount) if loan_amount > 0 else 0.0
+
+
+class NotebookFeatureEncoder:
+    """One-hot do notebook compilado em tabelas categoria -> índice de coluna."""
+
+    def __init__(
+        self,
+        feature_columns: Iterable[str],
+        *,
+        age_bins: Iterable[int] = AGE_BINS,
+        age_labels: Iterable[str] = AGE_LABELS,
+    ):
+        self.feature_columns = list(feature_columns)
+        self.n_features = len(self.feature_columns)
+        self.age_bins = tuple(age_bins)
+        self.age_labels = tuple(age_labels)
+
+        self._numeric_index: dict[str, int] = {}
+        self._lookup: dict[str, dict[str, int]] = {field: {} for field in CATEGORICAL_FIELDS}
+
+        for idx, col in enumerate(self.feature_columns):
+            if col in NUMERIC_COLUMNS:
+                self._numeric_index[NUMERIC_COLUMNS[col]] = idx
+                continue
+            for prefix, field in DUMMY_PREFIXES:
+                if col.startswith(prefix):
+                    self._lookup[field][col[len(prefix):]] = idx
+                    break
+
+        self._numeric_items = tuple(self._numeric_index.items())
+        self._category_index = {field: pd.Index(list(lookup), dtype=object) for field, lookup in self._lookup.items()}
+        self._column_tables = {
+            field: np.asarray([*lookup.values(), -1], dtype=np.intp) for field, lookup in self._lookup.items()
+        }
+        self._scratch = threading.local()
+
+    def _row_buffer(self) -> np.ndarray:
+        buf = getattr(self._scratch, "row", None)
+        if buf is None:
+            buf = np.zeros((1, self.n_features), dtype=np.float32)
+            self._scratch.row = buf
+        else:
+            buf.fill(0.0)
+        return buf
+
+    def encode_one(
+        self,
+        *,
+        age: int,
+        loan_amount: float,
+        duration: int,
+        purpose: str,
+        sex: str,
+        housing: str,
+        saving_accounts: str,
+        checking_account: str,
+        job: int,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Codifica uma linha em um buffer (1, n_features) float32.
+
+        Sem `out`, o buffer devolvido é reutilizado pela próxima chamada na mesma thread.
+        """
+        if out is None:
+            out = self._row_buffer()
+        else:
+            out.fill(0.0)
+
+        age = int(age)
+        numeric = {
+            "age": age,
+            "job": int(job),
+            "credit_amount_log": credit_amount_log(loan_amount),
+            "duration": int(duration),
+        }
+        row = out[0]
+        for field, idx in self._numeric_items:
+            row[idx] = numeric[field]
+
+        categorical = {
+            "age_cat": age_category(age, self.age_bins, self.age_labels),
+            "purpose": str(purpose),
+            "sex": str(sex),
+            "housing": str(housing),
+            "saving_accounts": str(saving_accounts),
+            "checking_account": str(checking_account),
+        }
+        for field, value in categorical.items():
+            idx = self._lookup[field].get(value)
+            if idx is not None:
+                row[idx] = 1.0
+        return out
+
+    def encode_frame(self, frame: pd.DataFrame, out: np.ndarray | None = None) -> np.ndarray:
+        """Codifica um lote (colunas normalizadas de `_records_to_frame`) em float32."""
+        n_rows = len(frame)
+        if out is None:
+            out = np.zeros((n_rows, self.n_features), dtype=np.float32)
+        else:
+            out.fill(0.0)
+
+        age = frame["age"].astype(int).to_numpy()
+        loan_amount = frame["loan_amount"].astype(float).to_numpy()
+        numeric = {
+            "age": age,
+            "job": frame["job"].astype(int).to_numpy(),
+            "credit_amount_log": np.log(loan_amount, out=np.zeros_like(loan_amount), where=loan_amount > 0),
+            "duration": frame["duration"].astype(int).to_numpy(),
+        }
+        for field, idx in self._numeric_items:
+            out[:, idx] = numeric[field]
+
+        rows = np.arange(n_rows)
+        for field in CATEGORICAL_FIELDS:
+            if field == "age_cat":
+                values = age_categories(age, self.age_bins, self.age_labels)
+            else:
+                values = frame[field].astype(str).to_numpy(dtype=object)
+            codes = self._category_index[field].get_indexer(values)
+            cols = self._column_tables[field][codes]
+            hit = cols >= 0
+            out[rows[hit], cols[hit]] = 1.0
+        return out
+
+
+# Layout "categorical" (HistGradientBoosting): uma coluna por campo, categorias como códigos ordinais.
+NATIVE_NUMERIC_FIELDS = ("age", "job", "loan_amount", "duration")
+NATIVE_CATEGORICAL_FIELDS = ("purpose", "sex", "housing", "saving_accounts", "checking_account")
+NATIVE_FEATURE_NAMES = (*NATIVE_NUMERIC_FIELDS, *NATIVE_CATEGORICAL_FIELDS)
+
+
+def encode_native_categorical(
+    frame: pd.DataFrame, feature_names: Iterable[str], categories: dict[str, list[str]]
+) -> np.ndarray:
+    """Matriz float64 com o código (posição em `categories`) de cada campo categórico.
+
+    Categoria fora do treino vira NaN, que o HistGradientBoosting trata como valor ausente.
+    """
+    feature_names = list(feature_names)
+    out = np.empty((len(frame), len(feature_names)), dtype=np.float64)
+    for idx, name in enumerate(feature_names):
+        if name in categories:
+            codes = pd.Index(list(categories[name]), dtype=object).get_indexer(frame[name].astype(str).to_numpy(dtype=object))
+            out[:, idx] = np.where(codes >= 0, codes, np.nan)
+        else:
+            out[:, idx] = frame[name].astype(float).to_numpy()
+    return out
+
+
+def encode_native_categorical_row(
+    values: dict, feature_names: Iterable[str], categories: dict[str, list[str]]
+) -> np.ndarray:
+    """Equivalente de uma linha de `encode_native_categorical`, sem montar DataFrame."""
+    row = []
+    for name in feature_names:
+        if name in categories:
+            value = str(values[name])
+            row.append(float(categories[name].index(value)) if value in categories[name] else np.nan)
+        else:
+            row.append(float(values[name]))
+    return np.array([row], dtype=np.float64)
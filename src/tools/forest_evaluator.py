@@ -0,0 +1,323 @@
+"""Avaliação de RandomForestClassifier com arrays NumPy contíguos, sem o overhead de validação do sklearn.
+
+Uso: python -m src.tools.forest_evaluator [--model models/credit_risk_model.pkl]
+     (exporta a floresta compilada para <modelo>.forest.npz)
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import struct
+import zipfile
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+FOREST_FORMAT_VERSION = 2
+
+# Início dos dados de cada array no .npz, para o np.memmap ler arrays alinhados direto do arquivo.
+ARRAY_ALIGNMENT = 64
+# Id do campo "extra" do zip usado como padding de alinhamento (o mesmo do zipalign do Android).
+_ALIGNMENT_EXTRA_ID = 0xD935
+
+# Linhas por bloco na travessia: mantém os arrays de trabalho (linhas x árvores) no cache.
+BLOCK_ROWS = 512
+
+
+class CompiledForest:
+    """Floresta achatada: os nós de todas as árvores em arrays únicos, com ids globais.
+
+    Folhas apontam para si mesmas (left == right == nó), então `max_depth` passos levam
+    qualquer linha até a folha sem testar se já chegou. `value` guarda as probabilidades
+    normalizadas de cada nó, como `DecisionTreeClassifier.predict_proba`.
+    """
+
+    def __init__(
+        self,
+        *,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        classes: np.ndarray,
+        n_features: int,
+        feature_names: Optional[list[str]] = None,
+        missing_go_to_left: Optional[np.ndarray] = None,
+        traversal: Optional[dict[str, np.ndarray]] = None,
+    ):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = int(n_features)
+        self.feature_names_in_ = None if feature_names is None else np.asarray(feature_names, dtype=object)
+        self.missing_go_to_left = None if missing_go_to_left is None else np.asarray(missing_go_to_left, dtype=bool)
+
+        if traversal is None:
+            traversal = self._build_traversal()
+        self._feature32 = np.asarray(traversal["feature32"], dtype=np.int32)
+        self._roots32 = np.asarray(traversal["roots32"], dtype=np.int32)
+        self._children = np.asarray(traversal["children"], dtype=np.int32)
+        self._threshold32 = np.asarray(traversal["threshold32"], dtype=np.float32)
+
+    def _build_traversal(self) -> dict[str, np.ndarray]:
+        # Filhos intercalados (2*nó = esquerda, 2*nó+1 = direita) e limiares arredondados para baixo
+        # em float32. Para x float32, x <= t32 equivale a x <= threshold (float64).
+        children = np.empty(2 * len(self.feature), dtype=np.int32)
+        children[0::2] = self.left
+        children[1::2] = self.right
+        threshold32 = self.threshold.astype(np.float32)
+        above = threshold32.astype(np.float64) > self.threshold
+        threshold32[above] = np.nextafter(threshold32[above], np.float32(-np.inf))
+        return {
+            "feature32": self.feature.astype(np.int32),
+            "roots32": self.roots.astype(np.int32),
+            "children": children,
+            "threshold32": threshold32,
+        }
+
+    def traversal_arrays(self) -> dict[str, np.ndarray]:
+        """Arrays usados na travessia; exportados junto para não serem recalculados em cada processo."""
+        return {
+            "feature32": self._feature32,
+            "roots32": self._roots32,
+            "children": self._children,
+            "threshold32": self._threshold32,
+        }
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _as_matrix(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame) and self.feature_names_in_ is not None:
+            X = X[list(self.feature_names_in_)]
+        # Mesma conversão do sklearn: as árvores comparam float32(x) <= threshold.
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Esperado X com {self.n_features_in_} colunas, recebido formato {X.shape}.")
+        return X
+
+    def _apply_block(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        base = np.repeat(np.arange(0, n_rows * n_features, n_features, dtype=np.int32), self.n_trees)
+        node = np.tile(self._roots32, n_rows)
+        idx = np.empty_like(node)
+        x = np.empty(node.shape, dtype=np.float32)
+        go_right = np.empty(node.shape, dtype=bool)
+        has_missing = bool(np.isnan(flat).any())
+        for _ in range(self.max_depth):
+            self._feature32.take(node, out=idx, mode="clip")
+            idx += base
+            flat.take(idx, out=x, mode="clip")
+            if has_missing:
+                # NaN: segue missing_go_to_left (sem o array, vai para a direita como no sklearn).
+                go_left = x <= self._threshold32.take(node)
+                if self.missing_go_to_left is not None:
+                    go_left |= np.isnan(x) & self.missing_go_to_left.take(node)
+                np.logical_not(go_left, out=go_right)
+            else:
+                np.greater(x, self._threshold32.take(node, mode="clip"), out=go_right)
+            node *= 2
+            node += go_right
+            node = self._children.take(node, mode="clip")
+        return node.reshape(n_rows, self.n_trees)
+
+    def apply(self, X) -> np.ndarray:
+        """Índice global da folha de cada (linha, árvore), em blocos de BLOCK_ROWS linhas."""
+        X = self._as_matrix(X)
+        if X.shape[0] <= BLOCK_ROWS:
+            return self._apply_block(X)
+        return np.concatenate([self._apply_block(X[i : i + BLOCK_ROWS]) for i in range(0, X.shape[0], BLOCK_ROWS)])
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self.value[self.apply(X)].mean(axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def is_compilable(model) -> bool:
+    estimators = getattr(model, "estimators_", None)
+    return bool(estimators) and all(hasattr(est, "tree_") for est in estimators) and hasattr(model, "classes_")
+
+
+def compile_forest(model) -> CompiledForest:
+    """Achata um RandomForestClassifier (ou ensemble de árvores de classificação equivalente)."""
+    if not is_compilable(model):
+        raise TypeError(f"Modelo {type(model).__name__} não é uma floresta de árvores de decisão.")
+
+    features, thresholds, lefts, rights, values, roots, missing = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for est in model.estimators_:
+        tree = est.tree_
+        nodes = np.arange(tree.node_count)
+        leaf = tree.children_left == -1
+
+        features.append(np.where(leaf, 0, tree.feature))
+        thresholds.append(np.where(leaf, 0.0, tree.threshold))
+        lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+        rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+        value = tree.value[:, 0, :].astype(np.float64)
+        values.append(value / value.sum(axis=1, keepdims=True))
+        missing.append(getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8)).astype(bool))
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, int(tree.max_depth))
+
+    missing_go_to_left = np.concatenate(missing)
+    feature_names = getattr(model, "feature_names_in_", None)
+    return CompiledForest(
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts),
+        right=np.concatenate(rights),
+        value=np.concatenate(values),
+        roots=np.asarray(roots),
+        max_depth=max_depth,
+        classes=model.classes_,
+        n_features=model.n_features_in_,
+        feature_names=None if feature_names is None else list(feature_names),
+        missing_go_to_left=missing_go_to_left if missing_go_to_left.any() else None,
+    )
+
+
+def forest_path_for(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ".forest.npz"
+
+
+def _write_npz(path: str, arrays: dict[str, np.ndarray]) -> None:
+    """Como np.savez (sem compressão), mas com os dados de cada array alinhados a ARRAY_ALIGNMENT bytes."""
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name, array in arrays.items():
+            buffer = io.BytesIO()
+            np.lib.format.write_array(buffer, np.asanyarray(array), allow_pickle=False)
+            info = zipfile.ZipInfo(name + ".npy", date_time=(1980, 1, 1, 0, 0, 0))
+            # O header .npy já fecha em múltiplo de 64 bytes: basta alinhar o início do membro,
+            # com padding no campo extra do header local (30 bytes fixos + nome + extra).
+            start = zf.fp.tell() + 30 + len(info.filename.encode()) + 4
+            pad = -start % ARRAY_ALIGNMENT
+            info.extra = struct.pack("<HH", _ALIGNMENT_EXTRA_ID, pad) + bytes(pad)
+            zf.writestr(info, buffer.getvalue())
+
+
+def _read_npz(path: str, mmap_mode: Optional[str] = None) -> dict[str, np.ndarray]:
+    """Lê os arrays de um .npz; com `mmap_mode`, os membros não comprimidos viram np.memmap do próprio arquivo.
+
+    Arrays mapeados ficam no page cache e são compartilhados por todos os processos que abrem o arquivo.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if mmap_mode is not None and info.compress_type == zipfile.ZIP_STORED:
+                f.seek(info.header_offset + 26)
+                name_len, extra_len = struct.unpack("<HH", f.read(4))
+                f.seek(info.header_offset + 30 + name_len + extra_len)
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+                if shape and np.prod(shape) > 0 and not dtype.hasobject:
+                    arrays[name] = np.asarray(
+                        np.memmap(
+                            path,
+                            dtype=dtype,
+                            mode=mmap_mode,
+                            offset=f.tell(),
+                            shape=shape,
+                            order="F" if fortran_order else "C",
+                        )
+                    )
+                    continue
+            with zf.open(info) as member:
+                arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+    return arrays
+
+
+def export_forest(forest: CompiledForest, path: str, *, model_sha256: str) -> str:
+    """Grava a floresta compilada (escrita atômica); `model_sha256` amarra o arquivo ao .pkl de origem."""
+    arrays = {
+        "format_version": np.asarray(FOREST_FORMAT_VERSION),
+        "model_sha256": np.asarray(model_sha256),
+        "feature": forest.feature,
+        "threshold": forest.threshold,
+        "left": forest.left,
+        "right": forest.right,
+        "value": forest.value,
+        "roots": forest.roots,
+        "max_depth": np.asarray(forest.max_depth),
+        "classes": forest.classes_,
+        "n_features": np.asarray(forest.n_features_in_),
+        **forest.traversal_arrays(),
+    }
+    if forest.feature_names_in_ is not None:
+        arrays["feature_names"] = forest.feature_names_in_.astype(str)
+    if forest.missing_go_to_left is not None:
+        arrays["missing_go_to_left"] = forest.missing_go_to_left
+
+    tmp_path = path + ".tmp.npz"
+    _write_npz(tmp_path, arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_forest(
+    path: str, *, model_sha256: Optional[str] = None, mmap_mode: Optional[str] = None
+) -> Optional[CompiledForest]:
+    """Carrega uma floresta exportada; None se o arquivo não existir ou for de outro modelo/formato.
+
+    Com `mmap_mode="r"` os arrays são mapeados do arquivo em vez de copiados para o heap do processo.
+    """
+    if not os.path.exists(path):
+        return None
+    data = _read_npz(path, mmap_mode)
+    if "format_version" not in data or int(data["format_version"]) != FOREST_FORMAT_VERSION:
+        return None
+    if model_sha256 is not None and str(data["model_sha256"]) != model_sha256:
+        return None
+    return CompiledForest(
+        feature=data["feature"],
+        threshold=data["threshold"],
+        left=data["left"],
+        right=data["right"],
+        value=data["value"],
+        roots=data["roots"],
+        max_depth=int(data["max_depth"]),
+        classes=data["classes"],
+        n_features=int(data["n_features"]),
+        feature_names=data["feature_names"].tolist() if "feature_names" in data else None,
+        missing_go_to_left=data["missing_go_to_left"] if "missing_go_to_left" in data else None,
+        traversal={key: data[key] for key in ("feature32", "roots32", "children", "threshold32")},
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    import joblib
+
+    from src.tools.ml_tools import MODEL_PATH, file_sha256
+
+    parser = argparse.ArgumentParser(description="Exporta a floresta do modelo de risco para arrays NumPy.")
+    parser.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    forest = compile_forest(joblib.load(args.model))
+    path = export_forest(forest, forest_path_for(args.model), model_sha256=file_sha256(args.model))
+    print(f"🌲 {forest.n_trees} árvores, {len(forest.feature)} nós, profundidade {forest.max_depth} -> {os.path.normpath(path)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
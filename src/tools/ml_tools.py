@@ -1,44 +1,338 @@
+import hashlib
+import json
 import joblib
+import logging
+import numpy as np
 import pandas as pd
 import os
-from typing import Any, Optional
-import math
-
-MODEL_PATH = os.path.join(os.path.dirname(__file__), '../../models/credit_risk_model.pkl')
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, NamedTuple, Optional
+
+from src.tools import db_tools, model_registry
+from src.tools.feature_encoder import (
+    AGE_BINS,
+    AGE_FALLBACK_LABEL,
+    AGE_LABELS,
+    NotebookFeatureEncoder,
+    encode_native_categorical,
+    encode_native_categorical_row,
+)
+from src.tools.forest_evaluator import CompiledForest, compile_forest, forest_path_for, is_compilable, load_forest
+
+logger = logging.getLogger(__name__)
+
+# Sem registry (models/registry/manifest.json), usa o artefato fixo de setup_model.py.
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), '../../models/credit_risk_model.pkl')
+# Artefato (e versão no registry) carregado enquanto nenhuma versão foi instalada em `_state`.
+MODEL_PATH = DEFAULT_MODEL_PATH
 DATA_PATH = os.path.join(os.path.dirname(__file__), '../../data/credit_data.csv')
 
-_model = None
-_notebook_feature_columns: Optional[list[str]] = None
+FEATURE_SCHEMA_VERSION = 1
+LAYOUT_SIMPLE = "simple"
+LAYOUT_NOTEBOOK = "notebook"
+# Campos categóricos como códigos ordinais, sem one-hot (engine hist_gradient_boosting).
+LAYOUT_CATEGORICAL = "categorical"
+LAYOUTS = (LAYOUT_SIMPLE, LAYOUT_NOTEBOOK, LAYOUT_CATEGORICAL)
+
+_model_version: Optional[str] = None
+
+
+class _ModelState(NamedTuple):
+    """Versão em serviço: tudo o que uma predição lê, trocado de uma só vez por reload_model.
+
+    Cada predição lê `_state` uma única vez e usa só esse snapshot, para nunca combinar o
+    preditor de uma versão com o schema ou o encoder de outra.
+    """
+
+    path: str
+    version: Optional[str]
+    predictor: Any
+    # Estimador sklearn; None quando o preditor é a floresta mapeada do sidecar (o .pkl nem é carregado).
+    model: Any
+    schema: Optional[dict]
+    layout: str
+    # Só no layout notebook.
+    encoder: Optional[NotebookFeatureEncoder]
+
+
+_state: Optional[_ModelState] = None
+# ((caminho, versão), estimador sklearn) dos lotes grandes quando o preditor é a floresta mapeada.
+_batch_estimator: Optional[tuple] = None
+
+# Protege a troca de `_state`; a carga de uma nova versão roda fora dele.
+_state_lock = threading.Lock()
+_reload_lock = threading.Lock()
+_reloader: Optional[threading.Thread] = None
+_reloader_lock = threading.Lock()
+
+# Intervalo de verificação do manifest do registry; 0 desativa a recarga em background.
+MODEL_RELOAD_INTERVAL_S = float(os.environ.get("ML_MODEL_RELOAD_INTERVAL_S", "5"))
+
+# "numpy": floresta compilada (forest_evaluator); "sklearn": predict_proba do estimador original.
+EVALUATOR_NUMPY = "numpy"
+EVALUATOR_SKLEARN = "sklearn"
+
+SIMPLE_FEATURE_NAMES = ("age", "income", "loan_amount", "duration", "credit_history_score")
+
+# Acima deste número de linhas o predict_proba (Cython) do sklearn supera a travessia em NumPy,
+# cujo ganho está no overhead por chamada (ver benchmarks/bench_forest_evaluator.py).
+FOREST_MAX_BATCH_ROWS = int(os.environ.get("ML_FOREST_MAX_BATCH_ROWS", "1000"))
+
+def _read_model(path: str):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Modelo não encontrado em {path}. Rode o setup_model.py primeiro.")
+    return joblib.load(path)
+
 
 def _load_model():
-    global _model
-    if _model is None:
-        if not os.path.exists(MODEL_PATH):
-            raise FileNotFoundError(f"Modelo não encontrado em {MODEL_PATH}. Rode o setup_model.py primeiro.")
-        _model = joblib.load(MODEL_PATH)
-    return _model
+    """Estimador sklearn da versão em serviço."""
+    return _get_batch_estimator(_get_state())
+
+
+def _get_batch_estimator(state: _ModelState):
+    """Estimador sklearn de `state`, para lotes acima de FOREST_MAX_BATCH_ROWS.
+
+    Quando o preditor veio do sidecar, o .pkl é carregado num cache próprio, fora do snapshot:
+    carregá-lo não troca a versão em serviço.
+    """
+    global _batch_estimator
+    if state.model is not None:
+        return state.model
+    key = (state.path, state.version)
+    cached = _batch_estimator
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    model = _read_model(key[0])
+    _batch_estimator = (key, model)
+    return model
+
+
+def _build_predictor(path: str):
+    """(preditor, modelo sklearn ou None) para o artefato em `path`.
+
+    Usa o <modelo>.forest.npz exportado quando ele corresponde ao .pkl, mapeado em memória (ML_MODEL_MMAP):
+    os processos compartilham os arrays pelo page cache e nem chegam a carregar o .pkl. Senão compila em memória.
+    """
+    evaluator = os.environ.get("ML_FOREST_EVALUATOR", EVALUATOR_NUMPY).strip().lower()
+    if evaluator == EVALUATOR_NUMPY and os.path.exists(path):
+        mmap_mode = "r" if os.environ.get("ML_MODEL_MMAP", "1").strip().lower() not in ("0", "false", "no") else None
+        forest = load_forest(forest_path_for(path), model_sha256=file_sha256(path), mmap_mode=mmap_mode)
+        if forest is not None:
+            return forest, None
+    model = _read_model(path)
+    predictor = compile_forest(model) if evaluator == EVALUATOR_NUMPY and is_compilable(model) else model
+    return predictor, model
+
+
+def _build_state(path: str, version: Optional[str] = None) -> _ModelState:
+    predictor, model = _build_predictor(path)
+    schema = _read_feature_schema(path, predictor)
+    layout = _layout_for(schema, predictor)
+    encoder = _build_notebook_encoder(schema) if layout == LAYOUT_NOTEBOOK else None
+    if version is None and os.path.exists(path):
+        version = file_sha256(path)[:12]
+    return _ModelState(path, version, predictor, model, schema, layout, encoder)
+
+
+def _get_state() -> _ModelState:
+    """Snapshot da versão em serviço; a primeira chamada carrega MODEL_PATH."""
+    global _state
+    state = _state
+    if state is not None:
+        return state
+    with _reload_lock:
+        if _state is None:
+            state = _build_state(MODEL_PATH, _model_version)
+            with _state_lock:
+                _state = state
+        state = _state
+    start_model_reloader()
+    return state
+
+
+def _get_predictor():
+    """Objeto com `predict_proba`/`classes_` usado no scoring: a floresta compilada ou o próprio modelo."""
+    return _get_state().predictor
+
+
+def reload_model(*, force: bool = False, root: Optional[str] = None) -> Optional[str]:
+    """Carrega a versão ativa do registry e troca o modelo em memória de uma só vez.
+
+    A carga e a validação acontecem fora do lock de estado: predições em andamento terminam
+    com o snapshot anterior. Devolve a versão instalada, ou None se não havia nada a trocar.
+    """
+    global MODEL_PATH, _model_version, _state
+
+    with _reload_lock:
+        active = model_registry.active_model(root)
+        if active is None:
+            return None
+        version, path = active
+        current = _state
+        current_version, current_path = (current.version, current.path) if current is not None else (_model_version, MODEL_PATH)
+        if not force and version == current_version and os.path.abspath(path) == os.path.abspath(current_path):
+            return None
+
+        state = _build_state(path, version)
+        with _state_lock:
+            _state = state
+            MODEL_PATH, _model_version = path, version
+    logger.info("Modelo de risco recarregado: versão %s", version)
+    return version
+
+
+def _watch_registry(interval: float) -> None:
+    last_mtime = None
+    while True:
+        time.sleep(interval)
+        try:
+            mtime = os.stat(model_registry.manifest_path()).st_mtime_ns
+        except OSError:
+            continue
+        if mtime == last_mtime:
+            continue
+        # Uma versão com problema é tentada uma vez; a próxima mudança no manifest tenta de novo.
+        last_mtime = mtime
+        try:
+            reload_model()
+        except Exception:
+            logger.exception("Falha ao recarregar o modelo do registry")
+
+
+def start_model_reloader(interval: Optional[float] = None) -> bool:
+    """Inicia (uma vez por processo) a thread que acompanha o manifest do registry."""
+    global _reloader
+    interval = MODEL_RELOAD_INTERVAL_S if interval is None else float(interval)
+    # is_alive(): num processo filho via fork a thread do pai não existe e precisa ser recriada.
+    if interval <= 0 or (_reloader is not None and _reloader.is_alive()):
+        return False
+    with _reloader_lock:
+        if _reloader is not None and _reloader.is_alive():
+            return False
+        _reloader = threading.Thread(target=_watch_registry, args=(interval,), name="model-reloader", daemon=True)
+        _reloader.start()
+    return True
+
+
+def model_version() -> str:
+    """Versão do modelo em uso: o nome no registry ou, sem registry, o prefixo do sha256 do arquivo."""
+    global _model_version
+    state = _state
+    if state is not None and state.version is not None:
+        return state.version
+    if _model_version is None:
+        _model_version = file_sha256(MODEL_PATH)[:12]
+    return _model_version
+
+
+def _audit_model_version() -> Optional[str]:
+    try:
+        return model_version()
+    except OSError:
+        return None
+
+
+def schema_path_for(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ".schema.json"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_feature_schema(
+    *,
+    model_path: str,
+    layout: str,
+    feature_names: list[str],
+    categories: Optional[dict[str, list[str]]] = None,
+    engine: Optional[str] = None,
+) -> dict:
+    if layout not in LAYOUTS:
+        raise ValueError(f"Layout de features desconhecido: {layout}")
+    return {
+        "schema_version": FEATURE_SCHEMA_VERSION,
+        "layout": layout,
+        "engine": engine,
+        "n_features": len(feature_names),
+        "feature_names": list(feature_names),
+        "categories": {k: list(v) for k, v in (categories or {}).items()},
+        "age_bins": list(AGE_BINS),
+        "age_labels": list(AGE_LABELS),
+        "model_sha256": file_sha256(model_path),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def notebook_categories(df: pd.DataFrame) -> dict[str, list[str]]:
+    """Categorias brutas (inclusive a baseline removida pelo drop_first) do dataset de treino."""
+    return {
+        "purpose": sorted(df["Purpose"].dropna().astype(str).unique()),
+        "sex": sorted(df["Sex"].dropna().astype(str).unique()),
+        "housing": sorted(df["Housing"].dropna().astype(str).unique()),
+        "saving_accounts": sorted(df["Saving accounts"].fillna("no_inf").astype(str).unique()),
+        "checking_account": sorted(df["Checking account"].fillna("no_inf").astype(str).unique()),
+        "age_cat": list(AGE_LABELS),
+    }
+
+
+def write_feature_schema(schema: dict, model_path: str) -> str:
+    path = schema_path_for(model_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _validate_feature_schema(schema: dict, model) -> None:
+    if schema.get("schema_version") != FEATURE_SCHEMA_VERSION:
+        raise ValueError(
+            f"Versão do schema de features não suportada ({schema.get('schema_version')}); esperado {FEATURE_SCHEMA_VERSION}."
+        )
+    if schema.get("layout") not in LAYOUTS:
+        raise ValueError(f"Layout de features desconhecido no schema: {schema.get('layout')}")
+    expected_features = getattr(model, "n_features_in_", None)
+    if expected_features is not None and expected_features != len(schema["feature_names"]):
+        raise ValueError(
+            f"Schema de features descreve {len(schema['feature_names'])} features, mas o modelo espera {expected_features}. "
+            "Regere o schema junto com o modelo."
+        )
+    feature_names_in = getattr(model, "feature_names_in_", None)
+    if feature_names_in is not None and list(feature_names_in) != list(schema["feature_names"]):
+        raise ValueError("Nomes de features do schema não correspondem aos do modelo.")
+
+
+def _read_feature_schema(model_path: str, predictor) -> Optional[dict]:
+    path = schema_path_for(model_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        schema = json.load(f)
+    # Mesma largura não basta: um schema antigo ao lado de outro .pkl trocaria layout e encoder.
+    if os.path.exists(model_path) and schema.get("model_sha256") != file_sha256(model_path):
+        raise ValueError(
+            f"Schema de features {path} foi gerado para outro modelo (model_sha256 diferente). "
+            "Regere o schema junto com o modelo."
+        )
+    _validate_feature_schema(schema, predictor)
+    return schema
 
 
-def _build_simple_features(*, age: int, income: float, loan_amount: float, duration: int, history_score: int) -> pd.DataFrame:
-    return pd.DataFrame(
-        [
-            {
-                "age": age,
-                "income": income,
-                "loan_amount": loan_amount,
-                "duration": duration,
-                "credit_history_score": history_score,
-            }
-        ]
-    )
+def _load_feature_schema() -> Optional[dict]:
+    return _get_state().schema
 
 
 def _apply_notebook_preprocessing(df: pd.DataFrame) -> pd.DataFrame:
-    interval = (18, 25, 35, 60, 120)
-    cats = ["Student", "Young", "Adult", "Senior"]
     if "Age_cat" not in df.columns:
-        df["Age_cat"] = pd.cut(df["Age"], interval, labels=cats)
-    df["Age_cat"] = df["Age_cat"].astype("object").fillna("Student")
+        df["Age_cat"] = pd.cut(df["Age"], AGE_BINS, labels=list(AGE_LABELS))
+    df["Age_cat"] = df["Age_cat"].astype("object").fillna(AGE_FALLBACK_LABEL)
 
     df["Saving accounts"] = df["Saving accounts"].fillna("no_inf")
     df["Checking account"] = df["Checking account"].fillna("no_inf")
@@ -80,10 +374,11 @@ def _apply_notebook_preprocessing(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def _get_notebook_feature_columns() -> list[str]:
-    global _notebook_feature_columns
-    if _notebook_feature_columns is not None:
-        return _notebook_feature_columns
+    return list(_get_notebook_encoder().feature_columns)
+
 
+def _dataset_feature_columns() -> list[str]:
+    """Colunas do notebook reconstruídas do dataset; só para modelos antigos, sem schema."""
     if not os.path.exists(DATA_PATH):
         raise FileNotFoundError(
             f"Dataset não encontrado em {DATA_PATH}. Necessário para reconstruir as features do modelo do notebook."
@@ -95,52 +390,152 @@ def _get_notebook_feature_columns() -> list[str]:
     if "Risk_bad" not in df.columns:
         raise RuntimeError("Pré-processamento do notebook não gerou a coluna 'Risk_bad'.")
 
-    _notebook_feature_columns = df.drop("Risk_bad", axis=1).columns.tolist()
-    return _notebook_feature_columns
+    return df.drop("Risk_bad", axis=1).columns.tolist()
 
 
-def _build_notebook_features(
-    *,
-    age: int,
-    loan_amount: float,
-    duration: int,
-    purpose: str = "radio/TV",
-    sex: str = "male",
-    housing: str = "own",
-    saving_accounts: str = "no_inf",
-    checking_account: str = "no_inf",
-    job: int = 1,
-) -> pd.DataFrame:
-    feature_columns = _get_notebook_feature_columns()
+_CATEGORICAL_DEFAULTS = {
+    "purpose": "radio/TV",
+    "sex": "male",
+    "housing": "own",
+    "saving_accounts": "no_inf",
+    "checking_account": "no_inf",
+    "job": 1,
+}
 
-    loan_amount = float(loan_amount)
-    credit_amount_log = math.log(loan_amount) if loan_amount > 0 else 0.0
+_FIELD_ALIASES = {
+    "score": "history_score",
+    "credit_history_score": "history_score",
+}
 
-    raw = pd.DataFrame(
-        [
-            {
-                "Age": int(age),
-                "Sex": str(sex),
-                "Job": int(job),
-                "Housing": str(housing),
-                "Saving accounts": None if saving_accounts is None else str(saving_accounts),
-                "Checking account": None if checking_account is None else str(checking_account),
-                "Credit amount": float(credit_amount_log),
-                "Duration": int(duration),
-                "Purpose": str(purpose),
-                "Risk": "good",
-            }
-        ]
+_REQUIRED_BATCH_FIELDS = ("age", "income", "loan_amount", "duration", "history_score")
+
+
+def _records_to_frame(records) -> pd.DataFrame:
+    if isinstance(records, pd.DataFrame):
+        frame = records.copy()
+    elif isinstance(records, np.ndarray):
+        if records.dtype.names is None:
+            raise TypeError("Array NumPy precisa ser estruturado (com nomes de campos) para o scoring em lote.")
+        frame = pd.DataFrame.from_records(records)
+    else:
+        frame = pd.DataFrame.from_records(list(records))
+
+    frame = frame.rename(columns={k: v for k, v in _FIELD_ALIASES.items() if k in frame.columns and v not in frame.columns})
+
+    missing = [field for field in _REQUIRED_BATCH_FIELDS if field not in frame.columns]
+    if missing and len(frame) > 0:
+        raise ValueError(f"Campos obrigatórios ausentes no lote: {', '.join(missing)}")
+
+    for field, default in _CATEGORICAL_DEFAULTS.items():
+        if field not in frame.columns:
+            frame[field] = default
+        else:
+            frame[field] = frame[field].astype("object").where(frame[field].notna(), default)
+
+    return frame.reset_index(drop=True)
+
+
+def _build_simple_features_batch(frame: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "age": frame["age"].astype(int).to_numpy(),
+            "income": frame["income"].astype(float).to_numpy(),
+            "loan_amount": frame["loan_amount"].astype(float).to_numpy(),
+            "duration": frame["duration"].astype(int).to_numpy(),
+            "credit_history_score": frame["history_score"].astype(int).to_numpy(),
+        }
     )
 
-    processed = _apply_notebook_preprocessing(raw)
 
-    if "Risk_bad" not in processed.columns:
-        processed["Risk_bad"] = 0
+def _build_notebook_encoder(schema: Optional[dict]) -> NotebookFeatureEncoder:
+    if schema is not None and schema.get("layout") == LAYOUT_NOTEBOOK:
+        return NotebookFeatureEncoder(
+            schema["feature_names"],
+            age_bins=schema.get("age_bins", AGE_BINS),
+            age_labels=schema.get("age_labels", AGE_LABELS),
+        )
+    return NotebookFeatureEncoder(_dataset_feature_columns())
+
+
+def _get_notebook_encoder() -> Optional[NotebookFeatureEncoder]:
+    return _get_state().encoder
+
+
+def _validate_feature_count(model, n_features: int) -> None:
+    expected_features = getattr(model, "n_features_in_", None)
+    if expected_features is not None and expected_features != n_features:
+        raise ValueError(
+            f"Modelo espera {expected_features} features, mas o pré-processamento gerou {n_features}. "
+            "Verifique se o models/credit_risk_model.pkl corresponde ao pipeline do notebook e se data/credit_data.csv é o mesmo usado no treino."
+        )
+
+
+def _layout_for(schema: Optional[dict], model) -> str:
+    """Layout declarado no schema gravado com o modelo (train_model).
+
+    Só artefatos antigos, sem schema, caem na dedução pelas features do estimador.
+    """
+    if schema is not None:
+        return schema["layout"]
+
+    feature_names_in = getattr(model, "feature_names_in_", None)
+    if feature_names_in is not None:
+        return LAYOUT_SIMPLE if tuple(feature_names_in) == SIMPLE_FEATURE_NAMES else LAYOUT_NOTEBOOK
+    return LAYOUT_SIMPLE if getattr(model, "n_features_in_", None) == len(SIMPLE_FEATURE_NAMES) else LAYOUT_NOTEBOOK
+
+
+def _uses_simple_features(model) -> bool:
+    return _layout_for(_get_state().schema, model) == LAYOUT_SIMPLE
+
+
+def _build_categorical_features_batch(frame: pd.DataFrame, schema: dict) -> np.ndarray:
+    return encode_native_categorical(frame, schema["feature_names"], schema["categories"])
+
+
+def _score_frame(frame: pd.DataFrame, state: Optional[_ModelState] = None) -> tuple[np.ndarray, np.ndarray]:
+    state = state or _get_state()
+    predictor = state.predictor
+
+    if state.layout == LAYOUT_SIMPLE:
+        X: Any = _build_simple_features_batch(frame)
+        if getattr(predictor, "feature_names_in_", None) is None:
+            X = X.to_numpy(dtype=np.float64)
+    elif state.layout == LAYOUT_CATEGORICAL:
+        X = _build_categorical_features_batch(frame, state.schema)
+    else:
+        _validate_feature_count(predictor, state.encoder.n_features)
+        X = state.encoder.encode_frame(frame)
+
+    if isinstance(predictor, CompiledForest) and len(frame) > FOREST_MAX_BATCH_ROWS:
+        predictor = _get_batch_estimator(state)
+    proba = predictor.predict_proba(X)
+    predictions = predictor.classes_.take(np.argmax(proba, axis=1))
+    return predictions, proba[:, 1]
+
+
+def _format_result(prediction, probability) -> dict:
+    return {
+        "risk_prediction": int(prediction),
+        "risk_probability": float(probability),
+        "status": "HIGH_RISK" if prediction == 1 else "LOW_RISK",
+    }
+
+
+def _format_proba(predictor, proba: np.ndarray) -> dict:
+    return _format_result(predictor.classes_[int(np.argmax(proba))], proba[1])
 
-    X_df = processed.drop("Risk_bad", axis=1)
-    X_df = X_df.reindex(columns=feature_columns, fill_value=0)
-    return X_df
+
+def score_credit_risk_batch(records) -> tuple[np.ndarray, np.ndarray]:
+    """Como predict_credit_risk_batch, mas devolve arrays (predições, probabilidade de risco) sem montar dicts."""
+    frame = _records_to_frame(records)
+    if frame.empty:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    return _score_frame(frame)
+
+
+def predict_credit_risk_batch(records) -> list[dict]:
+    predictions, probabilities = score_credit_risk_batch(records)
+    return [_format_result(pred, prob) for pred, prob in zip(predictions.tolist(), probabilities.tolist())]
 
 
 def predict_credit_risk(
@@ -157,60 +552,69 @@ def predict_credit_risk(
     checking_account: str = "no_inf",
     job: int = 1,
 ):
-    model = _load_model()
-
-    if purpose is None:
-        purpose = "radio/TV"
-    if sex is None:
-        sex = "male"
-    if housing is None:
-        housing = "own"
-    if saving_accounts is None:
-        saving_accounts = "no_inf"
-    if checking_account is None:
-        checking_account = "no_inf"
-    if job is None:
-        job = 1
-
-    expected_features = getattr(model, "n_features_in_", None)
-    feature_names_in = getattr(model, "feature_names_in_", None)
-
-    if expected_features == 5 or (isinstance(feature_names_in, (list, tuple)) and len(feature_names_in) == 5):
-        input_data: Any = _build_simple_features(
-            age=int(age),
-            income=float(income),
-            loan_amount=float(loan_amount),
-            duration=int(duration),
-            history_score=int(history_score),
+    state = _get_state()
+    predictor, layout, schema = state.predictor, state.layout, state.schema
+    if layout == LAYOUT_CATEGORICAL:
+        X = encode_native_categorical_row(
+            {
+                "age": age,
+                "job": _CATEGORICAL_DEFAULTS["job"] if job is None else job,
+                "loan_amount": loan_amount,
+                "duration": duration,
+                "purpose": _CATEGORICAL_DEFAULTS["purpose"] if purpose is None else purpose,
+                "sex": _CATEGORICAL_DEFAULTS["sex"] if sex is None else sex,
+                "housing": _CATEGORICAL_DEFAULTS["housing"] if housing is None else housing,
+                "saving_accounts": _CATEGORICAL_DEFAULTS["saving_accounts"] if saving_accounts is None else saving_accounts,
+                "checking_account": _CATEGORICAL_DEFAULTS["checking_account"] if checking_account is None else checking_account,
+            },
+            schema["feature_names"],
+            schema["categories"],
         )
-    else:
-        input_data = _build_notebook_features(
-            age=int(age),
-            loan_amount=float(loan_amount),
-            duration=int(duration),
-            purpose=purpose,
-            sex=sex,
-            housing=housing,
-            saving_accounts=saving_accounts,
-            checking_account=checking_account,
-            job=int(job) if job is not None else 1,
+        return _format_proba(predictor, predictor.predict_proba(X)[0])
+
+    if layout == LAYOUT_SIMPLE:
+        names = getattr(predictor, "feature_names_in_", None)
+        if names is None or (isinstance(predictor, CompiledForest) and tuple(names) == SIMPLE_FEATURE_NAMES):
+            # Caminho rápido: uma linha direto em ndarray, sem montar DataFrame.
+            X = np.array([[int(age), float(income), float(loan_amount), int(duration), int(history_score)]])
+            return _format_proba(predictor, predictor.predict_proba(X)[0])
+        frame = _records_to_frame(
+            [
+                {
+                    "age": age,
+                    "income": income,
+                    "loan_amount": loan_amount,
+                    "duration": duration,
+                    "history_score": history_score,
+                    "purpose": purpose,
+                    "sex": sex,
+                    "housing": housing,
+                    "saving_accounts": saving_accounts,
+                    "checking_account": checking_account,
+                    "job": job,
+                }
+            ]
         )
+        predictions, probabilities = _score_frame(frame, state)
+        return _format_result(predictions[0], probabilities[0])
+
+    encoder = state.encoder
+    _validate_feature_count(predictor, encoder.n_features)
+    X = encoder.encode_one(
+        age=int(age),
+        loan_amount=float(loan_amount),
+        duration=int(duration),
+        purpose=_CATEGORICAL_DEFAULTS["purpose"] if purpose is None else purpose,
+        sex=_CATEGORICAL_DEFAULTS["sex"] if sex is None else sex,
+        housing=_CATEGORICAL_DEFAULTS["housing"] if housing is None else housing,
+        saving_accounts=_CATEGORICAL_DEFAULTS["saving_accounts"] if saving_accounts is None else saving_accounts,
+        checking_account=_CATEGORICAL_DEFAULTS["checking_account"] if checking_account is None else checking_account,
+        job=_CATEGORICAL_DEFAULTS["job"] if job is None else int(job),
+    )
+    return _format_proba(predictor, predictor.predict_proba(X)[0])
 
-        if expected_features is not None and expected_features != input_data.shape[1]:
-            raise ValueError(
-                f"Modelo espera {expected_features} features, mas o pré-processamento gerou {input_data.shape[1]}. "
-                "Verifique se o models/credit_risk_model.pkl corresponde ao pipeline do notebook e se data/credit_data.csv é o mesmo usado no treino."
-            )
-
-    X = input_data
-    if expected_features is not None and expected_features != 5 and isinstance(input_data, pd.DataFrame):
-        X = input_data.values
 
-    prediction = model.predict(X)[0]
-    probability = model.predict_proba(X)[0][1]
-    
-    return {
-        "risk_prediction": int(prediction),
-        "risk_probability": float(probability),
-        "status": "HIGH_RISK" if prediction == 1 else "LOW_RISK"
-    }
\ No newline at end of file
+_active = model_registry.active_model()
+if _active is not None:
+    _model_version, MODEL_PATH = _active
+db_tools.set_model_version_hook(_audit_model_version)
@@ -0,0 +1,155 @@
+"""Engines do modelo de risco: estimador, grade de hiperparâmetros e layout de features de cada um.
+
+- random_forest: RandomForestClassifier do notebook (one-hot no German Credit); servido pela floresta
+  compilada do forest_evaluator.
+- hist_gradient_boosting: HistGradientBoostingClassifier com suporte nativo a categorias (uma coluna
+  por campo, sem one-hot); servido pelo próprio estimador.
+
+O engine e o layout ficam no schema gravado com o modelo (<modelo>.schema.json), e é de lá que o
+serving (ml_tools) decide como montar as features.
+"""
+from __future__ import annotations
+
+import os
+from abc import ABC, abstractmethod
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+
+from src.tools.feature_encoder import NATIVE_CATEGORICAL_FIELDS, NATIVE_FEATURE_NAMES, encode_native_categorical
+from src.tools.ml_tools import (
+    LAYOUT_CATEGORICAL,
+    LAYOUT_NOTEBOOK,
+    LAYOUT_SIMPLE,
+    SIMPLE_FEATURE_NAMES,
+    _apply_notebook_preprocessing,
+    notebook_categories,
+)
+
+ENGINE_RANDOM_FOREST = "random_forest"
+ENGINE_HIST_GRADIENT_BOOSTING = "hist_gradient_boosting"
+DEFAULT_ENGINE = os.environ.get("ML_MODEL_ENGINE", ENGINE_RANDOM_FOREST)
+
+# random_state do notebook.
+MODEL_RANDOM_STATE = 2
+
+
+class PreparedData(NamedTuple):
+    layout: str
+    X: pd.DataFrame
+    y: np.ndarray
+    categories: Optional[dict[str, list[str]]]
+
+
+class ModelEngine(ABC):
+    """Base: o dataset sintético (layout simples) é igual para todos os engines."""
+
+    name = ""
+    # Treina com DataFrame no layout simples (feature_names_in_); senão com ndarray, como o notebook.
+    keeps_feature_names = False
+    # Grade da busca (train_model) e candidato único para treinar sem busca (benchmarks).
+    param_grid: dict = {}
+    baseline_grid: dict = {}
+
+    def prepare(self, raw: pd.DataFrame, dataset_layout: str) -> PreparedData:
+        if dataset_layout == LAYOUT_SIMPLE:
+            X = raw[list(SIMPLE_FEATURE_NAMES)].copy()
+            return PreparedData(LAYOUT_SIMPLE, X, raw["risk"].to_numpy(dtype=np.int64), None)
+        return self._prepare_notebook(raw)
+
+    @abstractmethod
+    def _prepare_notebook(self, raw: pd.DataFrame) -> PreparedData:
+        """Features e alvo do German Credit no layout do engine."""
+
+    def grid_for(self, param_grid: dict, n_features: int) -> dict:
+        return dict(param_grid)
+
+    @abstractmethod
+    def estimator(self, categorical_features: Optional[list[bool]] = None):
+        """Estimador sklearn ainda não treinado."""
+
+
+class RandomForestEngine(ModelEngine):
+    name = ENGINE_RANDOM_FOREST
+    # Mantém o artefato compatível com o do setup_model.py original.
+    keeps_feature_names = True
+    # Grade do notebook (GridSearchCV sobre RandomForestClassifier(random_state=2)).
+    param_grid = {
+        "max_depth": [3, 5, 7, 10, None],
+        "n_estimators": [3, 5, 10, 25, 50, 150],
+        "max_features": [4, 7, 15, 20],
+    }
+    baseline_grid = {"n_estimators": [100]}
+
+    def _prepare_notebook(self, raw: pd.DataFrame) -> PreparedData:
+        df = raw.copy()
+        df["Credit amount"] = np.log(df["Credit amount"])
+        df = _apply_notebook_preprocessing(df)
+        y = df.pop("Risk_bad").to_numpy(dtype=np.int64)
+        return PreparedData(LAYOUT_NOTEBOOK, df.astype(np.float64), y, notebook_categories(raw))
+
+    def grid_for(self, param_grid: dict, n_features: int) -> dict:
+        grid = dict(param_grid)
+        if "max_features" in grid:
+            # Inteiros acima do número de features (ex.: 15 e 20 no layout simples) viram o total.
+            values = [min(v, n_features) if isinstance(v, int) else v for v in grid["max_features"]]
+            grid["max_features"] = list(dict.fromkeys(values))
+        return grid
+
+    def estimator(self, categorical_features: Optional[list[bool]] = None):
+        # n_jobs=1: o paralelismo da busca fica entre candidatos x folds.
+        return RandomForestClassifier(random_state=MODEL_RANDOM_STATE, n_jobs=1)
+
+
+class HistGradientBoostingEngine(ModelEngine):
+    name = ENGINE_HIST_GRADIENT_BOOSTING
+    param_grid = {
+        "learning_rate": [0.05, 0.1],
+        "max_iter": [100, 300],
+        "max_leaf_nodes": [15, 31],
+        "l2_regularization": [0.0, 1.0],
+    }
+    baseline_grid = {"max_iter": [100]}
+
+    def _prepare_notebook(self, raw: pd.DataFrame) -> PreparedData:
+        frame = pd.DataFrame(
+            {
+                "age": raw["Age"],
+                "job": raw["Job"],
+                "loan_amount": raw["Credit amount"],
+                "duration": raw["Duration"],
+                "purpose": raw["Purpose"],
+                "sex": raw["Sex"],
+                "housing": raw["Housing"],
+                "saving_accounts": raw["Saving accounts"].fillna("no_inf"),
+                "checking_account": raw["Checking account"].fillna("no_inf"),
+            }
+        )
+        categories = {field: sorted(frame[field].astype(str).unique()) for field in NATIVE_CATEGORICAL_FIELDS}
+        X = pd.DataFrame(
+            encode_native_categorical(frame, NATIVE_FEATURE_NAMES, categories),
+            columns=list(NATIVE_FEATURE_NAMES),
+            index=raw.index,
+        )
+        y = (raw["Risk"] == "bad").to_numpy(dtype=np.int64)
+        return PreparedData(LAYOUT_CATEGORICAL, X, y, categories)
+
+    def estimator(self, categorical_features: Optional[list[bool]] = None):
+        return HistGradientBoostingClassifier(
+            categorical_features=categorical_features if categorical_features and any(categorical_features) else None,
+            random_state=MODEL_RANDOM_STATE,
+        )
+
+
+ENGINES: dict[str, ModelEngine] = {
+    engine.name: engine for engine in (RandomForestEngine(), HistGradientBoostingEngine())
+}
+
+
+def get_engine(name: Optional[str] = None) -> ModelEngine:
+    name = (name or DEFAULT_ENGINE).strip().lower()
+    if name not in ENGINES:
+        raise ValueError(f"Engine desconhecido: {name!r}. Opções: {', '.join(ENGINES)}.")
+    return ENGINES[name]
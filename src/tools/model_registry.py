@@ -0,0 +1,164 @@
+"""Registry de modelos: uma pasta por versão e um manifest apontando a versão ativa.
+
+    models/registry/
+        manifest.json              {"active": "<versão>", "versions": {"<versão>": {...}}}
+        <versão>/credit_risk_model.pkl (+ .schema.json e .forest.npz)
+
+Os processos em execução recarregam a versão ativa sem reinício (ver ml_tools.reload_model).
+
+Uso: python -m src.tools.model_registry publish models/credit_risk_model.pkl [--version v2] [--no-activate]
+     python -m src.tools.model_registry activate <versão>
+     python -m src.tools.model_registry list
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+from datetime import datetime, timezone
+from typing import Optional
+
+REGISTRY_DIR = os.environ.get(
+    "ML_MODEL_REGISTRY", os.path.join(os.path.dirname(__file__), "../../models/registry")
+)
+MANIFEST_NAME = "manifest.json"
+MODEL_FILENAME = "credit_risk_model.pkl"
+
+_VERSION_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+
+def _root(root: Optional[str]) -> str:
+    return root or REGISTRY_DIR
+
+
+def manifest_path(root: Optional[str] = None) -> str:
+    return os.path.join(_root(root), MANIFEST_NAME)
+
+
+def read_manifest(root: Optional[str] = None) -> Optional[dict]:
+    """Manifest do registry; None se o registry ainda não foi criado."""
+    path = manifest_path(root)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(manifest: dict, root: Optional[str]) -> None:
+    path = manifest_path(root)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def model_path_for(version: str, root: Optional[str] = None) -> str:
+    return os.path.join(_root(root), version, MODEL_FILENAME)
+
+
+def active_model(root: Optional[str] = None) -> Optional[tuple[str, str]]:
+    """(versão, caminho do .pkl) da versão ativa; None sem registry ou sem versão ativa."""
+    manifest = read_manifest(root)
+    if not manifest or not manifest.get("active"):
+        return None
+    version = manifest["active"]
+    return version, model_path_for(version, root)
+
+
+def list_versions(root: Optional[str] = None) -> list[dict]:
+    manifest = read_manifest(root) or {}
+    active = manifest.get("active")
+    return [
+        {"version": version, "active": version == active, **info}
+        for version, info in sorted(manifest.get("versions", {}).items(), key=lambda item: item[1].get("created_at", ""))
+    ]
+
+
+def publish(model_path: str, *, version: Optional[str] = None, activate: bool = True, root: Optional[str] = None) -> str:
+    """Copia o .pkl (e os sidecars de schema/floresta) para uma nova versão do registry.
+
+    Sem `version`, usa o prefixo do sha256 do .pkl. A floresta compilada é exportada se não existir
+    ao lado do .pkl, para que os workers possam mapeá-la em memória.
+    """
+    from src.tools.forest_evaluator import compile_forest, export_forest, forest_path_for, is_compilable, load_forest
+    from src.tools.ml_tools import file_sha256, schema_path_for
+
+    model_sha256 = file_sha256(model_path)
+    version = version or model_sha256[:12]
+    if not _VERSION_PATTERN.fullmatch(version):
+        raise ValueError(f"Nome de versão inválido: {version!r}")
+
+    manifest = read_manifest(root) or {"active": None, "versions": {}}
+    target_dir = os.path.join(_root(root), version)
+    if version in manifest["versions"] or os.path.exists(target_dir):
+        raise ValueError(f"Versão {version} já existe no registry.")
+
+    # Copia para uma pasta temporária e renomeia: a versão só aparece completa.
+    tmp_dir = target_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    target_model = os.path.join(tmp_dir, MODEL_FILENAME)
+    shutil.copyfile(model_path, target_model)
+    if os.path.exists(schema_path_for(model_path)):
+        shutil.copyfile(schema_path_for(model_path), schema_path_for(target_model))
+    if load_forest(forest_path_for(model_path), model_sha256=model_sha256) is not None:
+        shutil.copyfile(forest_path_for(model_path), forest_path_for(target_model))
+    else:
+        import joblib
+
+        model = joblib.load(model_path)
+        if is_compilable(model):
+            export_forest(compile_forest(model), forest_path_for(target_model), model_sha256=model_sha256)
+    os.replace(tmp_dir, target_dir)
+
+    manifest["versions"][version] = {
+        "model_sha256": model_sha256,
+        "source": os.path.abspath(model_path),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    if activate:
+        manifest["active"] = version
+    _write_manifest(manifest, root)
+    return version
+
+
+def activate(version: str, root: Optional[str] = None) -> None:
+    """Torna `version` a versão ativa; os processos a carregam no próximo ciclo de recarga."""
+    manifest = read_manifest(root)
+    if not manifest or version not in manifest.get("versions", {}):
+        raise ValueError(f"Versão {version} não encontrada no registry.")
+    if not os.path.exists(model_path_for(version, root)):
+        raise FileNotFoundError(f"Artefato da versão {version} ausente em {model_path_for(version, root)}.")
+    manifest["active"] = version
+    _write_manifest(manifest, root)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Registry de versões do modelo de risco.")
+    parser.add_argument("--registry", default=None, help=f"pasta do registry (padrão: {REGISTRY_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    publish_cmd = commands.add_parser("publish", help="publica um .pkl como nova versão")
+    publish_cmd.add_argument("model")
+    publish_cmd.add_argument("--version", default=None)
+    publish_cmd.add_argument("--no-activate", action="store_true")
+    activate_cmd = commands.add_parser("activate", help="troca a versão ativa")
+    activate_cmd.add_argument("version")
+    commands.add_parser("list", help="lista as versões")
+    args = parser.parse_args(argv)
+
+    if args.command == "publish":
+        version = publish(args.model, version=args.version, activate=not args.no_activate, root=args.registry)
+        print(f"📦 Versão {version} publicada" + ("" if args.no_activate else " e ativada"))
+    elif args.command == "activate":
+        activate(args.version, root=args.registry)
+        print(f"✅ Versão ativa: {args.version}")
+    else:
+        for entry in list_versions(args.registry):
+            print(f"{'*' if entry['active'] else ' '} {entry['version']:<20} {entry.get('created_at', '')}  {entry.get('model_sha256', '')[:12]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,299 @@
+"""Treino do modelo de risco: pré-processamento em cache + busca de hiperparâmetros com validação cruzada em paralelo.
+
+Aceita o dataset do notebook (German Credit: Age, Sex, Job, ..., Risk) ou o sintético do setup_model.py
+(age, income, loan_amount, duration, credit_history_score, risk). O estimador e o layout de features vêm
+do engine (model_engines). Grava o modelo, o schema de features, a floresta compilada (random_forest)
+e <modelo>.metrics.json.
+
+Uso: python -m src.tools.train_model [--data data/credit_data.csv] [--output models/credit_risk_model.pkl]
+     [--engine random_forest|hist_gradient_boosting] [--n-jobs 0] [--cv 5] [--scoring recall]
+     [--scaling 1,2,4] [--publish]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.metrics import accuracy_score, f1_score, fbeta_score, precision_score, recall_score, roc_auc_score
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+
+from src.tools.forest_evaluator import compile_forest, export_forest, forest_path_for, is_compilable
+from src.tools.ml_tools import (
+    DATA_PATH,
+    DEFAULT_MODEL_PATH,
+    LAYOUT_CATEGORICAL,
+    LAYOUT_NOTEBOOK,
+    LAYOUT_SIMPLE,
+    SIMPLE_FEATURE_NAMES,
+    build_feature_schema,
+    file_sha256,
+    write_feature_schema,
+)
+from src.tools.model_engines import DEFAULT_ENGINE, ENGINES, get_engine
+
+CACHE_DIR = os.environ.get(
+    "ML_TRAIN_CACHE_DIR", os.path.join(os.path.dirname(__file__), "../../.cache/training")
+)
+
+NOTEBOOK_COLUMNS = ("Age", "Sex", "Job", "Housing", "Saving accounts", "Checking account", "Credit amount", "Duration", "Purpose", "Risk")
+
+# Mesmos valores do notebook: scoring="recall" (classe "bad"), test_size=0.25, random_state=42.
+DEFAULT_SCORING = "recall"
+DEFAULT_CV = 5
+TEST_SIZE = 0.25
+SPLIT_RANDOM_STATE = 42
+
+
+def metrics_path_for(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ".metrics.json"
+
+
+def _resolve_n_jobs(n_jobs: Optional[int]) -> int:
+    # 0 ou None = um processo por núcleo, como BATCH_WORKERS.
+    return int(n_jobs) if n_jobs else (os.cpu_count() or 1)
+
+
+def dataset_layout(raw: pd.DataFrame) -> str:
+    if all(column in raw.columns for column in NOTEBOOK_COLUMNS):
+        return LAYOUT_NOTEBOOK
+    if all(column in raw.columns for column in (*SIMPLE_FEATURE_NAMES, "risk")):
+        return LAYOUT_SIMPLE
+    raise ValueError(
+        "Dataset não reconhecido: esperado o German Credit do notebook "
+        f"({', '.join(NOTEBOOK_COLUMNS)}) ou o sintético ({', '.join(SIMPLE_FEATURE_NAMES)}, risk)."
+    )
+
+
+def read_dataset(path: str) -> pd.DataFrame:
+    raw = pd.read_csv(path)
+    # O CSV do notebook traz o índice salvo como primeira coluna sem nome (lido com index_col=0).
+    if raw.columns[0].startswith("Unnamed"):
+        raw = raw.set_index(raw.columns[0])
+        raw.index.name = None
+    return raw
+
+
+def preprocess(raw: pd.DataFrame, engine: Optional[str] = None) -> tuple[str, pd.DataFrame, np.ndarray, Optional[dict]]:
+    """(layout, X, y, categorias) com as transformações do engine para este dataset."""
+    return tuple(get_engine(engine).prepare(raw, dataset_layout(raw)))
+
+
+def _preprocess_file(
+    path: str, data_sha256: str, engine: str
+) -> tuple[pd.DataFrame, str, pd.DataFrame, np.ndarray, Optional[dict]]:
+    # `data_sha256` só entra na chave do cache: mudou o conteúdo, muda a entrada.
+    raw = read_dataset(path)
+    return (raw, *preprocess(raw, engine))
+
+
+def load_features(
+    path: str, cache_dir: Optional[str] = CACHE_DIR, engine: Optional[str] = None
+) -> tuple[pd.DataFrame, str, pd.DataFrame, np.ndarray, Optional[dict]]:
+    """Lê e pré-processa o dataset, reaproveitando o resultado em disco (joblib.Memory) entre execuções."""
+    engine = get_engine(engine).name
+    if not cache_dir:
+        return _preprocess_file(path, file_sha256(path), engine)
+    memory = joblib.Memory(cache_dir, verbose=0)
+    return memory.cache(_preprocess_file)(os.path.abspath(path), file_sha256(path), engine)
+
+
+def search(
+    X,
+    y: np.ndarray,
+    *,
+    engine: Optional[str] = None,
+    categorical_features: Optional[list[bool]] = None,
+    param_grid: Optional[dict] = None,
+    cv: int = DEFAULT_CV,
+    scoring: str = DEFAULT_SCORING,
+    n_jobs: Optional[int] = None,
+) -> GridSearchCV:
+    """GridSearchCV com os folds distribuídos num pool de processos (joblib/loky).
+
+    Cada estimador treina num só núcleo: o paralelismo fica entre candidatos x folds, sem disputar núcleos.
+    """
+    model_engine = get_engine(engine)
+    grid = model_engine.grid_for(param_grid or model_engine.param_grid, X.shape[1])
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=SPLIT_RANDOM_STATE)
+    searcher = GridSearchCV(
+        model_engine.estimator(categorical_features),
+        param_grid=grid,
+        cv=folds,
+        scoring=scoring,
+        n_jobs=_resolve_n_jobs(n_jobs),
+        refit=True,
+    )
+    return searcher.fit(X, y)
+
+
+def evaluate(model, X, y: np.ndarray) -> dict:
+    proba = model.predict_proba(X)[:, 1]
+    pred = model.predict(X)
+    return {
+        "accuracy": float(accuracy_score(y, pred)),
+        "recall": float(recall_score(y, pred, zero_division=0)),
+        "precision": float(precision_score(y, pred, zero_division=0)),
+        "f1": float(f1_score(y, pred, zero_division=0)),
+        "fbeta2": float(fbeta_score(y, pred, beta=2, zero_division=0)),
+        "roc_auc": float(roc_auc_score(y, proba)) if len(np.unique(y)) > 1 else None,
+        "n_samples": int(len(y)),
+    }
+
+
+def measure_scaling(X, y: np.ndarray, n_jobs_list: list[int], **search_kwargs) -> list[dict]:
+    """Tempo da mesma busca com 1..N processos; speedup e eficiência relativos à primeira medida."""
+    report = []
+    for n_jobs in n_jobs_list:
+        started = time.perf_counter()
+        search(X, y, n_jobs=n_jobs, **search_kwargs)
+        report.append({"n_jobs": int(n_jobs), "wall_s": time.perf_counter() - started})
+    for entry in report:
+        entry["speedup"] = report[0]["wall_s"] / entry["wall_s"] if entry["wall_s"] > 0 else 0.0
+        entry["efficiency"] = entry["speedup"] * report[0]["n_jobs"] / entry["n_jobs"]
+    return report
+
+
+def train(
+    data_path: str = DATA_PATH,
+    output_path: str = DEFAULT_MODEL_PATH,
+    *,
+    engine: Optional[str] = None,
+    param_grid: Optional[dict] = None,
+    cv: int = DEFAULT_CV,
+    scoring: str = DEFAULT_SCORING,
+    n_jobs: Optional[int] = None,
+    scaling: tuple[int, ...] = (),
+    cache_dir: Optional[str] = CACHE_DIR,
+) -> dict:
+    """Treina, avalia no conjunto de teste e grava modelo + schema + floresta + métricas. Devolve as métricas."""
+    model_engine = get_engine(engine)
+    engine = model_engine.name
+    started = time.perf_counter()
+    _, layout, X, y, categories = load_features(data_path, cache_dir, engine)
+    preprocess_s = time.perf_counter() - started
+    categorical_features = [name in categories for name in X.columns] if layout == LAYOUT_CATEGORICAL else None
+    search_kwargs = dict(
+        engine=engine, categorical_features=categorical_features, param_grid=param_grid, cv=cv, scoring=scoring
+    )
+
+    # O notebook treina sobre `.values`: sem feature_names_in_, como os encoders entregam no serving.
+    X_fit = X if layout == LAYOUT_SIMPLE and model_engine.keeps_feature_names else X.to_numpy(dtype=np.float64)
+    X_train, X_test, y_train, y_test = train_test_split(X_fit, y, test_size=TEST_SIZE, random_state=SPLIT_RANDOM_STATE)
+
+    workers = _resolve_n_jobs(n_jobs)
+    search_started = time.perf_counter()
+    result = search(X_train, y_train, n_jobs=workers, **search_kwargs)
+    search_s = time.perf_counter() - search_started
+    model = result.best_estimator_
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    joblib.dump(model, output_path)
+    schema = build_feature_schema(
+        model_path=output_path,
+        layout=layout,
+        feature_names=X.columns.tolist(),
+        categories=categories,
+        engine=engine,
+    )
+    write_feature_schema(schema, output_path)
+    model_sha256 = file_sha256(output_path)
+    if is_compilable(model):
+        export_forest(compile_forest(model), forest_path_for(output_path), model_sha256=model_sha256)
+    elif os.path.exists(forest_path_for(output_path)):
+        os.remove(forest_path_for(output_path))
+
+    metrics = {
+        "engine": engine,
+        "model_sha256": model_sha256,
+        "data_path": os.path.abspath(data_path),
+        "data_sha256": file_sha256(data_path),
+        "layout": layout,
+        "n_rows": int(len(y)),
+        "n_features": int(X.shape[1]),
+        "cv": {
+            "folds": cv,
+            "scoring": scoring,
+            "n_candidates": int(len(result.cv_results_["params"])),
+            "best_score": float(result.best_score_),
+            "best_params": result.best_params_,
+        },
+        "test": evaluate(model, X_test, y_test),
+        "n_jobs": workers,
+        "cpu_count": os.cpu_count(),
+        "timings_s": {
+            "preprocess": preprocess_s,
+            "search": search_s,
+            "total": time.perf_counter() - started,
+        },
+        "scaling": measure_scaling(X_train, y_train, list(scaling), **search_kwargs) if scaling
+        else [],
+        "sklearn_version": sklearn.__version__,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    path = metrics_path_for(output_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(metrics, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp_path, path)
+    return metrics
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Treina o modelo de risco com busca de hiperparâmetros em paralelo.")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--output", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--engine", default=DEFAULT_ENGINE, choices=list(ENGINES))
+    parser.add_argument("--n-jobs", type=int, default=0, help="processos da busca (0 = um por núcleo)")
+    parser.add_argument("--cv", type=int, default=DEFAULT_CV)
+    parser.add_argument("--scoring", default=DEFAULT_SCORING)
+    parser.add_argument("--scaling", default="", help="mede a busca com estes nº de processos, ex.: 1,2,4")
+    parser.add_argument("--no-cache", action="store_true", help="ignora o cache do pré-processamento")
+    parser.add_argument("--publish", action="store_true", help="publica e ativa a versão no registry")
+    args = parser.parse_args(argv)
+
+    metrics = train(
+        args.data,
+        args.output,
+        engine=args.engine,
+        cv=args.cv,
+        scoring=args.scoring,
+        n_jobs=args.n_jobs,
+        scaling=tuple(int(n) for n in args.scaling.split(",") if n.strip()),
+        cache_dir=None if args.no_cache else CACHE_DIR,
+    )
+    cv, test, timings = metrics["cv"], metrics["test"], metrics["timings_s"]
+    print(f"🧠 {metrics['engine']} ({metrics['layout']}): {metrics['n_rows']} linhas, {metrics['n_features']} features")
+    print(
+        f"🔎 {cv['n_candidates']} candidatos x {cv['folds']} folds em {metrics['n_jobs']} processos: "
+        f"{timings['search']:.1f}s (pré-processamento {timings['preprocess']:.2f}s)"
+    )
+    print(f"✅ melhor {cv['scoring']} (CV) = {cv['best_score']:.3f} com {cv['best_params']}")
+    print(
+        f"📊 teste: recall={test['recall']:.3f} precision={test['precision']:.3f} "
+        f"roc_auc={test['roc_auc'] if test['roc_auc'] is None else round(test['roc_auc'], 3)} accuracy={test['accuracy']:.3f}"
+    )
+    for entry in metrics["scaling"]:
+        print(
+            f"   n_jobs={entry['n_jobs']:>2}: {entry['wall_s']:7.1f}s  speedup {entry['speedup']:.2f}x  "
+            f"eficiência {entry['efficiency']:.0%}"
+        )
+    print(f"💾 {os.path.normpath(args.output)} (+ schema, {'floresta e ' if os.path.exists(forest_path_for(args.output)) else ''}{os.path.basename(metrics_path_for(args.output))})")
+
+    if args.publish:
+        from src.tools import model_registry
+
+        version = model_registry.publish(args.output)
+        print(f"📦 Versão {version} publicada e ativada no registry")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,17 +2,27 @@ from __future__ import annotations
 
 import gradio as gr
 
+from src.agents.orchestrator import get_orchestrator
 from src.services.cpf_service import format_cpf_input
 from src.tools.db_tools import setup_database
 from src.ui.handlers.analysis import process_credit_analysis
 from src.ui.handlers.clients import (
     client_choices,
     create_client_and_refresh,
-    list_clients_rows,
+    first_clients_page,
     load_client_for_edit,
+    next_clients_page,
+    previous_clients_page,
+    search_client_choices,
     update_client_and_refresh,
 )
-from src.ui.handlers.history import list_applications_rows
+from src.ui.handlers.history import (
+    STATUS_FILTER_ALL,
+    STATUS_FILTER_CHOICES,
+    first_history_page,
+    next_history_page,
+    previous_history_page,
+)
 
 
 MODAL_CSS = """
@@ -35,6 +45,7 @@ MODAL_CSS = """
 
 def create_demo() -> gr.Blocks:
     setup_database()
+    get_orchestrator()
 
     purpose_choices = [
         "radio/TV",
@@ -61,10 +72,11 @@ def create_demo() -> gr.Blocks:
                     with gr.Column():
                         initial_choices = client_choices()
                         client_dropdown = gr.Dropdown(
-                            label="Cliente (pesquise pelo nome)",
+                            label="Cliente (pesquise pelo nome ou CPF)",
                             choices=initial_choices,
                             value=initial_choices[0] if initial_choices else None,
                             interactive=True,
+                            allow_custom_value=True,
                         )
                         inp_amount = gr.Number(label="Valor", value=10000)
                         inp_duration = gr.Slider(6, 72, step=6, label="Meses", value=24)
@@ -89,7 +101,7 @@ def create_demo() -> gr.Blocks:
                     label="🧪 Cenários de Teste (Clique para preencher)",
                 )
 
-            with gr.Tab("Clientes"):
+            with gr.Tab("Clientes") as clients_tab:
                 gr.Markdown("Gerencie clientes: cadastre novos, edite existentes e acompanhe a lista.")
 
                 with gr.Row():
@@ -128,6 +140,13 @@ def create_demo() -> gr.Blocks:
                         interactive=False,
                         wrap=True,
                     )
+                    with gr.Row():
+                        btn_clients_prev = gr.Button("⬅️ Anterior")
+                        clients_page_label = gr.Markdown("")
+                        btn_clients_next = gr.Button("Próxima ➡️")
+                clients_page_cursors = gr.State([None])
+                clients_next_cursor = gr.State(None)
+                clients_outputs = [clients_table, clients_page_cursors, clients_next_cursor, clients_page_label]
 
                 def ui_open_create_modal():
                     return gr.update(visible=True), gr.update(visible=False), gr.update(visible=False)
@@ -169,10 +188,11 @@ def create_demo() -> gr.Blocks:
                     gr.Markdown("## Editar cliente")
                     edit_choices = client_choices()
                     edit_dropdown = gr.Dropdown(
-                        label="Selecione o cliente",
+                        label="Selecione o cliente (pesquise pelo nome ou CPF)",
                         choices=edit_choices,
                         value=edit_choices[0] if edit_choices else None,
                         interactive=True,
+                        allow_custom_value=True,
                     )
                     edit_name = gr.Textbox(label="Nome", value="")
                     edit_cpf = gr.Textbox(label="CPF", value="", placeholder="XXX.XXX.XXX-XX")
@@ -257,8 +277,8 @@ def create_demo() -> gr.Blocks:
                         client_dropdown,
                         edit_dropdown,
                     ],
-                    outputs=[out_create, client_dropdown, edit_dropdown, clients_table, modal_create, modal_edit, clients_list_group],
-                )
+                    outputs=[out_create, client_dropdown, edit_dropdown, modal_create, modal_edit, clients_list_group],
+                ).then(fn=first_clients_page, inputs=[], outputs=clients_outputs)
 
                 btn_update.click(
                     fn=update_client_and_refresh,
@@ -277,23 +297,64 @@ def create_demo() -> gr.Blocks:
                         client_dropdown,
                         edit_dropdown,
                     ],
-                    outputs=[out_edit, client_dropdown, edit_dropdown, clients_table, modal_create, modal_edit, clients_list_group],
-                )
+                    outputs=[out_edit, client_dropdown, edit_dropdown, modal_create, modal_edit, clients_list_group],
+                ).then(fn=first_clients_page, inputs=[], outputs=clients_outputs)
+
+                # Opções vêm da busca no servidor a cada tecla, não da tabela inteira.
+                for dropdown in (client_dropdown, edit_dropdown):
+                    dropdown.key_up(
+                        fn=search_client_choices,
+                        inputs=None,
+                        outputs=dropdown,
+                        queue=False,
+                        show_progress="hidden",
+                    )
 
-                btn_refresh_clients.click(fn=list_clients_rows, inputs=[], outputs=[clients_table])
-                demo.load(fn=list_clients_rows, inputs=[], outputs=[clients_table])
+                # Como o histórico: só ao abrir a aba, uma página por vez (keyset por id).
+                clients_tab.select(fn=first_clients_page, inputs=[], outputs=clients_outputs)
+                btn_refresh_clients.click(fn=first_clients_page, inputs=[], outputs=clients_outputs)
+                btn_clients_next.click(
+                    fn=next_clients_page, inputs=[clients_page_cursors, clients_next_cursor], outputs=clients_outputs
+                )
+                btn_clients_prev.click(
+                    fn=previous_clients_page, inputs=[clients_page_cursors, clients_next_cursor], outputs=clients_outputs
+                )
 
-            with gr.Tab("Histórico"):
-                btn_refresh_hist = gr.Button("🔄 Atualizar histórico")
+            with gr.Tab("Histórico") as history_tab:
+                with gr.Row():
+                    hist_status = gr.Dropdown(STATUS_FILTER_CHOICES, value=STATUS_FILTER_ALL, label="Status")
+                    hist_cpf = gr.Textbox(label="CPF", placeholder="XXX.XXX.XXX-XX")
+                    btn_refresh_hist = gr.Button("🔄 Atualizar histórico")
                 apps_table = gr.Dataframe(
-                    headers=["id", "cpf", "client_id", "amount", "duration", "status", "reason", "created_at"],
-                    datatype=["number", "str", "number", "number", "number", "str", "str", "str"],
+                    headers=["id", "cpf", "client_id", "amount", "duration", "status", "reason", "created_at", "cached", "model_version"],
+                    datatype=["number", "str", "number", "number", "number", "str", "str", "str", "bool", "str"],
                     interactive=False,
                     wrap=True,
                 )
+                with gr.Row():
+                    btn_hist_prev = gr.Button("⬅️ Anterior")
+                    hist_page_label = gr.Markdown("")
+                    btn_hist_next = gr.Button("Próxima ➡️")
+                hist_page_cursors = gr.State([None])
+                hist_next_cursor = gr.State(None)
 
-                btn_refresh_hist.click(fn=list_applications_rows, inputs=[], outputs=[apps_table])
-                demo.load(fn=list_applications_rows, inputs=[], outputs=[apps_table])
+                hist_filters = [hist_status, hist_cpf]
+                hist_outputs = [apps_table, hist_page_cursors, hist_next_cursor, hist_page_label]
+                # Carregado só quando a aba é aberta, uma página por vez.
+                history_tab.select(fn=first_history_page, inputs=hist_filters, outputs=hist_outputs)
+                btn_refresh_hist.click(fn=first_history_page, inputs=hist_filters, outputs=hist_outputs)
+                hist_status.change(fn=first_history_page, inputs=hist_filters, outputs=hist_outputs)
+                hist_cpf.submit(fn=first_history_page, inputs=hist_filters, outputs=hist_outputs)
+                btn_hist_next.click(
+                    fn=next_history_page,
+                    inputs=[*hist_filters, hist_page_cursors, hist_next_cursor],
+                    outputs=hist_outputs,
+                )
+                btn_hist_prev.click(
+                    fn=previous_history_page,
+                    inputs=[*hist_filters, hist_page_cursors, hist_next_cursor],
+                    outputs=hist_outputs,
+                )
 
         btn_submit.click(
             fn=process_credit_analysis,
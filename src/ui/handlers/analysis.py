@@ -1,18 +1,20 @@
 from __future__ import annotations
 
-from src.agents.orchestrator import CreditSystemOrchestrator
+import gradio as gr
+
+from src.agents.orchestrator import get_orchestrator
 from src.services.client_choice_service import extract_cpf_from_choice
-from src.tools.db_tools import get_client_data
-from src.ui.handlers.history import list_applications_rows
+from src.tools.async_db import get_async_repository
 
 
 async def process_credit_analysis(client_choice, amount, duration, purpose):
-    orchestrator = CreditSystemOrchestrator()
+    orchestrator = get_orchestrator()
 
     cpf = extract_cpf_from_choice(client_choice)
-    client_data = get_client_data(cpf)
+    client_data = await get_async_repository().get_client_data(cpf)
     if not client_data:
-        hist_rows = list_applications_rows()
+        # O histórico é paginado e recarregado pela própria aba ao ser aberta.
+        hist_rows = gr.skip()
         friendly_output = f"""
         ### Resultado da Análise
         **Status:** ⛔ ERRO
@@ -39,7 +41,7 @@ async def process_credit_analysis(client_choice, amount, duration, purpose):
         if field not in client_data or client_data.get(field) in (None, "")
     ]
     if missing_client_fields:
-        hist_rows = list_applications_rows()
+        hist_rows = gr.skip()
         friendly_output = f"""
         ### Resultado da Análise
         **Status:** ⛔ ERRO
@@ -119,12 +121,12 @@ async def process_credit_analysis(client_choice, amount, duration, purpose):
         *Protocolo gerado pelo sistema de agentes.*
         """
 
-        hist_rows = list_applications_rows()
+        hist_rows = gr.skip()
         return friendly_output, result, hist_rows
 
     except Exception as e:
         import traceback
 
         traceback.print_exc()
-        hist_rows = list_applications_rows()
+        hist_rows = gr.skip()
         return f"❌ Erro Crítico: {str(e)}", {"error": str(e)}, hist_rows
@@ -4,20 +4,55 @@ import gradio as gr
 
 from src.services.client_choice_service import build_choice
 from src.services.cpf_service import format_cpf_input, is_cpf_complete
-from src.services.table_formatters import clients_to_table
-from src.tools.db_tools import add_client, get_client_data, list_clients, setup_database, update_client
+from src.services.decision_cache import get_decision_cache
+from src.services.table_formatters import clients_to_table, page_label
+from src.tools.db_tools import add_client, get_client_data, list_clients, search_clients, update_client
 
+CLIENT_CHOICES_LIMIT = 50
+CLIENTS_PAGE_SIZE = 50
 
-def client_choices() -> list[str]:
-    setup_database()
-    clients = list_clients()
-    return [build_choice(c.get("name", ""), c.get("cpf", "")) for c in clients]
 
+def client_choices(query: str = "", include: str | None = None) -> list[str]:
+    """Até CLIENT_CHOICES_LIMIT opções "Nome | CPF" que casam com `query`; `include` entra sempre."""
+    clients = search_clients(query, limit=CLIENT_CHOICES_LIMIT)
+    choices = [build_choice(c.get("name", ""), c.get("cpf", "")) for c in clients]
+    if include and include not in choices:
+        choices.insert(0, include)
+    return choices
 
-def list_clients_rows() -> list[list]:
-    setup_database()
-    clients = list_clients()
-    return clients_to_table(clients)
+
+def search_client_choices(key_up_data: gr.KeyUpData):
+    return gr.update(choices=client_choices(key_up_data.input_value))
+
+
+def _clients_page(after_id):
+    # Um item a mais só para saber se existe página seguinte.
+    clients = list_clients(after_id=after_id, limit=CLIENTS_PAGE_SIZE + 1)
+    page, has_more = clients[:CLIENTS_PAGE_SIZE], len(clients) > CLIENTS_PAGE_SIZE
+    next_cursor = page[-1]["id"] if has_more else None
+    return clients_to_table(page), next_cursor
+
+
+def first_clients_page():
+    rows, next_cursor = _clients_page(None)
+    page_cursors = [None]
+    return rows, page_cursors, next_cursor, page_label(page_cursors, next_cursor)
+
+
+def next_clients_page(page_cursors, next_cursor):
+    if not next_cursor:
+        return gr.update(), page_cursors, next_cursor, page_label(page_cursors, next_cursor)
+    rows, new_next = _clients_page(next_cursor)
+    page_cursors = [*page_cursors, next_cursor]
+    return rows, page_cursors, new_next, page_label(page_cursors, new_next)
+
+
+def previous_clients_page(page_cursors, next_cursor):
+    page_cursors = list(page_cursors or [None])
+    if len(page_cursors) > 1:
+        page_cursors.pop()
+    rows, new_next = _clients_page(page_cursors[-1])
+    return rows, page_cursors, new_next, page_label(page_cursors, new_next)
 
 
 def load_client_for_edit(client_choice: str):
@@ -55,20 +90,17 @@ def create_client_and_refresh(
     current_selection,
     edit_selection,
 ):
-    setup_database()
     name = str(name).strip()
     cpf = format_cpf_input(cpf)
 
     if not is_cpf_complete(cpf):
         markdown = "### Cadastro\n**Status:** ⛔ CPF inválido. Use o formato XXX.XXX.XXX-XX"
-        choices = client_choices()
-        clients_rows = list_clients_rows()
+        choices = client_choices(include=edit_selection)
         edit_value = edit_selection if edit_selection in choices else (choices[0] if choices else None)
         return (
             markdown,
             gr.update(choices=choices, value=current_selection),
             gr.update(choices=choices, value=edit_value),
-            clients_rows,
             gr.update(visible=True),
             gr.update(visible=False),
             gr.update(visible=False),
@@ -91,12 +123,11 @@ def create_client_and_refresh(
     msg = res.get("message", "")
     markdown = f"### Cadastro\n**Status:** {emoji} {msg}"
 
-    choices = client_choices()
     preferred = build_choice(name, cpf) if res.get("success") else current_selection
+    choices = client_choices(include=preferred)
     if preferred not in choices:
         preferred = choices[0] if choices else None
 
-    clients_rows = list_clients_rows()
     edit_value = preferred if preferred in choices else (choices[0] if choices else None)
 
     # Sucesso: fecha modal e volta para lista. Falha: mantém modal para correção.
@@ -105,7 +136,6 @@ def create_client_and_refresh(
             markdown,
             gr.update(choices=choices, value=preferred),
             gr.update(choices=choices, value=edit_value),
-            clients_rows,
             gr.update(visible=True),
             gr.update(visible=False),
             gr.update(visible=False),
@@ -115,7 +145,6 @@ def create_client_and_refresh(
         markdown,
         gr.update(choices=choices, value=preferred),
         gr.update(choices=choices, value=edit_value),
-        clients_rows,
         gr.update(visible=False),
         gr.update(visible=False),
         gr.update(visible=True),
@@ -140,18 +169,15 @@ def update_client_and_refresh(
     from src.services.client_choice_service import extract_cpf_from_choice
 
     old_cpf = extract_cpf_from_choice(edit_choice)
-    setup_database()
 
     cpf = format_cpf_input(cpf)
     if not is_cpf_complete(cpf):
         markdown = "### Edição\n**Status:** ⛔ CPF inválido. Use o formato XXX.XXX.XXX-XX"
-        choices = client_choices()
-        clients_rows = list_clients_rows()
+        choices = client_choices(include=edit_selection)
         return (
             markdown,
             gr.update(choices=choices, value=main_selection),
             gr.update(choices=choices, value=edit_selection),
-            clients_rows,
             gr.update(visible=False),
             gr.update(visible=True),
             gr.update(visible=False),
@@ -170,18 +196,21 @@ def update_client_and_refresh(
         saving_accounts=str(saving_accounts) if saving_accounts is not None else None,
         checking_account=str(checking_account) if checking_account is not None else None,
     )
+    if res.get("success"):
+        # O row_version já torna as decisões antigas inalcançáveis; aqui só libera a memória.
+        cache = get_decision_cache()
+        cache.invalidate_client(old_cpf)
+        cache.invalidate_client(cpf)
 
     emoji = "✅" if res.get("success") else "⛔"
     msg = res.get("message", "")
     markdown = f"### Edição\n**Status:** {emoji} {msg}"
 
-    choices = client_choices()
     preferred = build_choice(str(name).strip(), str(cpf).strip()) if res.get("success") else edit_choice
+    choices = client_choices(include=preferred)
     if preferred not in choices:
         preferred = choices[0] if choices else None
 
-    clients_rows = list_clients_rows()
-
     main_value = preferred if preferred in choices else main_selection
     edit_value = preferred if preferred in choices else edit_selection
 
@@ -190,7 +219,6 @@ def update_client_and_refresh(
             markdown,
             gr.update(choices=choices, value=main_value),
             gr.update(choices=choices, value=edit_value),
-            clients_rows,
             gr.update(visible=False),
             gr.update(visible=True),
             gr.update(visible=False),
@@ -200,7 +228,6 @@ def update_client_and_refresh(
         markdown,
         gr.update(choices=choices, value=main_value),
         gr.update(choices=choices, value=edit_value),
-        clients_rows,
         gr.update(visible=False),
         gr.update(visible=False),
         gr.update(visible=True),
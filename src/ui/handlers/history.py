@@ -1,10 +1,42 @@
 from __future__ import annotations
 
-from src.services.table_formatters import applications_to_table
-from src.tools.db_tools import list_applications, setup_database
+import gradio as gr
 
+from src.services.table_formatters import applications_to_table, page_label
+from src.tools.db_tools import application_cursor, list_applications
 
-def list_applications_rows() -> list[list]:
-    setup_database()
-    apps = list_applications()
-    return applications_to_table(apps)
+HISTORY_PAGE_SIZE = 50
+STATUS_FILTER_ALL = "Todos"
+STATUS_FILTER_CHOICES = [STATUS_FILTER_ALL, "APPROVED", "DENIED", "ERROR"]
+
+
+def _history_page(status_filter, cpf_filter, cursor):
+    status = None if not status_filter or status_filter == STATUS_FILTER_ALL else str(status_filter)
+    cpf = str(cpf_filter).strip() if cpf_filter else None
+    # Um item a mais só para saber se existe página seguinte.
+    apps = list_applications(cursor=cursor, limit=HISTORY_PAGE_SIZE + 1, status=status, cpf=cpf)
+    page, has_more = apps[:HISTORY_PAGE_SIZE], len(apps) > HISTORY_PAGE_SIZE
+    next_cursor = application_cursor(page[-1]) if has_more else None
+    return applications_to_table(page), next_cursor
+
+
+def first_history_page(status_filter, cpf_filter):
+    rows, next_cursor = _history_page(status_filter, cpf_filter, None)
+    page_cursors = [None]
+    return rows, page_cursors, next_cursor, page_label(page_cursors, next_cursor)
+
+
+def next_history_page(status_filter, cpf_filter, page_cursors, next_cursor):
+    if not next_cursor:
+        return gr.update(), page_cursors, next_cursor, page_label(page_cursors, next_cursor)
+    rows, new_next = _history_page(status_filter, cpf_filter, next_cursor)
+    page_cursors = [*page_cursors, next_cursor]
+    return rows, page_cursors, new_next, page_label(page_cursors, new_next)
+
+
+def previous_history_page(status_filter, cpf_filter, page_cursors, next_cursor):
+    page_cursors = list(page_cursors or [None])
+    if len(page_cursors) > 1:
+        page_cursors.pop()
+    rows, new_next = _history_page(status_filter, cpf_filter, page_cursors[-1])
+    return rows, page_cursors, new_next, page_label(page_cursors, new_next)
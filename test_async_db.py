@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import pytest
+
+from src.agents import issuer as issuer_module
+from src.tools import db_tools
+from src.tools.async_db import AsyncRepository
+
+
+@pytest.fixture
+def repository(monkeypatch, tmp_path):
+    monkeypatch.setattr(db_tools, "DB_PATH", str(tmp_path / "bank_system.db"))
+    db_tools.setup_database()
+    repo = AsyncRepository(read_workers=2)
+    yield repo
+    repo.shutdown()
+    db_tools.close_connections()
+
+
+def test_repository_reads_and_writes_off_the_loop(repository):
+    async def run():
+        client = await repository.get_client_data("111.222.333-44")
+        await repository.log_application_attempt(cpf=client["cpf"], client_id=client["id"], amount=1000.0, status="DENIED")
+        return client, await repository.list_applications(), await repository.get_client_row_version("000.000.000-00")
+
+    client, apps, missing = asyncio.run(run())
+
+    assert client["name"] == "Alice Silva"
+    assert [a["status"] for a in apps] == ["DENIED"]
+    assert missing is None
+
+
+def test_slow_write_does_not_stall_the_event_loop(repository, monkeypatch):
+    original = db_tools.log_application_attempts
+
+    def slow_log(rows, path=None):
+        time.sleep(0.3)
+        return original(rows, path=path)
+
+    monkeypatch.setattr(db_tools, "log_application_attempts", slow_log)
+
+    async def run():
+        write = asyncio.create_task(
+            repository.log_application_attempt(cpf="111.222.333-44", amount=1.0, status="DENIED", sync=True)
+        )
+        started = time.perf_counter()
+        client = await repository.get_client_data("999.888.777-66")
+        read_elapsed = time.perf_counter() - started
+        await write
+        return client, read_elapsed
+
+    client, read_elapsed = asyncio.run(run())
+
+    assert client["name"] == "Charlie Souza"
+    assert read_elapsed < 0.2
+
+
+def test_approval_is_not_answered_when_its_write_fails(repository, monkeypatch):
+    def failing_log(rows, path=None):
+        raise RuntimeError("disk I/O error")
+
+    monkeypatch.setattr(issuer_module, "get_async_repository", lambda: repository)
+    monkeypatch.setattr(db_tools, "log_application_attempts", failing_log)
+    context = {"cpf": "111.222.333-44", "id": 1, "loan_amount": 1000.0, "duration": 12}
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(issuer_module.IssuerAgent().aprocess(context))
+    # Falhas de emissão continuam best-effort.
+    assert asyncio.run(issuer_module.IssuerAgent().aprocess({**context, "loan_amount": 0}))["success"] is False
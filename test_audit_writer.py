@@ -0,0 +1,118 @@
+import queue
+import threading
+
+import pytest
+
+from src.tools import db_tools
+from src.tools.audit_writer import AuditWriter
+
+
+@pytest.fixture
+def temp_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(db_tools, "DB_PATH", str(tmp_path / "bank_system.db"))
+    db_tools.setup_database()
+    yield db_tools.DB_PATH
+    db_tools.close_connections()
+
+
+def _count(path: str) -> int:
+    conn = db_tools._pool.acquire(path)
+    return conn.execute("SELECT count(*) FROM applications").fetchone()[0]
+
+
+def test_records_are_flushed_in_batches(temp_db):
+    writer = AuditWriter(batch_size=50, flush_interval_ms=200)
+    try:
+        for i in range(120):
+            writer.submit({"cpf": "111.222.333-44", "amount": float(i), "status": "DENIED"})
+        assert writer.flush(timeout=5)
+        assert _count(temp_db) == 120
+        assert writer.metrics()["written"] == 120
+        assert writer.metrics()["batches"] <= 4
+    finally:
+        writer.close()
+
+
+def test_sync_submit_is_committed_before_returning(temp_db):
+    writer = AuditWriter(flush_interval_ms=10_000)
+    try:
+        writer.submit({"cpf": "111.222.333-44", "amount": 1.0, "status": "APPROVED"}, sync=True)
+        assert _count(temp_db) == 1
+    finally:
+        writer.close()
+
+
+def test_close_drains_pending_records(temp_db):
+    writer = AuditWriter(flush_interval_ms=10_000)
+    for i in range(10):
+        writer.submit({"cpf": "111.222.333-44", "amount": float(i), "status": "DENIED"})
+    writer.close()
+
+    assert _count(temp_db) == 10
+    writer.submit({"cpf": "111.222.333-44", "amount": 99.0, "status": "DENIED"})
+    assert _count(temp_db) == 11
+
+
+def test_full_queue_applies_backpressure(temp_db, monkeypatch):
+    release = threading.Event()
+    original = db_tools.log_application_attempts
+
+    def blocked(rows, path=None):
+        release.wait(5)
+        return original(rows, path=path)
+
+    monkeypatch.setattr(db_tools, "log_application_attempts", blocked)
+    writer = AuditWriter(max_queue=1, batch_size=1, flush_interval_ms=0)
+    try:
+        writer.submit({"cpf": "1", "status": "DENIED"})
+        # O primeiro registro está preso na escrita; o segundo ocupa a fila.
+        for _ in range(50):
+            try:
+                writer.submit({"cpf": "2", "status": "DENIED"}, block=False)
+            except queue.Full:
+                continue
+        with pytest.raises(queue.Full):
+            writer.submit({"cpf": "3", "status": "DENIED"}, block=False)
+    finally:
+        release.set()
+        writer.close()
+
+
+def test_sync_submit_times_out_instead_of_hanging(temp_db, monkeypatch):
+    release = threading.Event()
+    original = db_tools.log_application_attempts
+
+    def blocked(rows, path=None):
+        release.wait(5)
+        return original(rows, path=path)
+
+    monkeypatch.setattr(db_tools, "log_application_attempts", blocked)
+    writer = AuditWriter(sync_timeout_s=0.05)
+    try:
+        with pytest.raises(TimeoutError):
+            writer.submit({"cpf": "111.222.333-44", "status": "APPROVED"}, sync=True)
+    finally:
+        release.set()
+        writer.close()
+    # O registro não se perde: é gravado quando a escrita destrava.
+    assert _count(temp_db) == 1
+
+
+def test_submits_racing_close_are_all_written(temp_db):
+    writer = AuditWriter(flush_interval_ms=10_000)
+    start = threading.Barrier(5)
+
+    def submit_many(worker: int):
+        start.wait()
+        for i in range(50):
+            writer.submit({"cpf": "111.222.333-44", "amount": float(worker * 100 + i), "status": "DENIED"}, sync=i % 10 == 0)
+
+    threads = [threading.Thread(target=submit_many, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    start.wait()
+    writer.close()
+    for t in threads:
+        t.join(5)
+        assert not t.is_alive()
+    assert _count(temp_db) == 200
@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from src.agents import batch_runner
+from src.agents.orchestrator import CreditSystemOrchestrator
+from src.services import decision_cache as decision_cache_module
+from src.tools import db_tools
+
+APPLICATIONS = [
+    {"cpf": "111.222.333-44", "loan_amount": 10000.0, "duration": 24, "purpose": "radio/TV"},
+    {"cpf": "555.666.777-88", "loan_amount": 10000.0, "duration": 24, "purpose": "car"},
+    {"cpf": "999.888.777-66", "loan_amount": 500000.0, "duration": 24, "purpose": "car"},
+    {"cpf": "999.888.777-66", "loan_amount": 5000.0, "duration": 12, "purpose": "car", "age": 16},
+    {"cpf": "123", "loan_amount": 1000.0, "duration": 12, "purpose": "car"},
+    {"cpf": "000.000.000-00", "loan_amount": 1000.0, "duration": 12, "purpose": "car"},
+    {"cpf": "111.222.333-44", "loan_amount": 0.0, "duration": 24, "purpose": "radio/TV"},
+    {"cpf": "111.222.333-44", "loan_amount": 1000.0, "duration": None, "purpose": "radio/TV"},
+]
+
+
+@pytest.fixture
+def temp_db(monkeypatch, tmp_path):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    monkeypatch.setattr(db_tools, "DB_PATH", str(tmp_path / "bank_system.db"))
+    monkeypatch.setattr(decision_cache_module, "_shared_cache", None)
+    db_tools.setup_database()
+    yield db_tools.DB_PATH
+    db_tools.close_connections()
+
+
+def test_batch_decisions_match_the_deterministic_orchestrator(temp_db):
+    decisions, timings = batch_runner.decide_chunk(pd.DataFrame(APPLICATIONS), db_tools.DB_PATH)
+
+    assert decisions["status"].tolist() == [
+        "APPROVED", "DENIED", "DENIED", "DENIED", "DENIED", "DENIED", "ERROR", "INVALID",
+    ]
+    assert set(timings) == set(batch_runner.STAGES)
+
+    orchestrator = CreditSystemOrchestrator(mode="deterministic")
+    for app, (_, decision) in list(zip(APPLICATIONS, decisions.iterrows()))[:4]:
+        request = {**db_tools.get_client_data(app["cpf"]), **app}
+        result = asyncio.run(orchestrator.handle_request(request))
+        if result["status"] == "APROVADO":
+            assert json.loads(decision["reason"]) == result["ml_risk"]
+        else:
+            assert decision["reason"] == result["motivo"]
+
+
+def test_run_batch_writes_logged_statuses_in_bulk(temp_db):
+    report = batch_runner.run_batch([pd.DataFrame(APPLICATIONS[:4]), pd.DataFrame(APPLICATIONS[4:])], workers=1)
+
+    assert report["rows"] == 8 and report["written"] == 7
+    assert report["statuses"] == {"APPROVED": 1, "DENIED": 5, "ERROR": 1, "INVALID": 1}
+    assert set(report["timings_ms"]) == {"read", "audit", "compliance", "risk", "issue", "write"}
+    history = db_tools.list_applications()
+    assert len(history) == 7 and "INVALID" not in {a["status"] for a in history}
+
+
+def test_dry_run_and_process_pool_give_the_same_decisions(temp_db, tmp_path):
+    chunks = list(batch_runner.campaign_applications(loan_amount=10000.0, duration=24, purpose="car", chunk_size=2))
+    serial_out, pool_out = tmp_path / "serial.csv", tmp_path / "pool.csv"
+
+    serial = batch_runner.run_batch(chunks, dry_run=True, workers=1, output=str(serial_out))
+    pooled = batch_runner.run_batch(chunks, dry_run=True, workers=2, output=str(pool_out))
+
+    assert serial["rows"] == pooled["rows"] == 3
+    assert serial["written"] == pooled["written"] == 0
+    assert db_tools.list_applications() == []
+    pd.testing.assert_frame_equal(pd.read_csv(serial_out), pd.read_csv(pool_out))
@@ -0,0 +1,95 @@
+import pandas as pd
+import pytest
+
+from src.agents import batch_runner
+from src.tools import client_import, db_tools
+
+
+@pytest.fixture
+def temp_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(db_tools, "DB_PATH", str(tmp_path / "bank_system.db"))
+    db_tools.setup_database()
+    yield db_tools.DB_PATH
+    db_tools.close_connections()
+
+
+def _write_csv(tmp_path, rows):
+    path = tmp_path / "clientes.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def test_validate_chunk_reports_every_problem_per_row():
+    df = pd.DataFrame(
+        {
+            "name": ["Ana", "", "Caio"],
+            "cpf": ["12345678901", "123.456", "987.654.321-00"],
+            "income": ["5000", "abc", "3000"],
+            "age": ["30", "17", "40.5"],
+            "score": ["700", "700", "1200"],
+            "housing": ["own", "castle", None],
+        }
+    )
+    valid, errors = client_import.validate_chunk(df, first_row=11)
+
+    assert valid["cpf"].tolist() == ["123.456.789-01"]
+    assert [e["row"] for e in errors] == [12, 13]
+    assert "CPF inválido" in errors[0]["errors"]
+    assert "nome vazio" in errors[0]["errors"] and "housing fora" in errors[0]["errors"]
+    assert "idade fora" in errors[1]["errors"] and "score fora" in errors[1]["errors"]
+
+
+def test_import_upserts_by_cpf_and_bumps_row_version(temp_db, tmp_path):
+    before = db_tools.get_client_data("111.222.333-44")
+    path = _write_csv(
+        tmp_path,
+        [
+            {"name": "Nova Cliente", "cpf": "22233344455", "income": 4000, "age": 25, "score": 650, "job": 1},
+            {"name": "Alice Silva", "cpf": "111.222.333-44", "income": 9000, "age": 31, "score": 760, "job": ""},
+            {"name": "Menor", "cpf": "33344455566", "income": 1000, "age": 16, "score": 500, "job": 1},
+        ],
+    )
+
+    report = client_import.import_clients(path, chunk_size=2)
+
+    assert (report["rows"], report["imported"], report["rejected"]) == (3, 2, 1)
+    assert report["errors"][0]["row"] == 3
+    assert report["rows_per_s"] > 0
+
+    created = db_tools.get_client_data("222.333.444-55")
+    assert created["name"] == "Nova Cliente" and created["job"] == 1
+
+    updated = db_tools.get_client_data("111.222.333-44")
+    # job vazio no arquivo: entra o padrão do perfil, não NULL.
+    assert updated["income"] == 9000.0 and updated["job"] == 1
+    assert updated["row_version"] == before["row_version"] + 1
+    assert db_tools.get_client_data("333.444.555-66") is None
+
+
+def test_dry_run_validates_without_writing(temp_db, tmp_path):
+    path = _write_csv(tmp_path, [{"name": "Eva", "cpf": "44455566677", "income": 3000, "age": 40, "score": 600}])
+
+    report = client_import.import_clients(path, dry_run=True)
+
+    assert report["imported"] == 1
+    assert db_tools.get_client_data("444.555.666-77") is None
+
+
+def test_missing_required_column_fails_fast(temp_db, tmp_path):
+    path = _write_csv(tmp_path, [{"name": "Eva", "cpf": "44455566677"}])
+    with pytest.raises(ValueError, match="income"):
+        client_import.import_clients(path)
+
+
+def test_minimal_import_can_be_scored(temp_db, tmp_path):
+    path = _write_csv(tmp_path, [{"name": "Só Obrigatórios", "cpf": "66677788899", "income": 6000, "age": 35, "score": 720}])
+    assert client_import.import_clients(path)["imported"] == 1
+
+    client = db_tools.get_client_data("666.777.888-99")
+    assert {k: client[k] for k in client_import.PROFILE_DEFAULTS} == client_import.PROFILE_DEFAULTS
+
+    decisions, _ = batch_runner.decide_chunk(
+        pd.DataFrame({"cpf": ["666.777.888-99"], "loan_amount": [5000.0], "duration": [12], "purpose": ["car"]})
+    )
+    assert decisions["status"].iloc[0] != batch_runner.STATUS_INVALID
+    assert decisions["risk_probability"].notna().iloc[0]
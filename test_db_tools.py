@@ -0,0 +1,173 @@
+import gc
+import os
+import shutil
+import sqlite3
+import threading
+
+import pytest
+
+from src.tools import db_migrations, db_tools
+
+
+@pytest.fixture
+def temp_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(db_tools, "DB_PATH", str(tmp_path / "bank_system.db"))
+    db_tools.setup_database()
+    yield db_tools.DB_PATH
+    db_tools.close_connections()
+
+
+def test_connection_is_reused_per_thread_in_wal_mode(temp_db):
+    conn = db_tools._get_connection()
+    assert db_tools._get_connection() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(db_tools._get_connection()))
+    t.start()
+    t.join()
+    assert other[0] is not conn
+    # A conexão da thread encerrada é fechada e sai do pool.
+    gc.collect()
+    assert other[0] not in db_tools._pool._connections
+    with pytest.raises(sqlite3.ProgrammingError):
+        other[0].execute("SELECT 1")
+    assert conn.execute("SELECT 1").fetchone()[0] == 1
+
+
+def test_crud_round_trip_on_pooled_connection(temp_db):
+    assert db_tools.add_client("Dora Lima", "123.456.789-00", 4000.0, 28, 650)["success"]
+    assert not db_tools.add_client("Dora Lima", "123.456.789-00", 4000.0, 28, 650)["success"]
+
+    res = db_tools.update_client(old_cpf="123.456.789-00", name="Dora L.", cpf="123.456.789-00", income=4500.0, age=29, score=700)
+    assert res["success"]
+    assert db_tools.get_client_data("123.456.789-00")["income"] == 4500.0
+
+    db_tools.log_application_attempt(cpf="123.456.789-00", client_id=4, amount=1000.0, duration=12, status="APPROVED")
+    assert db_tools.list_applications()[0]["status"] == "APPROVED"
+    assert not db_tools._get_connection().in_transaction
+
+
+def test_migrations_are_recorded_and_applied_once(temp_db):
+    conn = db_tools._get_connection()
+    assert db_migrations.current_version(conn) == db_migrations.LATEST_VERSION
+    assert db_migrations.apply_migrations(conn) == []
+
+    bob = db_tools.get_client_data("555.666.777-88")
+    assert (bob["age"], bob["job"], bob["housing"]) == (30, 3, "free")
+    assert len(db_tools.list_clients()) == 3
+
+
+def test_list_clients_keyset_pages(temp_db):
+    ids = [c["id"] for c in db_tools.list_clients()]
+    first = db_tools.list_clients(limit=2)
+    rest = db_tools.list_clients(after_id=first[-1]["id"], limit=2)
+    assert [c["id"] for c in first + rest] == ids
+    assert db_tools.list_clients(after_id=ids[-1], limit=2) == []
+
+
+def test_migrations_upgrade_legacy_database(monkeypatch, tmp_path):
+    path = tmp_path / "legacy.db"
+    legacy = sqlite3.connect(path)
+    legacy.execute("CREATE TABLE clients (id INTEGER PRIMARY KEY, name TEXT, cpf TEXT UNIQUE, income REAL, age INTEGER, credit_history_score INTEGER)")
+    legacy.execute("INSERT INTO clients VALUES (7, 'Eva', '222.333.444-55', 3000.0, 150, 500)")
+    legacy.commit()
+    legacy.close()
+
+    monkeypatch.setattr(db_tools, "DB_PATH", str(path))
+    try:
+        db_tools.setup_database()
+        eva = db_tools.get_client_data("222.333.444-55")
+        assert (eva["age"], eva["sex"], eva["checking_account"]) == (30, "male", "no_inf")
+        assert db_migrations.current_version(db_tools._get_connection()) == db_migrations.LATEST_VERSION
+    finally:
+        db_tools.close_connections()
+
+
+def test_list_applications_keyset_pagination_and_filters(temp_db):
+    conn = db_tools._get_connection()
+    conn.executemany(
+        "INSERT INTO applications (cpf, status, created_at) VALUES (?, ?, ?)",
+        [
+            (cpf, status, f"2026-01-{day:02d}T00:00:00")
+            for day in range(1, 11)
+            for cpf, status in (("111.222.333-44", "APPROVED"), ("555.666.777-88", "DENIED"))
+        ],
+    )
+    conn.commit()
+
+    pages, cursor = [], None
+    while True:
+        page = db_tools.list_applications(cursor=cursor, limit=6)
+        if not page:
+            break
+        pages.append(page)
+        cursor = db_tools.application_cursor(page[-1])
+
+    flat = [a["id"] for page in pages for a in page]
+    assert [len(p) for p in pages] == [6, 6, 6, 2]
+    assert flat == [a["id"] for a in db_tools.list_applications()]
+    assert len(set(flat)) == 20
+
+    denied = db_tools.list_applications(status="DENIED", since="2026-01-08", limit=10)
+    assert [a["created_at"][:10] for a in denied] == ["2026-01-10", "2026-01-09", "2026-01-08"]
+    assert {a["cpf"] for a in db_tools.list_applications(cpf="111.222.333-44")} == {"111.222.333-44"}
+
+
+def test_history_queries_use_indexes(temp_db):
+    conn = db_tools._get_connection()
+    plan = " ".join(
+        row[-1]
+        for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM applications WHERE status = ? AND (created_at, id) < (?, ?) "
+            "ORDER BY created_at DESC, id DESC LIMIT 50",
+            ("DENIED", "2026-01-01", 10),
+        )
+    )
+    assert "idx_applications_status_created" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_search_clients_by_name_and_cpf_fragments(temp_db):
+    assert db_tools.add_client("Dora Lima", "123.456.789-00", 4000.0, 28, 650)["success"]
+
+    assert [c["name"] for c in db_tools.search_clients("lima")] == ["Dora Lima"]
+    assert [c["name"] for c in db_tools.search_clients("SIL")] == ["Alice Silva"]
+    assert [c["name"] for c in db_tools.search_clients("45678")] == ["Dora Lima"]
+    assert [c["name"] for c in db_tools.search_clients("456.789")] == ["Dora Lima"]
+    assert [c["name"] for c in db_tools.search_clients("do")] == ["Dora Lima"]
+    assert len(db_tools.search_clients("", limit=2)) == 2
+    assert db_tools.search_clients("%") == []
+
+
+def test_search_index_follows_client_updates(temp_db):
+    db_tools.update_client(
+        old_cpf="555.666.777-88", name="Roberto Santos", cpf="555.666.777-89", income=2000.0, age=30, score=400
+    )
+
+    assert [c["cpf"] for c in db_tools.search_clients("roberto")] == ["555.666.777-89"]
+    assert db_tools.search_clients("bob") == []
+    assert db_tools.search_clients("55566677788") == []
+
+
+def test_mcp_tools_upgrade_baseline_database(monkeypatch, tmp_path):
+    # O import do servidor roda setup_database(): aponta para um banco descartável.
+    monkeypatch.setattr(db_tools, "DB_PATH", str(tmp_path / "startup.db"))
+    from src.infrastructure import mcp_server
+
+    # Banco versionado, sem schema_version: só a primeira conexão do pool pode migrá-lo.
+    path = tmp_path / "bank_system.db"
+    shutil.copyfile(os.path.join(os.path.dirname(__file__), "database", "bank_system.db"), path)
+    monkeypatch.setattr(db_tools, "DB_PATH", str(path))
+    db_tools.close_connections()
+    try:
+        result = mcp_server.get_client_cpf("111.222.333-44")
+        assert result["found"] and "error" not in result and result["client"]["row_version"] == 1
+
+        mcp_server.log_application_attempt(
+            cpf="111.222.333-44", client_id=result["client"]["id"], amount=1000.0, duration=12, status="APPROVED"
+        )
+        assert db_tools.list_applications(cpf="111.222.333-44")[0]["status"] == "APPROVED"
+        assert db_migrations.current_version(db_tools._get_connection()) == db_migrations.LATEST_VERSION
+    finally:
+        db_tools.close_connections()
@@ -0,0 +1,68 @@
+from src.services.decision_cache import DecisionCache, decision_key
+
+REQUEST = {
+    "cpf": "111.222.333-44",
+    "loan_amount": 10000,
+    "duration": 24,
+    "purpose": "radio/TV",
+    "age": 30,
+    "score": 750,
+    "income": 5000.0,
+    "sex": "female",
+    "job": 1,
+    "housing": "own",
+    "saving_accounts": "moderate",
+    "checking_account": "little",
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_key_normalizes_request_and_tracks_versions():
+    key = decision_key(REQUEST, model_version="abc", row_version=1)
+
+    assert key == decision_key({**REQUEST, "loan_amount": "10000.0", "name": "Alice"}, model_version="abc", row_version=1)
+    assert key != decision_key(REQUEST, model_version="abc", row_version=2)
+    assert key != decision_key(REQUEST, model_version="def", row_version=1)
+    assert key != decision_key({**REQUEST, "duration": 36}, model_version="abc", row_version=1)
+
+
+def test_ttl_expiry_and_lru_eviction():
+    clock = FakeClock()
+    cache = DecisionCache(max_entries=2, ttl_s=10, clock=clock)
+    cache.put("a", "1", {"status": "APROVADO"})
+    cache.put("b", "2", {"status": "NEGADO"})
+    assert cache.get("a") == {"status": "APROVADO"}
+
+    cache.put("c", "3", {"status": "NEGADO"})
+    assert cache.get("b") is None
+    assert cache.metrics()["evictions"] == 1
+
+    clock.now = 11.0
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+
+
+def test_invalidate_client_and_returned_copies():
+    cache = DecisionCache(max_entries=8, ttl_s=60)
+    cache.put("a", "111", {"status": "APROVADO", "ml_risk": {"status": "LOW_RISK"}})
+    cache.put("b", "222", {"status": "NEGADO"})
+
+    cache.get("a")["ml_risk"]["status"] = "mutated"
+    assert cache.get("a")["ml_risk"]["status"] == "LOW_RISK"
+
+    assert cache.invalidate_client("111") == 1
+    assert cache.get("a") is None
+    assert cache.get("b") == {"status": "NEGADO"}
+
+
+def test_disabled_cache_stores_nothing():
+    cache = DecisionCache(max_entries=8, ttl_s=0)
+    cache.put("a", "111", {"status": "APROVADO"})
+    assert cache.get("a") is None
@@ -0,0 +1,101 @@
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from src.tools import ml_tools
+from src.tools.forest_evaluator import ARRAY_ALIGNMENT, CompiledForest, compile_forest, export_forest, load_forest
+
+
+def _simple_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "age": rng.integers(10, 90, n),
+            "income": rng.uniform(0, 20000, n),
+            "loan_amount": rng.uniform(0, 80000, n),
+            "duration": rng.integers(1, 80, n),
+            "credit_history_score": rng.integers(0, 1000, n),
+        }
+    )
+
+
+def test_compiled_forest_matches_shipped_model():
+    model = ml_tools._load_model()
+    forest = compile_forest(model)
+    X = _simple_frame(5000)
+
+    np.testing.assert_allclose(forest.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-9)
+    assert (forest.predict(X) == model.predict(X)).all()
+    single = X.iloc[[7]]
+    np.testing.assert_allclose(forest.predict_proba(single), model.predict_proba(single), rtol=0, atol=1e-9)
+
+
+def test_compiled_forest_handles_multiclass_and_missing_values():
+    rng = np.random.default_rng(3)
+    X = rng.normal(size=(600, 6))
+    y = (X[:, 0] > 0).astype(int) + (X[:, 1] > 0.5).astype(int)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    model = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+    forest = compile_forest(model)
+
+    X_test = rng.normal(size=(300, 6))
+    X_test[rng.random(X_test.shape) < 0.2] = np.nan
+    np.testing.assert_allclose(forest.predict_proba(X_test), model.predict_proba(X_test), rtol=0, atol=1e-9)
+    assert forest.classes_.tolist() == [0, 1, 2]
+
+
+def test_export_round_trip_and_stale_sidecar(tmp_path):
+    forest = compile_forest(ml_tools._load_model())
+    path = export_forest(forest, str(tmp_path / "model.forest.npz"), model_sha256="abc")
+    X = _simple_frame(200, seed=1)
+
+    loaded = load_forest(path, model_sha256="abc")
+    assert isinstance(loaded, CompiledForest)
+    np.testing.assert_array_equal(loaded.predict_proba(X), forest.predict_proba(X))
+    assert load_forest(path, model_sha256="outro") is None
+    assert load_forest(str(tmp_path / "missing.npz")) is None
+
+    mapped = load_forest(path, model_sha256="abc", mmap_mode="r")
+    assert isinstance(mapped.value.base, np.memmap) and not mapped.value.flags.writeable
+    assert mapped._children.ctypes.data % ARRAY_ALIGNMENT == 0
+    np.testing.assert_array_equal(mapped.predict_proba(X), forest.predict_proba(X))
+
+
+def test_predict_credit_risk_uses_compiled_forest_and_env_fallback(monkeypatch):
+    monkeypatch.setattr(ml_tools, "_state", None)
+    assert isinstance(ml_tools._get_predictor(), CompiledForest)
+    fast = ml_tools.predict_credit_risk(30, 5000.0, 10000.0, 24, 750)
+
+    monkeypatch.setenv("ML_FOREST_EVALUATOR", "sklearn")
+    monkeypatch.setattr(ml_tools, "_state", None)
+    assert ml_tools._get_predictor() is ml_tools._load_model()
+    assert ml_tools.predict_credit_risk(30, 5000.0, 10000.0, 24, 750) == fast
+
+
+def test_predictor_maps_sidecar_without_unpickling_model(monkeypatch):
+    monkeypatch.setattr(ml_tools, "_state", None)
+    predictor = ml_tools._get_predictor()
+    assert isinstance(predictor, CompiledForest) and isinstance(predictor.feature.base, np.memmap)
+    ml_tools.predict_credit_risk(30, 5000.0, 10000.0, 24, 750)
+    assert ml_tools._state.model is None
+
+
+def test_large_batch_loads_estimator_without_touching_model(monkeypatch):
+    monkeypatch.setattr(ml_tools, "_state", None)
+    monkeypatch.setattr(ml_tools, "_batch_estimator", None)
+    monkeypatch.setattr(ml_tools, "FOREST_MAX_BATCH_ROWS", 10)
+    predictor = ml_tools._get_predictor()
+    frame = _simple_frame(50).rename(columns={"credit_history_score": "history_score"})
+
+    _, proba = ml_tools.score_credit_risk_batch(frame)
+    _, small = ml_tools.score_credit_risk_batch(frame.iloc[:10])
+
+    # O estimador do lote grande fica no cache próprio; o preditor em uso continua o mesmo.
+    assert ml_tools._state.model is None and ml_tools._get_predictor() is predictor
+    estimator = ml_tools._batch_estimator[1]
+    X = ml_tools._build_simple_features_batch(frame)
+    np.testing.assert_allclose(proba, estimator.predict_proba(X)[:, 1])
+    np.testing.assert_allclose(small, proba[:10])
+    ml_tools.score_credit_risk_batch(frame)
+    assert ml_tools._batch_estimator[1] is estimator
@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+import pytest
+
+from src.infrastructure.inference_pool import InferencePool
+from src.infrastructure.prediction_batcher import PredictionBatcher
+from src.tools.ml_tools import predict_credit_risk, predict_credit_risk_batch
+
+
+def _slow_square(x: int) -> int:
+    time.sleep(0.05)
+    return x * x
+
+
+def test_thread_pool_runs_calls_concurrently_and_reports_metrics():
+    pool = InferencePool("thread", workers=4)
+
+    async def run():
+        started = time.perf_counter()
+        results = await asyncio.gather(*[pool.run(_slow_square, i) for i in range(8)])
+        return results, time.perf_counter() - started
+
+    try:
+        results, elapsed = asyncio.run(run())
+        metrics = pool.metrics()
+    finally:
+        pool.shutdown()
+
+    assert results == [i * i for i in range(8)]
+    assert elapsed < 0.3
+    assert metrics["completed"] == 8 and metrics["in_flight"] == 0 and metrics["queue_depth"] == 0
+    assert metrics["wait_ms_max"] >= metrics["wait_ms_avg"] > 0.0
+
+
+def test_queue_depth_counts_calls_waiting_for_a_worker():
+    pool = InferencePool("thread", workers=1)
+
+    async def run():
+        tasks = [asyncio.create_task(pool.run(_slow_square, i)) for i in range(3)]
+        await asyncio.sleep(0.02)
+        depth = pool.metrics()["queue_depth"]
+        await asyncio.gather(*tasks)
+        return depth
+
+    try:
+        depth = asyncio.run(run())
+        metrics = pool.metrics()
+    finally:
+        pool.shutdown()
+
+    assert depth == 2
+    assert metrics["queue_depth"] == 0 and metrics["in_flight"] == 0
+
+
+def test_process_pool_scores_with_preloaded_model():
+    pool = InferencePool("process", workers=2)
+    try:
+        result = asyncio.run(pool.run(predict_credit_risk, 30, 5000.0, 10000.0, 24, 750))
+    finally:
+        pool.shutdown()
+    assert result == predict_credit_risk(30, 5000.0, 10000.0, 24, 750)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        InferencePool("gpu")
+
+
+def test_batcher_coalesces_concurrent_requests():
+    calls = []
+
+    def score_batch(records):
+        calls.append(len(records))
+        return [{"double": r["x"] * 2} for r in records]
+
+    batcher = PredictionBatcher(score_batch, max_batch_size=4, max_wait_ms=20)
+
+    async def run():
+        return await asyncio.gather(*[batcher.submit({"x": i}) for i in range(10)])
+
+    results = asyncio.run(run())
+
+    assert results == [{"double": i * 2} for i in range(10)]
+    assert calls == [4, 4, 2]
+    assert batcher.metrics()["batches"] == 3
+
+
+def test_batcher_respects_concurrency_and_drops_abandoned_requests():
+    calls = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def runner(fn, records):
+            await release.wait()
+            return fn(records)
+
+        def score_batch(records):
+            calls.append([r["x"] for r in records])
+            return [{"x": r["x"]} for r in records]
+
+        batcher = PredictionBatcher(score_batch, runner=runner, max_batch_size=2, max_wait_ms=1000)
+        first = [asyncio.ensure_future(batcher.submit({"x": x})) for x in (0, 1)]
+        await asyncio.sleep(0)
+        # Lote cheio com o worker ocupado: espera em vez de abrir um segundo lote.
+        rest = [asyncio.ensure_future(batcher.submit({"x": x})) for x in (2, 3, 4)]
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(batcher.submit({"x": 99}), timeout=0.01)
+        assert batcher.metrics()["in_flight_batches"] == 1 and batcher.batches == 1
+
+        release.set()
+        return await asyncio.gather(*first, *rest), batcher.metrics()
+
+    results, metrics = asyncio.run(run())
+    assert results == [{"x": x} for x in range(5)]
+    assert calls == [[0, 1], [2, 3], [4]]
+    assert metrics["items"] == 5 and metrics["max_seen_batch"] == 2
+
+
+def test_batcher_isolates_invalid_records():
+    def score_batch(records):
+        if any(r["x"] < 0 for r in records):
+            raise ValueError("registro inválido")
+        return [{"x": r["x"]} for r in records]
+
+    batcher = PredictionBatcher(score_batch, max_batch_size=8, max_wait_ms=5)
+
+    async def run():
+        return await asyncio.gather(*[batcher.submit({"x": x}) for x in (1, -1, 2)], return_exceptions=True)
+
+    ok_1, bad, ok_2 = asyncio.run(run())
+    assert ok_1 == {"x": 1} and ok_2 == {"x": 2}
+    assert isinstance(bad, ValueError)
+
+
+def test_batcher_matches_single_row_scoring():
+    batcher = PredictionBatcher(predict_credit_risk_batch, max_batch_size=64, max_wait_ms=2)
+    records = [
+        {"age": 20 + i, "income": 3000.0 + 100 * i, "loan_amount": 1000.0 * (i + 1), "duration": 12, "history_score": 500 + i}
+        for i in range(16)
+    ]
+
+    async def run():
+        return await asyncio.gather(*[batcher.submit(r) for r in records])
+
+    results = asyncio.run(run())
+    assert results == [
+        predict_credit_risk(r["age"], r["income"], r["loan_amount"], r["duration"], r["history_score"]) for r in records
+    ]
+    assert batcher.batches == 1
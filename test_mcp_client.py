@@ -0,0 +1,100 @@
+import asyncio
+
+import anyio
+import pytest
+from mcp.shared.exceptions import McpError
+from mcp.types import ErrorData
+
+from src.infrastructure import mcp_client
+from src.infrastructure.mcp_client import ManagedMCPClient
+
+
+def test_managed_session_is_reused_and_restarted(monkeypatch, tmp_path):
+    # O servidor migra o banco ao subir: o subprocesso usa uma cópia descartável.
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "bank_system.db"))
+
+    async def run():
+        client = ManagedMCPClient(health_interval_s=0.5, restart_backoff_s=0.05, init_timeout_s=60.0)
+        try:
+            first = await client.call_tool("calculate_debt_ratio", {"income": 5000.0, "loan_amount": 10000.0})
+            session = client.session
+
+            results = await asyncio.gather(
+                *[client.call_tool("calculate_debt_ratio", {"income": 1000.0, "loan_amount": float(i)}) for i in range(8)]
+            )
+            assert client.session is session
+
+            client.request_restart()
+            after_restart = await client.call_tool("calculate_debt_ratio", {"income": 5000.0, "loan_amount": 20000.0})
+            return first, results, after_restart, client.restarts, client.session is session
+        finally:
+            await client.stop()
+
+    first, results, after_restart, restarts, same_session = asyncio.run(run())
+
+    assert first == {"dti_ratio": 2.0}
+    assert [r["dti_ratio"] for r in results] == [round(i / 1000.0, 2) for i in range(8)]
+    assert after_restart == {"dti_ratio": 4.0}
+    assert restarts == 1
+    assert not same_session
+
+
+def _client_with_failures(failures: list[BaseException]):
+    client = ManagedMCPClient()
+    calls = []
+
+    async def ready():
+        pass
+
+    async def call_tool(tool_name, arguments):
+        calls.append(tool_name)
+        if failures:
+            raise failures.pop(0)
+        return {"ok": tool_name}
+
+    client._wait_ready = ready
+    client._client.call_tool = call_tool
+    return client, calls
+
+
+def test_only_transport_errors_restart_and_writes_are_not_retried():
+    async def run():
+        client, calls = _client_with_failures([anyio.ClosedResourceError()])
+        assert await client.call_tool("calculate_debt_ratio", {}) == {"ok": "calculate_debt_ratio"}
+        assert calls == ["calculate_debt_ratio", "calculate_debt_ratio"]
+
+        # A escrita pode ter sido aplicada antes da queda: não é reenviada.
+        client, calls = _client_with_failures([anyio.BrokenResourceError()])
+        with pytest.raises(anyio.BrokenResourceError):
+            await client.call_tool("log_application_attempt", {})
+        assert calls == ["log_application_attempt"]
+
+        for error in (McpError(ErrorData(code=-32602, message="params")), RuntimeError("tool")):
+            client, calls = _client_with_failures([error])
+            restarts = []
+            client.request_restart = lambda: restarts.append(True)
+            with pytest.raises(type(error)):
+                await client.call_tool("analyze_risk", {})
+            assert calls == ["analyze_risk"] and not restarts
+
+    asyncio.run(run())
+
+
+def test_shared_session_starts_and_stops_with_the_app(monkeypatch):
+    events = []
+
+    class FakeClient:
+        async def start(self):
+            events.append("start")
+
+        async def stop(self):
+            events.append("stop")
+
+    monkeypatch.setattr(mcp_client, "_shared_client", FakeClient())
+
+    async def run():
+        async with mcp_client.shared_mcp_session(object()):
+            events.append("serving")
+
+    asyncio.run(run())
+    assert events == ["start", "serving", "stop"]
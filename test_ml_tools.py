@@ -0,0 +1,234 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.tools import ml_tools
+from src.tools.feature_encoder import AGE_BINS, AGE_LABELS, age_categories, age_category
+
+
+PURPOSES = ["business", "car", "domestic appliances", "education", "furniture/equipment", "radio/TV", "repairs", "vacation/others"]
+SAVINGS = ["little", "moderate", "quite rich", "rich", None]
+CHECKING = ["little", "moderate", "rich", None]
+
+
+def _german_credit_frame(n: int = 300, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Age": rng.integers(18, 76, n),
+            "Sex": rng.choice(["male", "female"], n),
+            "Job": rng.integers(0, 4, n),
+            "Housing": rng.choice(["own", "free", "rent"], n),
+            "Saving accounts": rng.choice(np.array(SAVINGS, dtype=object), n),
+            "Checking account": rng.choice(np.array(CHECKING, dtype=object), n),
+            "Credit amount": rng.integers(250, 18000, n),
+            "Duration": rng.integers(4, 72, n),
+            "Purpose": rng.choice(PURPOSES, n),
+            "Risk": rng.choice(["good", "bad"], n),
+        }
+    )
+
+
+def _to_records(raw: pd.DataFrame) -> list[dict]:
+    return [
+        {
+            "age": int(r["Age"]),
+            "income": 5000.0,
+            "loan_amount": float(r["Credit amount"]),
+            "duration": int(r["Duration"]),
+            "score": 700,
+            "purpose": r["Purpose"],
+            "sex": r["Sex"],
+            "housing": r["Housing"],
+            "saving_accounts": r["Saving accounts"],
+            "checking_account": r["Checking account"],
+            "job": int(r["Job"]),
+        }
+        for _, r in raw.iterrows()
+    ]
+
+
+def _training_matrix(raw: pd.DataFrame) -> tuple[list[str], np.ndarray]:
+    df = raw.copy()
+    df["Credit amount"] = np.log(df["Credit amount"])
+    df = ml_tools._apply_notebook_preprocessing(df)
+    X = df.drop("Risk_bad", axis=1)
+    return X.columns.tolist(), X.to_numpy(dtype=np.float64)
+
+
+@pytest.fixture
+def notebook_model(monkeypatch, tmp_path):
+    raw = _german_credit_frame()
+    csv_path = tmp_path / "credit_data.csv"
+    raw.to_csv(csv_path)
+
+    columns, X = _training_matrix(raw)
+    y = (raw["Risk"] == "bad").astype(int).to_numpy()
+    model = RandomForestClassifier(n_estimators=15, random_state=2).fit(X, y)
+
+    model_path = str(tmp_path / "credit_risk_model.pkl")
+    joblib.dump(model, model_path)
+
+    monkeypatch.setattr(ml_tools, "DATA_PATH", str(csv_path))
+    monkeypatch.setattr(ml_tools, "MODEL_PATH", model_path)
+    monkeypatch.setattr(ml_tools, "_model_version", None)
+    monkeypatch.setattr(ml_tools, "_state", None)
+    return raw, columns, X, model
+
+
+def test_batch_matches_single_row_scoring_for_simple_model():
+    records = [
+        {"age": 30, "income": 5000.0, "loan_amount": 10000.0, "duration": 24, "score": 750},
+        {"age": 20, "income": 2000.0, "loan_amount": 50000.0, "duration": 48, "score": 400},
+        {"age": 45, "income": 12000.0, "loan_amount": 3000.0, "duration": 12, "score": 800},
+    ]
+    model = ml_tools._load_model()
+    X = pd.DataFrame(
+        [[r["age"], r["income"], r["loan_amount"], r["duration"], r["score"]] for r in records],
+        columns=["age", "income", "loan_amount", "duration", "credit_history_score"],
+    )
+
+    batch = ml_tools.predict_credit_risk_batch(records)
+    single = [
+        ml_tools.predict_credit_risk(r["age"], r["income"], r["loan_amount"], r["duration"], r["score"])
+        for r in records
+    ]
+    assert batch == single
+    assert [r["risk_prediction"] for r in batch] == model.predict(X).tolist()
+    np.testing.assert_allclose([r["risk_probability"] for r in batch], model.predict_proba(X)[:, 1])
+
+
+def test_batch_accepts_dataframe_and_structured_array():
+    records = [
+        {"age": 30, "income": 5000.0, "loan_amount": 10000.0, "duration": 24, "history_score": 750},
+        {"age": 20, "income": 2000.0, "loan_amount": 50000.0, "duration": 48, "history_score": 400},
+    ]
+    structured = np.array(
+        [tuple(r.values()) for r in records],
+        dtype=[("age", "i4"), ("income", "f8"), ("loan_amount", "f8"), ("duration", "i4"), ("history_score", "i4")],
+    )
+    expected = ml_tools.predict_credit_risk_batch(records)
+    assert ml_tools.predict_credit_risk_batch(pd.DataFrame(records)) == expected
+    assert ml_tools.predict_credit_risk_batch(structured) == expected
+    assert ml_tools.predict_credit_risk_batch([]) == []
+
+
+def test_batch_requires_numeric_fields():
+    with pytest.raises(ValueError):
+        ml_tools.predict_credit_risk_batch([{"age": 30, "income": 5000.0}])
+
+
+def test_encoder_frame_is_bit_identical_to_training_preprocessing(notebook_model):
+    raw, columns, X_train, _ = notebook_model
+    records = _to_records(raw)
+
+    encoder = ml_tools._get_notebook_encoder()
+    X = encoder.encode_frame(ml_tools._records_to_frame(records))
+
+    assert ml_tools._get_notebook_feature_columns() == columns
+    assert X.dtype == np.float32
+    np.testing.assert_array_equal(X.view(np.uint32), X_train.astype(np.float32).view(np.uint32))
+
+    first_only = encoder.encode_frame(ml_tools._records_to_frame(records[:1]))
+    np.testing.assert_array_equal(first_only[0], X[0])
+
+
+def test_encoder_single_row_is_bit_identical_to_frame(notebook_model):
+    raw, _, X_train, _ = notebook_model
+    encoder = ml_tools._get_notebook_encoder()
+    expected = X_train.astype(np.float32)
+
+    for i, record in enumerate(ml_tools._records_to_frame(_to_records(raw)).to_dict("records")):
+        row = encoder.encode_one(
+            age=record["age"],
+            loan_amount=record["loan_amount"],
+            duration=record["duration"],
+            purpose=record["purpose"],
+            sex=record["sex"],
+            housing=record["housing"],
+            saving_accounts=record["saving_accounts"],
+            checking_account=record["checking_account"],
+            job=record["job"],
+        )
+        np.testing.assert_array_equal(row[0].view(np.uint32), expected[i].view(np.uint32))
+
+
+def test_schema_sidecar_replaces_dataset_read(notebook_model, monkeypatch, tmp_path):
+    raw, columns, _, model = notebook_model
+    model_path = str(tmp_path / "credit_risk_model.pkl")
+    joblib.dump(model, model_path)
+
+    schema = ml_tools.build_feature_schema(
+        model_path=model_path,
+        layout=ml_tools.LAYOUT_NOTEBOOK,
+        feature_names=columns,
+        categories=ml_tools.notebook_categories(raw),
+    )
+    assert ml_tools.write_feature_schema(schema, model_path) == ml_tools.schema_path_for(model_path)
+    assert schema["model_sha256"] == ml_tools.file_sha256(model_path)
+
+    monkeypatch.setattr(ml_tools, "DATA_PATH", str(tmp_path / "missing.csv"))
+    assert ml_tools._get_notebook_feature_columns() == columns
+    assert ml_tools._uses_simple_features(model) is False
+
+
+def test_schema_sidecar_must_match_model(notebook_model, tmp_path):
+    _, columns, _, model = notebook_model
+    model_path = str(tmp_path / "credit_risk_model.pkl")
+    joblib.dump(model, model_path)
+
+    schema = ml_tools.build_feature_schema(model_path=model_path, layout=ml_tools.LAYOUT_NOTEBOOK, feature_names=columns[:-1])
+    ml_tools.write_feature_schema(schema, model_path)
+
+    with pytest.raises(ValueError):
+        ml_tools._load_feature_schema()
+
+
+def test_schema_sidecar_must_match_model_file(notebook_model, tmp_path):
+    raw, columns, X, model = notebook_model
+    model_path = str(tmp_path / "credit_risk_model.pkl")
+    joblib.dump(model, model_path)
+    schema = ml_tools.build_feature_schema(
+        model_path=model_path, layout=ml_tools.LAYOUT_NOTEBOOK, feature_names=columns, categories=ml_tools.notebook_categories(raw)
+    )
+    ml_tools.write_feature_schema(schema, model_path)
+
+    # Outro .pkl com a mesma largura no lugar do original.
+    y = (raw["Risk"] == "good").astype(int).to_numpy()
+    joblib.dump(RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y), model_path)
+
+    with pytest.raises(ValueError, match="model_sha256"):
+        ml_tools._load_feature_schema()
+
+
+def test_encoder_age_bins_match_pd_cut():
+    ages = np.arange(0, 130)
+    expected = pd.Series(pd.cut(ages, AGE_BINS, labels=list(AGE_LABELS))).astype("object").fillna("Student")
+    assert age_categories(ages).tolist() == expected.tolist()
+    assert [age_category(int(a)) for a in ages] == expected.tolist()
+
+
+def test_notebook_batch_scoring_matches_model(notebook_model):
+    raw, _, X_train, model = notebook_model
+    results = ml_tools.predict_credit_risk_batch(_to_records(raw))
+
+    np.testing.assert_allclose([r["risk_probability"] for r in results], model.predict_proba(X_train)[:, 1])
+    assert [r["risk_prediction"] for r in results] == model.predict(X_train).tolist()
+
+    first = _to_records(raw)[0]
+    single = ml_tools.predict_credit_risk(
+        first["age"],
+        first["income"],
+        first["loan_amount"],
+        first["duration"],
+        first["score"],
+        purpose=first["purpose"],
+        sex=first["sex"],
+        housing=first["housing"],
+        saving_accounts=first["saving_accounts"],
+        checking_account=first["checking_account"],
+        job=first["job"],
+    )
+    assert single == results[0]
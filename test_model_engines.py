@@ -0,0 +1,131 @@
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tools import ml_tools, model_registry, train_model
+from src.tools.feature_encoder import NATIVE_FEATURE_NAMES, encode_native_categorical
+from src.tools.forest_evaluator import forest_path_for
+from src.tools.model_engines import ENGINE_HIST_GRADIENT_BOOSTING, ModelEngine, get_engine
+from src.tools.ml_tools import LAYOUT_CATEGORICAL, schema_path_for
+
+
+@pytest.fixture
+def isolated_model_state(monkeypatch):
+    for name in ("MODEL_PATH", "_model_version", "_state", "_batch_estimator"):
+        monkeypatch.setattr(ml_tools, name, getattr(ml_tools, name))
+
+
+def _german_credit_csv(path, n: int = 400) -> str:
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(
+        {
+            "Age": rng.integers(18, 76, n),
+            "Sex": rng.choice(["male", "female"], n),
+            "Job": rng.integers(0, 4, n),
+            "Housing": rng.choice(["own", "free", "rent"], n),
+            "Saving accounts": rng.choice(np.array(["little", "moderate", "rich", None], dtype=object), n),
+            "Checking account": rng.choice(np.array(["little", "moderate", None], dtype=object), n),
+            "Credit amount": rng.integers(250, 18000, n),
+            "Duration": rng.integers(4, 72, n),
+            "Purpose": rng.choice(["car", "radio/TV", "education", "business"], n),
+        }
+    )
+    df["Risk"] = np.where((df["Checking account"] == "little") | (df["Duration"] > 48), "bad", "good")
+    df.to_csv(path)
+    return str(path)
+
+
+def test_hist_gradient_boosting_uses_native_categories(tmp_path):
+    data = _german_credit_csv(tmp_path / "german.csv")
+    output = str(tmp_path / "model.pkl")
+
+    metrics = train_model.train(
+        data, output, engine=ENGINE_HIST_GRADIENT_BOOSTING, param_grid={"max_iter": [30]}, cv=3, n_jobs=1, cache_dir=None
+    )
+
+    model = joblib.load(output)
+    with open(schema_path_for(output), encoding="utf-8") as f:
+        schema = json.load(f)
+    assert metrics["engine"] == schema["engine"] == ENGINE_HIST_GRADIENT_BOOSTING
+    assert schema["layout"] == LAYOUT_CATEGORICAL and schema["feature_names"] == list(NATIVE_FEATURE_NAMES)
+    # Uma coluna por campo (sem one-hot) e as categóricas marcadas para o estimador.
+    assert model.n_features_in_ == len(NATIVE_FEATURE_NAMES)
+    assert model.is_categorical_.tolist() == [name in schema["categories"] for name in NATIVE_FEATURE_NAMES]
+    assert metrics["test"]["roc_auc"] > 0.9
+    assert not os.path.exists(forest_path_for(output))
+
+
+def test_serving_follows_schema_layout(tmp_path, isolated_model_state):
+    data = _german_credit_csv(tmp_path / "german.csv")
+    output = str(tmp_path / "model.pkl")
+    train_model.train(
+        data, output, engine=ENGINE_HIST_GRADIENT_BOOSTING, param_grid={"max_iter": [30]}, cv=3, n_jobs=1, cache_dir=None
+    )
+    root = str(tmp_path / "registry")
+    model_registry.publish(output, version="hgb", root=root)
+    assert ml_tools.reload_model(root=root) == "hgb"
+
+    records = [
+        {"age": 30, "income": 5000, "loan_amount": 4000, "duration": 60, "history_score": 700, "checking_account": "little"},
+        {"age": 45, "income": 5000, "loan_amount": 1200, "duration": 12, "history_score": 700, "purpose": "vacation/others"},
+    ]
+    batch = ml_tools.predict_credit_risk_batch(records)
+    single = [ml_tools.predict_credit_risk(**r) for r in records]
+
+    model = joblib.load(output)
+    schema = ml_tools._load_feature_schema()
+    X = encode_native_categorical(ml_tools._records_to_frame(records), schema["feature_names"], schema["categories"])
+    expected = model.predict_proba(X)[:, 1]
+    # Categoria fora do treino ("vacation/others") chega ao modelo como ausente.
+    assert np.isnan(X[1, list(NATIVE_FEATURE_NAMES).index("purpose")])
+    np.testing.assert_allclose([r["risk_probability"] for r in batch], expected)
+    np.testing.assert_allclose([r["risk_probability"] for r in single], expected)
+    assert batch[0]["status"] == "HIGH_RISK"
+
+
+def test_unknown_engine_and_grid_clamping():
+    with pytest.raises(ValueError):
+        get_engine("xgboost")
+    with pytest.raises(TypeError):
+        ModelEngine()
+    grid = get_engine("random_forest").grid_for({"max_features": [4, 7, 15, "sqrt"]}, 5)
+    assert grid["max_features"] == [4, 5, "sqrt"]
+
+
+def test_reload_during_a_request_keeps_its_snapshot(tmp_path, isolated_model_state, monkeypatch):
+    data = _german_credit_csv(tmp_path / "german.csv")
+    output = str(tmp_path / "model.pkl")
+    train_model.train(
+        data, output, engine=ENGINE_HIST_GRADIENT_BOOSTING, param_grid={"max_iter": [30]}, cv=3, n_jobs=1, cache_dir=None
+    )
+    root = str(tmp_path / "registry")
+    model_registry.publish(ml_tools.DEFAULT_MODEL_PATH, version="rf", root=root)
+    model_registry.publish(output, version="hgb", activate=False, root=root)
+    assert ml_tools.reload_model(root=root) == "rf"
+
+    records = [
+        {"age": 30, "income": 5000, "loan_amount": 4000, "duration": 60, "history_score": 450, "checking_account": "little"},
+        {"age": 45, "income": 9000, "loan_amount": 1200, "duration": 12, "history_score": 800},
+    ]
+    expected_rf = ml_tools.predict_credit_risk_batch(records)
+
+    # A troca simples -> categórico acontece depois que o pedido já leu o estado.
+    build_simple = ml_tools._build_simple_features_batch
+
+    def reload_then_build(frame):
+        model_registry.activate("hgb", root=root)
+        assert ml_tools.reload_model(root=root) == "hgb"
+        return build_simple(frame)
+
+    monkeypatch.setattr(ml_tools, "_build_simple_features_batch", reload_then_build)
+    assert ml_tools.predict_credit_risk_batch(records) == expected_rf
+
+    model = joblib.load(output)
+    schema = ml_tools._load_feature_schema()
+    X = encode_native_categorical(ml_tools._records_to_frame(records), schema["feature_names"], schema["categories"])
+    assert ml_tools.model_version() == "hgb" and schema["layout"] == LAYOUT_CATEGORICAL
+    np.testing.assert_allclose([r["risk_probability"] for r in ml_tools.predict_credit_risk_batch(records)], model.predict_proba(X)[:, 1])
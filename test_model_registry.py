@@ -0,0 +1,97 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.tools import db_tools, ml_tools, model_registry
+from src.tools.forest_evaluator import CompiledForest, forest_path_for
+
+
+@pytest.fixture
+def isolated_model_state(monkeypatch):
+    for name in ("MODEL_PATH", "_model_version", "_state", "_batch_estimator"):
+        monkeypatch.setattr(ml_tools, name, getattr(ml_tools, name))
+
+
+def _retrained_model_path(tmp_path) -> str:
+    import joblib
+
+    rng = np.random.default_rng(5)
+    X = pd.DataFrame(
+        {
+            "age": rng.integers(18, 70, 400),
+            "income": rng.uniform(1500, 15000, 400),
+            "loan_amount": rng.uniform(1000, 50000, 400),
+            "duration": rng.integers(6, 60, 400),
+            "credit_history_score": rng.integers(300, 850, 400),
+        }
+    )
+    y = (X["credit_history_score"] < 600).astype(int)
+    path = str(tmp_path / "retrained.pkl")
+    joblib.dump(RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y), path)
+    return path
+
+
+def test_publish_activate_and_list(tmp_path):
+    root = str(tmp_path / "registry")
+    assert model_registry.active_model(root) is None
+
+    v1 = model_registry.publish(ml_tools.DEFAULT_MODEL_PATH, root=root)
+    assert v1 == ml_tools.file_sha256(ml_tools.DEFAULT_MODEL_PATH)[:12]
+    assert model_registry.active_model(root) == (v1, model_registry.model_path_for(v1, root))
+
+    v2 = model_registry.publish(_retrained_model_path(tmp_path), version="v2", activate=False, root=root)
+    # Sem sidecar ao lado do .pkl de origem: a floresta é exportada na publicação.
+    assert os.path.exists(forest_path_for(model_registry.model_path_for(v2, root)))
+    assert model_registry.active_model(root)[0] == v1
+    model_registry.activate("v2", root=root)
+    assert [(e["version"], e["active"]) for e in model_registry.list_versions(root)] == [(v1, False), ("v2", True)]
+
+    with pytest.raises(ValueError):
+        model_registry.publish(ml_tools.DEFAULT_MODEL_PATH, version="v2", root=root)
+    with pytest.raises(ValueError):
+        model_registry.activate("v3", root=root)
+
+
+def test_reload_swaps_model_without_breaking_in_flight_predictor(isolated_model_state, tmp_path):
+    root = str(tmp_path / "registry")
+    model_registry.publish(ml_tools.DEFAULT_MODEL_PATH, version="v1", root=root)
+    assert ml_tools.reload_model(root=root) == "v1"
+    assert ml_tools.reload_model(root=root) is None
+    assert ml_tools.model_version() == "v1"
+    assert ml_tools._get_state().model is None and isinstance(ml_tools._get_predictor(), CompiledForest)
+
+    X = np.array([[30, 5000.0, 10000.0, 24, 550]])
+    old_predictor = ml_tools._get_predictor()
+    before = ml_tools.predict_credit_risk(30, 5000.0, 10000.0, 24, 550)
+
+    retrained = _retrained_model_path(tmp_path)
+    model_registry.publish(retrained, version="v2", root=root)
+    assert ml_tools.reload_model(root=root) == "v2"
+    assert ml_tools.model_version() == "v2"
+
+    # Quem já tinha o preditor anterior continua com arrays válidos.
+    assert old_predictor.predict_proba(X)[0, 1] == before["risk_probability"]
+    import joblib
+
+    expected = joblib.load(retrained).predict_proba(pd.DataFrame(X, columns=ml_tools.SIMPLE_FEATURE_NAMES))[0, 1]
+    assert ml_tools.predict_credit_risk(30, 5000.0, 10000.0, 24, 550)["risk_probability"] == pytest.approx(expected)
+
+
+def test_applications_record_active_model_version(monkeypatch, tmp_path):
+    # Banco versionado anterior à migração 8, sem setup_database(): a conexão do pool migra ao abrir.
+    path = tmp_path / "bank_system.db"
+    shutil.copyfile(os.path.join(os.path.dirname(__file__), "database", "bank_system.db"), path)
+    monkeypatch.setattr(db_tools, "DB_PATH", str(path))
+    monkeypatch.setattr(ml_tools, "_model_version", "v7")
+    monkeypatch.setattr(ml_tools, "_state", None)
+    db_tools.close_connections()
+    try:
+        db_tools.log_application_attempt(cpf="123.456.789-00", amount=1000.0, duration=12, status="DENIED")
+        db_tools.log_application_attempt(cpf="123.456.789-00", amount=1000.0, status="DENIED", model_version="v6")
+        assert [a["model_version"] for a in db_tools.list_applications(cpf="123.456.789-00")] == ["v6", "v7"]
+    finally:
+        db_tools.close_connections()
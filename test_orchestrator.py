@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+
+from src.agents import orchestrator as orchestrator_module
+from src.agents.llm_backends import FunctionCall, ScriptedBackend
+from src.services import decision_cache as decision_cache_module
+from src.tools import db_tools
+
+
+@pytest.fixture
+def orchestrator(monkeypatch, tmp_path):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    monkeypatch.setattr(db_tools, "DB_PATH", str(tmp_path / "bank_system.db"))
+    monkeypatch.setattr(orchestrator_module, "_shared_orchestrator", None)
+    monkeypatch.setattr(decision_cache_module, "_shared_cache", None)
+    db_tools.setup_database()
+    yield orchestrator_module.get_orchestrator()
+    db_tools.close_connections()
+
+
+def _request(cpf: str, loan_amount: float) -> dict:
+    return {
+        **db_tools.get_client_data(cpf),
+        "cpf": cpf,
+        "loan_amount": loan_amount,
+        "duration": 24,
+        "purpose": "radio/TV",
+    }
+
+
+def test_get_orchestrator_returns_shared_instance(orchestrator):
+    assert orchestrator_module.get_orchestrator() is orchestrator
+
+
+def test_shared_orchestrator_keeps_requests_isolated(orchestrator):
+    async def run():
+        return await asyncio.gather(
+            orchestrator.handle_request(_request("111.222.333-44", 10000.0)),
+            orchestrator.handle_request(_request("999.888.777-66", 10000.0)),
+            orchestrator.handle_request(_request("111.222.333-44", 500000.0)),
+        )
+
+    alice, charlie, alice_high_dti = asyncio.run(run())
+
+    assert alice["status"] == charlie["status"] == "APROVADO"
+    assert alice_high_dti["status"] == "NEGADO"
+    assert "DTI" in alice_high_dti["motivo"]
+    assert {a["cpf"] for a in db_tools.list_applications()} == {"111.222.333-44", "999.888.777-66"}
+
+
+def test_deterministic_mode_skips_llm_and_reports_timings(orchestrator, monkeypatch):
+    async def no_llm(**kwargs):
+        raise AssertionError("LLM não deveria ser chamado")
+
+    monkeypatch.setattr(orchestrator, "_run_genai_orchestration", no_llm)
+    result = asyncio.run(orchestrator.handle_request(_request("111.222.333-44", 10000.0), mode="deterministic"))
+
+    assert result["status"] == "APROVADO"
+    info = result["orchestration"]
+    assert info["mode"] == "deterministic"
+    assert info["engine"] == "deterministic"
+    assert {"check_audit", "check_compliance", "analyze_risk", "issue_contract", "total"} <= set(info["timings_ms"])
+
+
+def test_llm_on_exception_only_escalates_failures(orchestrator, monkeypatch):
+    calls = []
+
+    async def fake_llm(**kwargs):
+        calls.append(kwargs["user_request"]["cpf"])
+        return {"status": "NEGADO", "motivo": "revisão"}
+
+    def broken(user_request, tools):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(orchestrator, "_run_genai_orchestration", fake_llm)
+    routine = asyncio.run(orchestrator.handle_request(_request("111.222.333-44", 10000.0), mode="llm-on-exception-only"))
+    assert routine["orchestration"]["engine"] == "deterministic"
+    assert calls == []
+
+    monkeypatch.setattr(orchestrator, "_run_deterministic", broken)
+    escalated = asyncio.run(orchestrator.handle_request(_request("111.222.333-44", 12000.0), mode="llm-on-exception-only"))
+    assert escalated["motivo"] == "revisão"
+    assert escalated["orchestration"]["engine"] == "llm"
+    assert calls == ["111.222.333-44"]
+
+
+def test_llm_fallback_does_not_log_the_request_twice(orchestrator, monkeypatch):
+    llm_orchestrator = orchestrator_module.CreditSystemOrchestrator(
+        mode="llm-on-exception-only", llm_backend=ScriptedBackend()
+    )
+    aprocess = llm_orchestrator.issuer.aprocess
+
+    async def issued_then_failed(request_context):
+        # O registro da aprovação foi feito, mas a confirmação estourou o tempo.
+        await aprocess(request_context)
+        raise TimeoutError("confirmação do histórico expirou")
+
+    monkeypatch.setattr(llm_orchestrator.issuer, "aprocess", issued_then_failed)
+    result = asyncio.run(llm_orchestrator.handle_request(_request("111.222.333-44", 10000.0)))
+
+    assert result["orchestration"]["engine"] == "llm"
+    assert result["status"] == "ERROR"
+    assert len(db_tools.list_applications()) == 1
+
+
+def test_unknown_mode_is_rejected(orchestrator):
+    with pytest.raises(ValueError):
+        asyncio.run(orchestrator.handle_request(_request("111.222.333-44", 10000.0), mode="fast"))
+
+
+def test_scripted_backend_drives_the_tool_loop(orchestrator):
+    backend = ScriptedBackend(latency_ms=1)
+    llm_orchestrator = orchestrator_module.CreditSystemOrchestrator(mode="llm", llm_backend=backend)
+
+    async def run():
+        return await asyncio.gather(
+            llm_orchestrator.handle_request(_request("111.222.333-44", 10000.0)),
+            llm_orchestrator.handle_request(_request("111.222.333-44", 500000.0)),
+        )
+
+    approved, denied = asyncio.run(run())
+
+    assert approved["status"] == "APROVADO"
+    assert approved["orchestration"]["engine"] == "llm"
+    assert approved["orchestration"]["timings_ms"]["llm_round_trips"] == 4
+    assert approved["orchestration"]["timings_ms"]["llm"] >= 4.0
+    assert denied["status"] == "NEGADO"
+    assert "DTI" in denied["motivo"]
+    assert backend.turns == 8
+
+
+def test_scripted_backend_replays_fixed_calls(orchestrator):
+    backend = ScriptedBackend(script=[FunctionCall("deny_request", {"reason": "replay"})])
+    llm_orchestrator = orchestrator_module.CreditSystemOrchestrator(mode="llm", llm_backend=backend)
+
+    result = asyncio.run(llm_orchestrator.handle_request(_request("999.888.777-66", 10000.0)))
+
+    assert result["motivo"] == "replay"
+    assert result["orchestration"]["timings_ms"]["llm_round_trips"] == 1
+
+
+def test_resubmission_is_served_from_cache_and_audited(orchestrator):
+    request = _request("111.222.333-44", 500000.0)
+    first = asyncio.run(orchestrator.handle_request(dict(request)))
+    again = asyncio.run(orchestrator.handle_request(dict(request)))
+
+    assert first["status"] == again["status"] == "NEGADO"
+    assert first["orchestration"]["engine"] == "deterministic"
+    assert again["orchestration"]["engine"] == "cache"
+    assert again["motivo"] == first["motivo"]
+    assert [a["cached"] for a in db_tools.list_applications()] == [True, False]
+
+    # Aprovações não são reaproveitadas: cada reenvio emite um contrato novo.
+    approved = [asyncio.run(orchestrator.handle_request(_request("111.222.333-44", 10000.0))) for _ in range(2)]
+    assert [a["orchestration"]["engine"] for a in approved] == ["deterministic", "deterministic"]
+    assert approved[0]["protocolo"] != approved[1]["protocolo"]
+
+    alice = db_tools.get_client_data("111.222.333-44")
+    db_tools.update_client(
+        old_cpf=alice["cpf"],
+        **{k: alice[k] for k in ("name", "cpf", "income", "age", "score", "sex", "job", "housing")},
+        saving_accounts=alice["saving_accounts"],
+        checking_account=alice["checking_account"],
+    )
+    after_update = asyncio.run(orchestrator.handle_request(_request("111.222.333-44", 500000.0)))
+    assert after_update["orchestration"]["engine"] == "deterministic"
@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+from src.agents.risk_analyst import RiskAnalystAgent
+from src.tools.ml_tools import predict_credit_risk
+
+REQUEST = {
+    "age": 30,
+    "income": 5000.0,
+    "loan_amount": 10000.0,
+    "duration": 24,
+    "score": 750,
+    "purpose": "radio/TV",
+    "sex": "female",
+    "housing": "own",
+    "saving_accounts": "moderate",
+    "checking_account": "little",
+    "job": 1,
+}
+
+
+class FakeMCP:
+    def __init__(self, tools):
+        self.tools = tools
+        self.calls = []
+
+    async def call_tool(self, tool_name, arguments):
+        self.calls.append(tool_name)
+        if tool_name not in self.tools:
+            raise RuntimeError(f"Unknown tool: {tool_name}")
+        await asyncio.sleep(0)
+        return self.tools[tool_name](**arguments)
+
+
+def _ml(**kwargs):
+    return predict_credit_risk(
+        kwargs["age"], kwargs["income"], kwargs["loan_amount"], kwargs["duration"], kwargs["score"]
+    )
+
+
+def test_fused_tool_is_a_single_round_trip():
+    mcp = FakeMCP({"analyze_risk_with_dti": lambda **kw: {**_ml(**kw), "dti_ratio": 2.0}})
+    result = asyncio.run(RiskAnalystAgent(mcp).process(dict(REQUEST)))
+
+    assert mcp.calls == ["analyze_risk_with_dti"]
+    assert result["success"] is True
+    assert result["details"]["dti_ratio"] == 2.0
+
+
+def test_legacy_server_falls_back_to_parallel_calls():
+    mcp = FakeMCP(
+        {
+            "analyze_risk": lambda **kw: json.dumps(_ml(**kw)),
+            "calculate_debt_ratio": lambda income, loan_amount: round(loan_amount / income, 2),
+        }
+    )
+    result = asyncio.run(RiskAnalystAgent(mcp).process({**REQUEST, "loan_amount": 150000.0}))
+
+    assert mcp.calls == ["analyze_risk_with_dti", "analyze_risk", "calculate_debt_ratio"]
+    assert result["success"] is False
+    assert result["details"]["dti_ratio"] == 30.0
+
+
+def test_structured_payloads_without_fused_tool():
+    mcp = FakeMCP(
+        {
+            "analyze_risk": lambda **kw: _ml(**kw),
+            "calculate_debt_ratio": lambda income, loan_amount: {"dti_ratio": round(loan_amount / income, 2)},
+        }
+    )
+    result = asyncio.run(RiskAnalystAgent(mcp).process(dict(REQUEST)))
+
+    assert result["success"] is True
+    assert result["details"]["dti_ratio"] == 2.0
+    assert result["details"]["ml_prob"] == _ml(**REQUEST)["risk_probability"]
+
+
+def test_legacy_text_payloads_still_decode():
+    mcp = FakeMCP({"analyze_risk_with_dti": lambda **kw: str({**_ml(**kw), "dti_ratio": 2.0})})
+    result = asyncio.run(RiskAnalystAgent(mcp).process(dict(REQUEST)))
+
+    assert result["success"] is True
+    assert result["details"]["dti_ratio"] == 2.0
@@ -0,0 +1,83 @@
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.tools import train_model
+from src.tools.forest_evaluator import forest_path_for, load_forest
+from src.tools.ml_tools import LAYOUT_NOTEBOOK, LAYOUT_SIMPLE, file_sha256, schema_path_for
+
+SMALL_GRID = {"n_estimators": [5], "max_depth": [3, None], "max_features": [4]}
+
+
+def _simple_csv(path) -> str:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "age": rng.integers(18, 70, 300),
+            "income": rng.integers(1500, 15000, 300),
+            "loan_amount": rng.integers(1000, 50000, 300),
+            "duration": rng.integers(6, 60, 300),
+            "credit_history_score": rng.integers(300, 850, 300),
+        }
+    )
+    df["risk"] = ((df["credit_history_score"] < 500) | (df["loan_amount"] > df["income"] * 10)).astype(int)
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def _german_credit_csv(path) -> str:
+    rng = np.random.default_rng(1)
+    n = 300
+    pd.DataFrame(
+        {
+            "Age": rng.integers(18, 76, n),
+            "Sex": rng.choice(["male", "female"], n),
+            "Job": rng.integers(0, 4, n),
+            "Housing": rng.choice(["own", "free", "rent"], n),
+            "Saving accounts": rng.choice(np.array(["little", "moderate", "rich", None], dtype=object), n),
+            "Checking account": rng.choice(np.array(["little", "moderate", None], dtype=object), n),
+            "Credit amount": rng.integers(250, 18000, n),
+            "Duration": rng.integers(4, 72, n),
+            "Purpose": rng.choice(["car", "radio/TV", "education", "business"], n),
+            "Risk": rng.choice(["good", "bad"], n),
+        }
+    ).to_csv(path)
+    return str(path)
+
+
+def test_train_simple_dataset_writes_artifacts_and_caches_features(tmp_path):
+    data = _simple_csv(tmp_path / "credit.csv")
+    output = str(tmp_path / "models" / "model.pkl")
+    cache = str(tmp_path / "cache")
+
+    metrics = train_model.train(data, output, param_grid=SMALL_GRID, cv=3, n_jobs=1, cache_dir=cache)
+
+    assert metrics["layout"] == LAYOUT_SIMPLE and metrics["cv"]["n_candidates"] == 2
+    assert 0.0 <= metrics["test"]["recall"] <= 1.0 and metrics["test"]["n_samples"] == 75
+    with open(train_model.metrics_path_for(output), encoding="utf-8") as f:
+        assert json.load(f)["model_sha256"] == file_sha256(output)
+    with open(schema_path_for(output), encoding="utf-8") as f:
+        assert json.load(f)["layout"] == LAYOUT_SIMPLE
+    assert load_forest(forest_path_for(output), model_sha256=file_sha256(output)) is not None
+
+    cached = joblib.Memory(cache, verbose=0).cache(train_model._preprocess_file)
+    assert cached.check_call_in_cache(os.path.abspath(data), file_sha256(data), "random_forest")
+
+
+def test_train_notebook_dataset_matches_serving_layout(tmp_path):
+    data = _german_credit_csv(tmp_path / "german.csv")
+    output = str(tmp_path / "model.pkl")
+
+    metrics = train_model.train(data, output, param_grid=SMALL_GRID, cv=3, n_jobs=1, scaling=(1,), cache_dir=None)
+
+    model = joblib.load(output)
+    with open(schema_path_for(output), encoding="utf-8") as f:
+        schema = json.load(f)
+    assert metrics["layout"] == schema["layout"] == LAYOUT_NOTEBOOK
+    assert model.n_features_in_ == len(schema["feature_names"]) and "Risk_bad" not in schema["feature_names"]
+    # Como no notebook (X.values): o encoder do serving entrega arrays sem nomes de coluna.
+    assert not hasattr(model, "feature_names_in_")
+    assert [entry["n_jobs"] for entry in metrics["scaling"]] == [1] and metrics["scaling"][0]["speedup"] == 1.0